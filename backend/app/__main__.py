@@ -1,4 +1,7 @@
 import asyncio
+import os
+import shutil
+import tempfile
 from pathlib import Path
 
 from core.config import core_settings
@@ -7,8 +10,22 @@ from granian.constants import Interfaces
 from granian.server import Server as Granian
 
 
+def prepare_metrics_dir() -> None:
+    # Granian workers are separate processes; with this variable set they
+    # write metrics to files that /metrics merges.
+    path = Path(
+        os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR",
+            str(Path(tempfile.gettempdir()) / "backend-metrics"),
+        ),
+    )
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(parents=True)
+
+
 async def main():
     logger.info("Starting Backend Server")
+    prepare_metrics_dir()
     server = Granian(
         "asgi.app:create_app",
         interface=Interfaces.ASGI,
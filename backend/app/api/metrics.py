@@ -0,0 +1,16 @@
+from asgi.dependence.security import MetricsTokenDepends
+from core.metrics import render_metrics
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(MetricsTokenDepends())],
+)
+
+
+# Sync on purpose: merging worker files runs in the threadpool.
+@router.get("", include_in_schema=False)
+def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
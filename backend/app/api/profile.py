@@ -0,0 +1,37 @@
+from typing import Annotated, Literal
+
+from asgi.dependence.security import TokenDepends
+from core.config import profile_settings
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from shared.enums.group import Group
+from shared.utils.profiler import ProfilerBusyError, profiler
+
+router = APIRouter(
+    prefix="/profile",
+    tags=["profile"],
+    dependencies=[Depends(TokenDepends(Group.ADMIN))],
+)
+
+
+# Profiles only the worker that happens to serve the request.
+@router.get("", include_in_schema=False)
+async def profile(
+    seconds: Annotated[float, Query(gt=0)] = 10.0,
+    output: Literal["summary", "folded"] = "summary",
+) -> PlainTextResponse:
+    try:
+        report = await profiler.profile(
+            min(seconds, profile_settings.PROFILE_MAX_SECONDS),
+            profile_settings.PROFILE_INTERVAL,
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT) from e
+    if output == "folded":
+        return PlainTextResponse(
+            report.folded(),
+            headers={
+                "Content-Disposition": 'attachment; filename="profile.folded"',
+            },
+        )
+    return PlainTextResponse(report.summary())
@@ -1,10 +1,13 @@
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
-from api import auth, debug, health, telegram, user
+from api import auth, debug, health, metrics, profile, telegram, user
 from asgi.middlewares.logs import LoggingMiddleware
+from asgi.middlewares.metrics import MetricsMiddleware
 from core.config import core_settings
 from core.logs import logger
+from core.metrics import metrics_shutdown
+from db.signals import db_shutdown, db_startup
 from di import container
 from dishka.integrations.fastapi import (
     DishkaRoute,
@@ -13,16 +16,27 @@ from dishka.integrations.fastapi import (
     setup_dishka as setup_fastapi_dishka,
 )
 from fastapi import APIRouter, FastAPI
+from services.email_outbox import EmailOutboxSender
+from services.health import HealthMonitor
 from telegram.signals import aiogram_shutdown, aiogram_startup
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("Starting Application")
+    await db_startup()
     await aiogram_startup()
+    health_monitor = await container.get(HealthMonitor)
+    await health_monitor.start()
+    email_sender = await container.get(EmailOutboxSender)
+    await email_sender.start()
     yield
     logger.info("Shutting down Application")
+    await email_sender.stop()
+    await health_monitor.stop()
     await aiogram_shutdown()
+    await db_shutdown()
+    metrics_shutdown()
 
 
 def init_routers(app: FastAPI) -> None:
@@ -35,11 +49,14 @@ def init_routers(app: FastAPI) -> None:
     v1_router.include_router(user.router)
     base_router.include_router(v1_router)
     base_router.include_router(health.router)
+    base_router.include_router(metrics.router)
+    base_router.include_router(profile.router)
     app.include_router(base_router)
 
 
 def init_middlewares(app: FastAPI) -> None:
     setup_fastapi_dishka(container, app)
+    app.add_middleware(MetricsMiddleware)
     app.add_middleware(LoggingMiddleware)
 
 
@@ -1,5 +1,7 @@
+from secrets import compare_digest
 from typing import Annotated
 
+from core.config import metrics_settings
 from core.security.globals import (
     HEADER_TOKEN_KEY,
     TELEGRAM_WEBHOOK_SECRET_HEADER,
@@ -9,7 +11,11 @@ from dishka import FromDishka
 from dishka.integrations.fastapi import inject
 from entities.user.models import User
 from fastapi import Depends, HTTPException, Security
-from fastapi.security import APIKeyHeader
+from fastapi.security import (
+    APIKeyHeader,
+    HTTPAuthorizationCredentials,
+    HTTPBearer,
+)
 from services.user import UserService
 from shared.enums.group import Group
 from shared.schemas.token import TokenSchema
@@ -28,6 +34,11 @@ TelegramWebhookSecretSec = Annotated[
     ),
 ]
 
+MetricsBearerSec = Annotated[
+    HTTPAuthorizationCredentials | None,
+    Security(HTTPBearer(auto_error=False)),
+]
+
 
 class TelegramWebhookApiSecretDepends:
     def __call__(self, secret_token: TelegramWebhookSecretSec) -> str:
@@ -43,6 +54,19 @@ class TelegramWebhookApiSecretDepends:
         return secret_token
 
 
+class MetricsTokenDepends:
+    def __call__(self, credentials: MetricsBearerSec) -> None:
+        token = metrics_settings.METRICS_TOKEN
+        expected_token = token.get_secret_value() if token else ""
+        if not expected_token:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        if credentials is None or not compare_digest(
+            credentials.credentials.encode(),
+            expected_token.encode(),
+        ):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
 class TokenDepends:
     def __init__(self, group: Group):
         self.group = group
@@ -79,7 +103,7 @@ async def get_current_user(
     if not token.user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     if not (
-        user := await user_service.get_user_or_none(user_id=token.user_id)
+        user := await user_service.get_current_user_or_none(token.user_id)
     ):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     return user
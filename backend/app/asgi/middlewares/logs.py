@@ -1,45 +1,158 @@
+import random
+import time
 import uuid
-from collections.abc import Callable, Coroutine
+from collections.abc import Mapping
 from typing import Any
 
 import structlog
+from core.config import request_log_settings
 from core.logs import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from core.security.globals import (
+    HEADER_TOKEN_KEY,
+    TELEGRAM_WEBHOOK_SECRET_HEADER,
+)
+from starlette import status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+REDACTED = "***"
+REDACTED_HEADERS = frozenset(
+    {
+        HEADER_TOKEN_KEY.lower(),
+        TELEGRAM_WEBHOOK_SECRET_HEADER.lower(),
+        "authorization",
+        "cookie",
+    },
+)
+# Login payloads are credentials, their bodies are never logged
+BODYLESS_PATH_PREFIXES = ("/api/v1/auth",)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
+
+def _route_path(scope: Scope) -> str:
+    path: str = scope["path"]
+    root_path: str = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        return path[len(root_path) :]
+    return path
+
+
+def _match_prefix(path: str, rules: Mapping[str, Any], default: Any) -> Any:
+    # The longest matching prefix wins.
+    matched = max(
+        (prefix for prefix in rules if path.startswith(prefix)),
+        key=len,
+        default=None,
+    )
+    return default if matched is None else rules[matched]
+
+
+def _redact_headers(headers: list[tuple[bytes, bytes]]) -> dict[str, str]:
+    result = {}
+    for raw_name, raw_value in headers:
+        name = raw_name.decode("latin-1")
+        if name.lower() in REDACTED_HEADERS:
+            result[name] = REDACTED
+        else:
+            result[name] = raw_value.decode("latin-1")
+    return result
+
+
+class LoggingMiddleware:
+    """Pure ASGI request logging.
+
+    The request body is passed to the application untouched; only its first
+    REQUEST_LOG_BODY_LIMIT bytes are copied for the log. Requests skipped
+    by sampling are still logged when they fail.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.body_limit = request_log_settings.REQUEST_LOG_BODY_LIMIT
+        self.sample_rates = request_log_settings.REQUEST_LOG_SAMPLE_RATES
+        self.levels = request_log_settings.REQUEST_LOG_LEVELS
+
+    async def __call__(
         self,
-        request: Request,
-        call_next: Callable[[Request], Coroutine[Any, Any, Response]],
-    ) -> Response:
-        structlog.contextvars.clear_contextvars()
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        request_id = str(uuid.uuid4())
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=str(uuid.uuid4()))
 
-        structlog.contextvars.bind_contextvars(request_id=request_id)
+        route_path = _route_path(scope)
+        sample_rate = _match_prefix(route_path, self.sample_rates, 1.0)
+        sampled = random.random() < sample_rate  # noqa: S311
+        log = getattr(logger, _match_prefix(route_path, self.levels, "info"))
+        body_limit = (
+            0
+            if route_path.startswith(BODYLESS_PATH_PREFIXES)
+            else self.body_limit
+        )
 
+        client = scope.get("client")
         log_params = {
-            "path": request.url.path,
-            "query": request.url.query,
-            "method": request.method,
-            "headers": dict(request.headers.items()),
-            "peer_id": request.client.host
-            if request.client is not None
-            else None,
-            "request_body": (await request.body()).decode(),
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "method": scope["method"],
+            "peer_id": client[0] if client is not None else None,
         }
-        logger.info("Request received", **log_params)
+        if sampled:
+            log(
+                "Request received",
+                headers=_redact_headers(scope["headers"]),
+                **log_params,
+            )
+
+        body = bytearray()
+        body_size = 0
+        status_code: int | None = None
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                body_size += len(chunk)
+                if len(body) < body_limit:
+                    body.extend(chunk[: body_limit - len(body)])
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception:
-            logger.exception("Unhandled exception during request processing")
+            logger.exception(
+                "Unhandled exception during request processing",
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                request_body=body.decode(errors="replace"),
+                request_body_size=body_size,
+                **log_params,
+            )
             raise
-        structlog.contextvars.bind_contextvars(
-            status_code=response.status_code,
-            headers=dict(response.headers.items()),
+
+        failed = (
+            status_code is None
+            or status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+        if not sampled and not failed:
+            return
+        if failed:
+            log = logger.error
+        structlog.contextvars.bind_contextvars(status_code=status_code)
+        log(
+            "Response processed",
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            request_body=body.decode(errors="replace"),
+            request_body_size=body_size,
+            **log_params,
         )
-        logger.info("Response processed", **log_params)
-        return response
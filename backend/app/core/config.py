@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings
 from yarl import URL
@@ -7,9 +9,21 @@ class CoreSettings(BaseSettings):
     DEBUG: bool = False
     WORKERS: int = 1
     BACKEND_PORT: int = 5000
+    # Fallback poll for app_settings changes missed by LISTEN/NOTIFY
+    APP_SETTINGS_POLL_INTERVAL: float = 30.0
 
     DOMAIN: str
     JWT_KEY: SecretStr
+    # Verified tokens and current users kept per worker between requests
+    JWT_CACHE_SIZE: int = 4096
+    JWT_CACHE_TTL: float = 300.0
+    USER_CACHE_SIZE: int = 4096
+    USER_CACHE_TTL: float = 30.0
+    # Question lists per checklist; edits made in SQL show up after the TTL
+    CHECKLIST_CACHE_SIZE: int = 256
+    CHECKLIST_CACHE_TTL: float = 60.0
+    # Pooled connections opened before the first request
+    WARMUP_DB_CONNECTIONS: int = 2
 
     @property
     def base_url(self) -> URL:
@@ -25,3 +39,100 @@ class CoreSettings(BaseSettings):
 
 
 core_settings = CoreSettings()
+
+
+class LogSettings(BaseSettings):
+    # Pretty console output in DEBUG, JSON lines otherwise, unless set
+    LOG_FORMAT: Literal["console", "json"] | None = None
+    LOG_LEVEL: str = "INFO"
+    # JSON lines waiting for the writer thread; extra lines are dropped
+    LOG_QUEUE_SIZE: int = 10_000
+
+    @property
+    def json_format(self) -> bool:
+        if self.LOG_FORMAT is None:
+            return not core_settings.DEBUG
+        return self.LOG_FORMAT == "json"
+
+
+log_settings = LogSettings()
+
+
+class RequestLogSettings(BaseSettings):
+    # Bytes of the request body kept in the log; 0 disables body logging
+    REQUEST_LOG_BODY_LIMIT: int = 1024
+    # Path prefix -> share of requests logged, e.g. {"/api/health": 0.01}
+    REQUEST_LOG_SAMPLE_RATES: dict[str, float] = {}
+    # Path prefix -> log level name, e.g. {"/api/health": "debug"}
+    REQUEST_LOG_LEVELS: dict[
+        str,
+        Literal["debug", "info", "warning", "error"],
+    ] = {}
+
+
+request_log_settings = RequestLogSettings()
+
+
+class HealthSettings(BaseSettings):
+    # Background refresh period of the cached health report
+    HEALTH_CHECK_INTERVAL: float = 30.0
+    HEALTH_CHECK_TIMEOUT: float = 5.0
+    # Share of pool connections in use that reports the pool as degraded
+    HEALTH_DB_POOL_SATURATION: float = 0.9
+    # Updates being handled at once that report the bot as degraded
+    HEALTH_UPDATE_BACKLOG_LIMIT: int = 100
+
+
+health_settings = HealthSettings()
+
+
+class ProfileSettings(BaseSettings):
+    # Longest window of /profile and /api/profile, seconds
+    PROFILE_MAX_SECONDS: float = 60.0
+    # Seconds between two stack samples while a profile runs
+    PROFILE_INTERVAL: float = 0.005
+
+
+profile_settings = ProfileSettings()
+
+
+class MetricsSettings(BaseSettings):
+    # Bearer token Prometheus sends to /api/metrics; unset keeps it closed
+    METRICS_TOKEN: SecretStr | None = None
+
+
+metrics_settings = MetricsSettings()
+
+
+class TraceSettings(BaseSettings):
+    # Share of Telegram updates whose spans are logged
+    TRACE_SAMPLE_RATE: float = 0.0
+    # Updates at least this slow are logged regardless of sampling;
+    # with no threshold and no sampling spans are not collected at all
+    TRACE_SLOW_MS: float | None = None
+
+
+trace_settings = TraceSettings()
+
+
+class EmailSettings(BaseSettings):
+    # Fallback poll of the outbox; new emails wake the sender right away
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 10.0
+    EMAIL_BATCH_SIZE: int = 50
+    # Failed sends are retried after RETRY_BASE_DELAY * 2^n seconds,
+    # at most RETRY_MAX_DELAY apart, until MAX_ATTEMPTS
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_DELAY: float = 30.0
+    EMAIL_RETRY_MAX_DELAY: float = 3600.0
+    # Claimed emails are retried after this if the worker dies mid-send
+    EMAIL_SEND_LEASE: float = 300.0
+    EMAIL_SMTP_TIMEOUT: float = 30.0
+    # Open SMTP connections are reused until idle for this long
+    EMAIL_SMTP_IDLE_TIMEOUT: float = 60.0
+    # Health is degraded while a pending email is older than this
+    EMAIL_OUTBOX_MAX_AGE: float = 900.0
+    # How often pending position change requests are checked for a digest
+    POSITION_CHANGE_DIGEST_INTERVAL: float = 60.0
+
+
+email_settings = EmailSettings()
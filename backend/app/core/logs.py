@@ -1,8 +1,155 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, BinaryIO
+
+import orjson
 import structlog
+from core.config import log_settings
+
+WRITER_BATCH_SIZE = 512
+
+
+class LogWriter:
+    """Writes rendered log lines to a stream from a background thread.
+
+    The event loop only enqueues bytes; when the bounded queue is full the
+    line is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, stream: BinaryIO, maxsize: int) -> None:
+        self.stream = stream
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._start()
+        # A forked worker does not inherit the thread, only the queue.
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self) -> None:
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[bytes | None] = queue.Queue(self.maxsize)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="log-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def put(self, line: bytes) -> None:
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            line = self._queue.get()
+            batch = []
+            while line is not None:
+                batch.append(line)
+                if len(batch) >= WRITER_BATCH_SIZE:
+                    break
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            dropped_line = self._dropped_line()
+            if dropped_line is not None:
+                batch.append(dropped_line)
+            if batch:
+                self._write(batch)
+            if line is None:
+                return
+
+    def _dropped_line(self) -> bytes | None:
+        with self._lock:
+            dropped = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+        if not dropped:
+            return None
+        return orjson.dumps(
+            {
+                "event": "Log lines dropped",
+                "dropped": dropped,
+                "level": "warning",
+                "timestamp": time.strftime(
+                    "%Y-%m-%dT%H:%M:%SZ",
+                    time.gmtime(),
+                ),
+            },
+        )
+
+    def _write(self, batch: list[bytes]) -> None:
+        try:
+            self.stream.write(b"\n".join(batch) + b"\n")
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Nothing sensible to do when stdout itself is gone.
+            pass
+
+
+class QueueLogger:
+    """structlog logger that hands rendered lines to a LogWriter."""
+
+    def __init__(self, writer: LogWriter) -> None:
+        self.writer = writer
+
+    def msg(self, message: bytes) -> None:
+        self.writer.put(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, writer: LogWriter) -> None:
+        self.writer = writer
+
+    def __call__(self, *_: Any) -> QueueLogger:
+        return QueueLogger(self.writer)
+
+
+def configure_logging() -> LogWriter | None:
+    level = logging.getLevelNamesMapping()[log_settings.LOG_LEVEL.upper()]
+    if not log_settings.json_format:
+        # Synchronous, pretty output with rich tracebacks for development.
+        structlog.configure(
+            wrapper_class=structlog.make_filtering_bound_logger(level),
+        )
+        return None
+    log_writer = LogWriter(sys.stdout.buffer, log_settings.LOG_QUEUE_SIZE)
+    atexit.register(log_writer.close)
+    structlog.configure(
+        processors=[
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+        ],
+        wrapper_class=structlog.make_filtering_bound_logger(level),
+        logger_factory=QueueLoggerFactory(log_writer),
+        cache_logger_on_first_use=True,
+    )
+    return log_writer
 
 
 def register_logger() -> structlog.PrintLogger:
     return structlog.get_logger("backend")
 
 
+log_writer = configure_logging()
 logger = register_logger()
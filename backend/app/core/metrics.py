@@ -0,0 +1,82 @@
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Set by __main__ before Granian starts its workers; every worker then
+# writes its samples to files there and /metrics merges them.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+)
+telegram_update_duration = Histogram(
+    "telegram_update_duration_seconds",
+    "Telegram update handling latency",
+    ["handler", "state"],
+)
+telegram_api_request_duration = Histogram(
+    "telegram_api_request_duration_seconds",
+    "Telegram Bot API call latency",
+    ["method", "result"],
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+db_queries = Counter(
+    "db_queries_total",
+    "Executed database statements",
+    ["operation"],
+)
+checklist_sessions_started = Counter(
+    "checklist_sessions_started_total",
+    "Started checklist sessions",
+)
+checklist_sessions_completed = Counter(
+    "checklist_sessions_completed_total",
+    "Completed checklist sessions",
+)
+employee_import_rows = Counter(
+    "employee_import_rows_total",
+    "Employee rows processed by the XLSX import",
+    ["result"],
+)
+employee_import_duration = Histogram(
+    "employee_import_duration_seconds",
+    "Employee XLSX import duration",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600),
+)
+emails_sent = Counter(
+    "emails_sent_total",
+    "Outbox emails handed to SMTP",
+    ["result"],
+)
+smtp_connections_opened = Counter(
+    "smtp_connections_opened_total",
+    "SMTP connections opened by the outbox sender",
+)
+
+
+def render_metrics() -> bytes:
+    if MULTIPROC_DIR_ENV not in os.environ:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def metrics_shutdown() -> None:
+    # Drops this worker's share of live gauges such as the pool size.
+    if MULTIPROC_DIR_ENV in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -5,8 +5,16 @@ from fastapi import HTTPException
 from jose import JWTError, jwt
 from pydantic import ValidationError
 from shared.schemas.token import TokenSchema
+from shared.utils.cache import TTLCache
 from starlette import status
 
+# Tokens are signed and immutable, so a verified token stays valid until
+# it expires; the cache only skips the signature check and parsing.
+token_cache: TTLCache[str, TokenSchema] = TTLCache(
+    maxsize=core_settings.JWT_CACHE_SIZE,
+    ttl=core_settings.JWT_CACHE_TTL,
+)
+
 
 def create_jwt_token(data: TokenSchema) -> str:
     return jwt.encode(
@@ -28,12 +36,18 @@ def parse_jwt_token(token: str) -> TokenSchema:
 def get_token(jwt_token: str | None) -> TokenSchema:
     if not jwt_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+    now = datetime.now(UTC)
+    if (cached := token_cache.get(jwt_token)) is not None:
+        if cached.expires_in <= now:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        return cached
     try:
         token = parse_jwt_token(jwt_token)
-        if token.expires_in <= datetime.now(UTC):
+        if token.expires_in <= now:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     except JWTError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED) from e
     except ValidationError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED) from e
+    token_cache.set(jwt_token, token, (token.expires_in - now).total_seconds())
     return token
@@ -0,0 +1,173 @@
+import random
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from core.config import trace_settings
+from core.logs import logger
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    kind: str
+    span_id: str
+    parent_id: str | None
+    start: float
+    end: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Trace:
+    trace_id: str
+    sampled: bool
+    spans: list[Span] = field(default_factory=list)
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def tracing() -> bool:
+    """Whether spans are collected; wrappers skip everything else if not."""
+    return _current_trace.get() is not None
+
+
+def open_span(name: str, kind: str, **attributes: Any) -> Span | None:
+    """Start a child of the current span without making it current.
+
+    For callbacks that cannot wrap the traced code, e.g. SQLAlchemy
+    events; close it by setting end. Returns None outside a trace.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    parent = _current_span.get()
+    opened = Span(
+        name=name,
+        kind=kind,
+        span_id=_new_id(64),
+        parent_id=parent.span_id if parent is not None else None,
+        start=time.perf_counter(),
+        attributes=attributes,
+    )
+    trace.spans.append(opened)
+    return opened
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[Span | None]:
+    opened = open_span(name, kind, **attributes)
+    if opened is None:
+        yield None
+        return
+    token = _current_span.set(opened)
+    try:
+        yield opened
+    except BaseException as e:
+        opened.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        opened.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def traced[**P, R](
+    name: str,
+    kind: str,
+) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+    def decorator(
+        func: Callable[P, Awaitable[R]],
+    ) -> Callable[P, Awaitable[R]]:
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if _current_trace.get() is None:
+                return await func(*args, **kwargs)
+            with span(name, kind):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_span_name() -> str | None:
+    current = _current_span.get()
+    return current.name if current is not None else None
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Trace | None]:
+    """Collect the spans of one unit of work and log them at the end.
+
+    The trace is logged when sampled by TRACE_SAMPLE_RATE or slower than
+    TRACE_SLOW_MS, as one event with every span and the exclusive time
+    per span kind.
+    """
+    sample_rate = trace_settings.TRACE_SAMPLE_RATE
+    slow_ms = trace_settings.TRACE_SLOW_MS
+    if not sample_rate and slow_ms is None:
+        yield None
+        return
+    trace = Trace(
+        trace_id=_new_id(128),
+        sampled=random.random() < sample_rate,  # noqa: S311
+    )
+    trace_token = _current_trace.set(trace)
+    try:
+        with span(name, "server", **attributes) as root:
+            yield trace
+    finally:
+        _current_trace.reset(trace_token)
+        duration_ms = (root.end - root.start) * 1000
+        if trace.sampled or (slow_ms is not None and duration_ms >= slow_ms):
+            _log_trace(trace)
+
+
+def _log_trace(trace: Trace) -> None:
+    root = trace.spans[0]
+    # Spans left open, e.g. by a failed query, end with the trace
+    for each in trace.spans:
+        if each.end is None:
+            each.end = root.end
+    children: Counter[str | None] = Counter()
+    for each in trace.spans[1:]:
+        children[each.parent_id] += each.end - each.start
+    own_by_kind: Counter[str] = Counter()
+    spans = []
+    for each in trace.spans:
+        duration = each.end - each.start
+        # Concurrent children can add up to more than the parent
+        own_by_kind[each.kind] += max(duration - children[each.span_id], 0)
+        spans.append(
+            {
+                "name": each.name,
+                "kind": each.kind,
+                "span_id": each.span_id,
+                "parent_id": each.parent_id,
+                "start_ms": round((each.start - root.start) * 1000, 2),
+                "duration_ms": round(duration * 1000, 2),
+                **each.attributes,
+            },
+        )
+    logger.info(
+        "Trace",
+        trace_id=trace.trace_id,
+        name=root.name,
+        duration_ms=round((root.end - root.start) * 1000, 2),
+        own_ms={
+            kind: round(value * 1000, 2)
+            for kind, value in own_by_kind.most_common()
+        },
+        spans=spans,
+    )
@@ -9,6 +9,8 @@ class PostgresSettings(BaseSettings):
     POSTGRES_PORT: int = 5432
     POSTGRES_HOST: str = "database"
     ENGINE: str = "postgresql"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
 
     @property
     def url_template(self) -> str:
@@ -38,3 +40,22 @@ class PostgresSettings(BaseSettings):
 
 
 postgres_settings = PostgresSettings()
+
+
+class PartitionSettings(BaseSettings):
+    PARTITIONS_MONTHS_AHEAD: int = 3
+    # Detach monthly partitions older than this many months; keep all if unset
+    PARTITIONS_DETACH_AFTER_MONTHS: int | None = None
+    PARTITIONS_MAINTENANCE_INTERVAL: int = 6 * 60 * 60
+
+
+partition_settings = PartitionSettings()
+
+
+class RetentionSettings(BaseSettings):
+    # Archive completed sessions older than this many months; off if unset
+    RETENTION_ARCHIVE_AFTER_MONTHS: int | None = None
+    RETENTION_BATCH_SIZE: int = 1000
+
+
+retention_settings = RetentionSettings()
@@ -0,0 +1,55 @@
+import time
+from typing import Any
+
+from core.metrics import db_pool_checked_out, db_queries
+from core.tracing import open_span
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+QUERY_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+TRACE_SPAN_KEY = "trace_span"
+# Characters of the statement kept in its span
+TRACE_STATEMENT_LIMIT = 200
+
+
+def _operation(statement: str) -> str:
+    words = statement.lstrip()[:8].split(maxsplit=1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in QUERY_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count statements and checked out connections of the engine.
+
+    Statements also become db spans of the current trace.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _count_query(
+        connection: Connection,
+        _cursor: Any,
+        statement: str,
+        *_: Any,
+    ) -> None:
+        operation = _operation(statement)
+        db_queries.labels(operation=operation).inc()
+        connection.info[TRACE_SPAN_KEY] = open_span(
+            f"db.{operation}",
+            "db",
+            statement=statement[:TRACE_STATEMENT_LIMIT],
+        )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _end_query(connection: Connection, *_: Any) -> None:
+        opened = connection.info.pop(TRACE_SPAN_KEY, None)
+        if opened is not None:
+            opened.end = time.perf_counter()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def _checkout(*_: Any) -> None:
+        db_pool_checked_out.inc()
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def _checkin(*_: Any) -> None:
+        db_pool_checked_out.dec()
@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Sessions first: partitions are created in this order and detached in
+# reverse, so answers never reference a detached session partition. The
+# detached answers lose their FK to sessions, see drop_detached_foreign_keys.
+PARTITIONED_TABLES = ("checklist_sessions", "checklist_answers")
+PARTITION_SUFFIX_FORMAT = "p%Y_%m"
+
+
+@dataclass(frozen=True, slots=True)
+class MonthlyPartition:
+    table: str
+    month: date
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_{self.month.strftime(PARTITION_SUFFIX_FORMAT)}"
+
+    @property
+    def lower_bound(self) -> datetime:
+        return datetime(self.month.year, self.month.month, 1, tzinfo=UTC)
+
+    @property
+    def upper_bound(self) -> datetime:
+        upper = add_months(self.month, 1)
+        return datetime(upper.year, upper.month, 1, tzinfo=UTC)
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_partition_month(table: str, name: str) -> date | None:
+    prefix = f"{table}_"
+    if not name.startswith(prefix):
+        return None
+    try:
+        parsed = datetime.strptime(
+            name.removeprefix(prefix),
+            PARTITION_SUFFIX_FORMAT,
+        ).replace(tzinfo=UTC)
+    except ValueError:
+        return None
+    return parsed.date()
+
+
+async def list_partitions(
+    connection: AsyncConnection,
+    table: str,
+) -> list[MonthlyPartition]:
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)",
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for (name,) in result:
+        month = parse_partition_month(table, name)
+        if month is not None:
+            partitions.append(MonthlyPartition(table, month))
+    return sorted(partitions, key=lambda partition: partition.month)
+
+
+async def create_partition(
+    connection: AsyncConnection,
+    partition: MonthlyPartition,
+) -> None:
+    # There is no default partition (it would rule out detaching
+    # concurrently), so rows of a month need its partition up front.
+    await connection.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition.name} "
+            f"PARTITION OF {partition.table} FOR VALUES "
+            f"FROM ('{partition.lower_bound.isoformat()}') "
+            f"TO ('{partition.upper_bound.isoformat()}')",
+        ),
+    )
+
+
+async def detach_partition(
+    connection: AsyncConnection,
+    partition: MonthlyPartition,
+) -> None:
+    # CONCURRENTLY only takes SHARE UPDATE EXCLUSIVE on the parent, so
+    # sessions and answers keep being written; it needs autocommit. The
+    # detached table keeps its rows and name for archival.
+    await connection.execute(
+        text(
+            f"ALTER TABLE {partition.table} "
+            f"DETACH PARTITION {partition.name} CONCURRENTLY",
+        ),
+    )
+
+
+async def finalize_pending_detaches(
+    connection: AsyncConnection,
+) -> list[MonthlyPartition]:
+    # A concurrent detach interrupted halfway leaves the partition pending
+    # and blocks any other detach on its parent until finalized.
+    result = await connection.execute(
+        text(
+            "SELECT parent.relname, child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE pg_inherits.inhdetachpending "
+            "AND parent.relname = ANY(:parents)",
+        ),
+        {"parents": list(PARTITIONED_TABLES)},
+    )
+    finalized = []
+    for parent, child in result.all():
+        await connection.execute(
+            text(f"ALTER TABLE {parent} DETACH PARTITION {child} FINALIZE"),
+        )
+        month = parse_partition_month(parent, child)
+        if month is not None:
+            finalized.append(MonthlyPartition(parent, month))
+    return finalized
+
+
+async def drop_detached_foreign_keys(connection: AsyncConnection) -> None:
+    # A detached answers table keeps its own copy of the FK to the
+    # partitioned sessions, and Postgres then refuses to detach the
+    # sessions partition it references.
+    result = await connection.execute(
+        text(
+            "SELECT child.relname, pg_constraint.conname FROM pg_constraint "
+            "JOIN pg_class AS child ON child.oid = pg_constraint.conrelid "
+            "WHERE pg_constraint.contype = 'f' "
+            "AND child.relkind = 'r' AND NOT child.relispartition "
+            "AND pg_constraint.confrelid::regclass::text = ANY(:parents)",
+        ),
+        {"parents": list(PARTITIONED_TABLES)},
+    )
+    for table, name in result.all():
+        await connection.execute(
+            text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'),
+        )
+
+
+async def ensure_partitions(
+    connection: AsyncConnection,
+    *,
+    today: date,
+    months_ahead: int,
+) -> list[MonthlyPartition]:
+    current = month_start(today)
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = {
+            partition.month
+            for partition in await list_partitions(connection, table)
+        }
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            partition = MonthlyPartition(table, month)
+            await create_partition(connection, partition)
+            created.append(partition)
+    return created
+
+
+async def detach_partitions_before(
+    connection: AsyncConnection,
+    *,
+    before: date,
+) -> list[MonthlyPartition]:
+    """Detach the partitions of months before the given one.
+
+    Runs in autocommit, one statement at a time, so a run interrupted at
+    any point is completed by the next one.
+    """
+    detached = await finalize_pending_detaches(connection)
+    await drop_detached_foreign_keys(connection)
+    for table in reversed(PARTITIONED_TABLES):
+        for partition in await list_partitions(connection, table):
+            if partition.month >= month_start(before):
+                continue
+            await detach_partition(connection, partition)
+            detached.append(partition)
+        await drop_detached_foreign_keys(connection)
+    return detached
@@ -0,0 +1,107 @@
+import asyncio
+from contextlib import suppress
+
+from core.config import core_settings, email_settings
+from core.logs import logger
+from db.config import partition_settings
+from di import container
+from dishka import Scope
+from services.app_settings import AppSettingsCache
+from services.checklist import ChecklistFlowService
+from services.checklist_archive import ChecklistArchiveService
+from services.partitions import PartitionMaintenanceService
+from services.position_change import PositionChangeRequestService
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+maintenance_task: asyncio.Task | None = None
+digest_task: asyncio.Task | None = None
+
+
+async def run_partition_maintenance() -> None:
+    try:
+        async with container(scope=Scope.REQUEST) as request_container:
+            service = await request_container.get(PartitionMaintenanceService)
+            await service.run()
+    except Exception as e:  # noqa: BLE001
+        logger.exception(f"Partition maintenance failed: {e}", exc_info=e)
+
+
+async def run_checklist_archival() -> None:
+    # Concurrent workers skip each other's locked rows.
+    try:
+        async with container(scope=Scope.REQUEST) as request_container:
+            service = await request_container.get(ChecklistArchiveService)
+            await service.archive_completed()
+    except Exception as e:  # noqa: BLE001
+        logger.exception(f"Checklist archival failed: {e}", exc_info=e)
+
+
+async def run_position_change_digest() -> None:
+    # Concurrent workers skip each other's claimed requests.
+    try:
+        async with container(scope=Scope.REQUEST) as request_container:
+            service = await request_container.get(
+                PositionChangeRequestService,
+            )
+            await service.send_digest()
+    except Exception as e:  # noqa: BLE001
+        logger.exception(f"Position change digest failed: {e}", exc_info=e)
+
+
+async def _digest_loop() -> None:
+    while True:
+        await run_position_change_digest()
+        await asyncio.sleep(email_settings.POSITION_CHANGE_DIGEST_INTERVAL)
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        await run_checklist_archival()
+        await asyncio.sleep(partition_settings.PARTITIONS_MAINTENANCE_INTERVAL)
+        await run_partition_maintenance()
+
+
+async def warm_up() -> None:
+    # Opens pooled connections up front and fills the question cache, so
+    # the first users after a deploy do not pay for it
+    engine = await container.get(AsyncEngine)
+    size = min(core_settings.WARMUP_DB_CONNECTIONS, engine.pool.size())
+    connections = await asyncio.gather(
+        *(engine.connect() for _ in range(size)),
+    )
+    for connection in connections:
+        await connection.close()
+    async with container(scope=Scope.REQUEST) as request_container:
+        service = await request_container.get(ChecklistFlowService)
+        checklists = await service.preload_questions()
+    logger.info("Caches warmed up", connections=size, checklists=checklists)
+
+
+async def db_startup() -> None:
+    global maintenance_task, digest_task
+    logger.info("Ensuring checklist partitions")
+    await run_partition_maintenance()
+    maintenance_task = asyncio.create_task(_maintenance_loop())
+    logger.info("Loading app settings")
+    settings_cache = await container.get(AppSettingsCache)
+    try:
+        await settings_cache.start()
+    except Exception as e:  # noqa: BLE001
+        logger.exception(f"Error loading app settings: {e}", exc_info=e)
+    try:
+        await warm_up()
+    except Exception as e:  # noqa: BLE001
+        logger.exception(f"Error warming up caches: {e}", exc_info=e)
+    digest_task = asyncio.create_task(_digest_loop())
+
+
+async def db_shutdown() -> None:
+    global maintenance_task, digest_task
+    settings_cache = await container.get(AppSettingsCache)
+    await settings_cache.stop()
+    for task in (maintenance_task, digest_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    maintenance_task = digest_task = None
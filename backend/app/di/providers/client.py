@@ -1,12 +1,12 @@
 from aiogram import Bot, Dispatcher
-from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.session.base import BaseSession
 from dishka import Provider, Scope, provide
 from telegram.config import telegram_settings
 
 
 class ClientProvider(Provider):
     @provide(scope=Scope.APP)
-    def bot_provider(self, session: AiohttpSession) -> Bot:
+    def bot_provider(self, session: BaseSession) -> Bot:
         return Bot(
             token=telegram_settings.TELEGRAM_BOT_TOKEN.get_secret_value(),
             session=session,
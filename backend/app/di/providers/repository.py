@@ -4,22 +4,30 @@ from repositories.checklist import (
     ChecklistGroupRepository,
     ChecklistQuestionRepository,
     ChecklistRepository,
+    ChecklistSessionArchiveRepository,
     ChecklistSessionRepository,
     EmployeeRepository,
+    PositionChangeRequestRepository,
     PositionRepository,
 )
+from repositories.email import OutboxEmailRepository
 from repositories.settings import AppSettingRepository
+from repositories.telegram import QueuedUpdateRepository
 from repositories.user import UserRepository
 
 repository_provider = Provider(scope=Scope.REQUEST)
 repository_provider.provide_all(
     UserRepository,
     PositionRepository,
+    PositionChangeRequestRepository,
     EmployeeRepository,
     ChecklistRepository,
     ChecklistQuestionRepository,
     ChecklistSessionRepository,
     ChecklistAnswerRepository,
     ChecklistGroupRepository,
+    ChecklistSessionArchiveRepository,
     AppSettingRepository,
+    QueuedUpdateRepository,
+    OutboxEmailRepository,
 )
@@ -1,13 +1,17 @@
 from dishka import Provider, Scope
-from services.app_settings import AppSettingsService
+from services.app_settings import AppSettingsCache, AppSettingsService
 from services.checklist import ChecklistFlowService
+from services.checklist_archive import ChecklistArchiveService
 from services.email import EmailService
+from services.email_outbox import EmailOutboxSender
 from services.employee_import import EmployeeImportService
-from services.health import HealthCheckService
+from services.health import HealthCheckService, HealthMonitor
+from services.partitions import PartitionMaintenanceService
 from services.position_change import PositionChangeRequestService
 from services.referral_system import ReferralSystemService
 from services.telegram import TelegramService
 from services.telegram_auth import TelegramAuthService
+from services.telegram_coordinator import TelegramCoordinator
 from services.user import UserService
 
 service_provider = Provider(scope=Scope.REQUEST)
@@ -22,4 +26,10 @@ service_provider.provide_all(
     AppSettingsService,
     EmailService,
     PositionChangeRequestService,
+    PartitionMaintenanceService,
+    ChecklistArchiveService,
 )
+service_provider.provide(AppSettingsCache, scope=Scope.APP)
+service_provider.provide(HealthMonitor, scope=Scope.APP)
+service_provider.provide(TelegramCoordinator, scope=Scope.APP)
+service_provider.provide(EmailOutboxSender, scope=Scope.APP)
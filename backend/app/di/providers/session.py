@@ -4,8 +4,11 @@ from typing import Any
 from aiogram.client.session.aiohttp import (
     AiohttpSession as AiogramAiohttpSession,
 )
+from aiogram.client.session.base import BaseSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
 from aiohttp import ClientSession as AiohttpClientSession
 from db.config import postgres_settings
+from db.metrics import instrument_engine
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -13,6 +16,10 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from telegram.config import telegram_settings
+from telegram.fake_api import create_fake_session
+from telegram.middlewares.request.metrics import BotApiMetricsMiddleware
+from telegram.middlewares.request.tracing import BotApiTracingMiddleware
 
 
 class SessionProvider(Provider):
@@ -25,16 +32,31 @@ class SessionProvider(Provider):
         await session.close()
 
     @provide(scope=Scope.APP)
-    async def get_aiogram_aiohttp_session(
+    async def get_aiogram_session(
         self,
-    ) -> AsyncGenerator[AiogramAiohttpSession, Any]:
-        session = AiogramAiohttpSession()
+    ) -> AsyncGenerator[BaseSession, Any]:
+        if telegram_settings.TELEGRAM_FAKE_API:
+            session = create_fake_session()
+        else:
+            api = PRODUCTION
+            if telegram_settings.TELEGRAM_API_URL:
+                api = TelegramAPIServer.from_base(
+                    telegram_settings.TELEGRAM_API_URL,
+                )
+            session = AiogramAiohttpSession(api=api)
+        session.middleware(BotApiMetricsMiddleware())
+        session.middleware(BotApiTracingMiddleware())
         yield session
         await session.close()
 
     @provide(scope=Scope.APP)
     async def get_async_engine(self) -> AsyncGenerator[AsyncEngine, Any]:
-        engine = create_async_engine(postgres_settings.async_url)
+        engine = create_async_engine(
+            postgres_settings.async_url,
+            pool_size=postgres_settings.DB_POOL_SIZE,
+            max_overflow=postgres_settings.DB_MAX_OVERFLOW,
+        )
+        instrument_engine(engine)
         yield engine
         await engine.dispose()
 
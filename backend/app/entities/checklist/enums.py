@@ -10,3 +10,5 @@ class ChecklistAnswerValue(str, Enum):
 class ChecklistSessionStatus(str, Enum):
     IN_PROGRESS = "IN_PROGRESS"
     COMPLETED = "COMPLETED"
+    # Superseded by a newer session of the same user, never finished
+    ABANDONED = "ABANDONED"
@@ -0,0 +1,2 @@
+class ChecklistSessionStartError(Exception):
+    pass
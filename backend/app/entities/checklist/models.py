@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import UTC, datetime
 
 from entities.checklist.enums import (
     ChecklistAnswerValue,
@@ -12,6 +12,8 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    ForeignKeyConstraint,
+    Index,
     Integer,
     String,
     Table,
@@ -22,6 +24,7 @@ from sqlalchemy import (
 from sqlalchemy import (
     Enum as SQLEnum,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 position_group_table = Table(
@@ -94,6 +97,19 @@ class ChecklistGroup(DBModel, CreatedAtMixin, UpdatedAtMixin):
 
 class Checklist(DBModel, CreatedAtMixin, UpdatedAtMixin):
     __tablename__ = "checklists"
+    __table_args__ = (
+        Index(
+            "ix_checklists_group_active_created",
+            "group_id",
+            "is_active",
+            sql.text("created_at DESC"),
+        ),
+        Index(
+            "ix_checklists_default_created",
+            sql.text("created_at DESC"),
+            postgresql_where=sql.text("is_default IS TRUE"),
+        ),
+    )
 
     title: Mapped[str] = mapped_column(String(255))
     description: Mapped[str | None] = mapped_column(Text())
@@ -147,6 +163,29 @@ class ChecklistQuestion(DBModel, CreatedAtMixin, UpdatedAtMixin):
 
 class ChecklistSession(DBModel, CreatedAtMixin, UpdatedAtMixin):
     __tablename__ = "checklist_sessions"
+    __table_args__ = (
+        Index(
+            "ix_checklist_sessions_user_in_progress",
+            "user_id",
+            postgresql_where=sql.text("status = 'IN_PROGRESS'"),
+        ),
+        Index(
+            "ix_checklist_sessions_employee_status_completed",
+            "employee_id",
+            "status",
+            sql.text("completed_at DESC"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Monthly partition key, part of the primary key.
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(UTC).replace(tzinfo=None),
+        server_default=sql.func.now(),
+    )
 
     user_id: Mapped[int] = mapped_column(
         BigInteger(),
@@ -195,12 +234,23 @@ class ChecklistAnswer(DBModel, CreatedAtMixin, UpdatedAtMixin):
         UniqueConstraint(
             "session_id",
             "question_id",
+            "session_created_at",
             name="uq_checklist_answers_session_question",
         ),
+        ForeignKeyConstraint(
+            ["session_id", "session_created_at"],
+            ["checklist_sessions.id", "checklist_sessions.created_at"],
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (session_created_at)"},
     )
 
-    session_id: Mapped[int] = mapped_column(
-        ForeignKey("checklist_sessions.id", ondelete="CASCADE"),
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[int] = mapped_column(Integer())
+    # Partitioned together with the owning session.
+    session_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
     )
     question_id: Mapped[int] = mapped_column(
         ForeignKey("checklist_questions.id", ondelete="CASCADE"),
@@ -218,3 +268,64 @@ class ChecklistAnswer(DBModel, CreatedAtMixin, UpdatedAtMixin):
     question: Mapped[ChecklistQuestion] = relationship(
         back_populates="answers",
     )
+
+
+class ChecklistSessionArchive(DBModel):
+    # Completed sessions moved out of the partitioned tables, one row per
+    # session with its answers folded into a JSON array.
+    __tablename__ = "checklist_session_archive"
+    __table_args__ = (
+        Index(
+            "ix_checklist_session_archive_employee_completed",
+            "employee_id",
+            sql.text("completed_at DESC"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(BigInteger())
+    employee_id: Mapped[int] = mapped_column(Integer())
+    checklist_id: Mapped[int] = mapped_column(Integer())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    feedback_text: Mapped[str | None] = mapped_column(Text())
+    feedback_voice_file_id: Mapped[str | None] = mapped_column(String(512))
+    feedback_voice_unique_id: Mapped[str | None] = mapped_column(String(255))
+    feedback_submitted_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+    )
+    answers: Mapped[list[dict]] = mapped_column(JSONB)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=sql.func.now(),
+    )
+
+
+class PositionChangeRequest(DBModel, CreatedAtMixin):
+    # Requests waiting for the next digest email. A tab number has at most
+    # one pending row; repeated requests only bump request_count.
+    __tablename__ = "position_change_requests"
+    __table_args__ = (
+        Index(
+            "uq_position_change_requests_pending_tab_number",
+            "tab_number",
+            unique=True,
+            postgresql_where=sql.text("notified_at IS NULL"),
+        ),
+    )
+
+    tab_number: Mapped[str] = mapped_column(String(50))
+    employee_id: Mapped[int] = mapped_column(
+        ForeignKey("employees.id", ondelete="CASCADE"),
+    )
+    position_name: Mapped[str | None] = mapped_column(String(255))
+    user_id: Mapped[int] = mapped_column(BigInteger())
+    tg_username: Mapped[str | None] = mapped_column(String(200))
+    request_count: Mapped[int] = mapped_column(Integer(), server_default="1")
+    last_requested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=sql.func.now(),
+    )
+    notified_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+    )
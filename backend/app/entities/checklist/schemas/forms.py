@@ -20,6 +20,7 @@ class ChecklistSessionUpdateSchema(FormModel):
 
 class ChecklistAnswerCreateSchema(FormModel):
     session_id: int
+    session_created_at: datetime
     question_id: int
     answer: ChecklistAnswerValue
     photo_file_id: str | None = None
@@ -0,0 +1,5 @@
+from entities.email import models
+
+__all__ = [
+    "models",
+]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from shared.models.base import DBModel
+from shared.models.mixins import CreatedAtMixin
+from sqlalchemy import DateTime, Index, Integer, String, Text, sql
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class OutboxEmail(DBModel, CreatedAtMixin):
+    # Emails waiting for the background sender. The SMTP connection is
+    # read from the app setting settings_key when the email is sent, so
+    # credentials are never copied into the table.
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index(
+            "ix_email_outbox_pending_next_attempt",
+            "next_attempt_at",
+            postgresql_where=sql.text(
+                "sent_at IS NULL AND failed_at IS NULL",
+            ),
+        ),
+    )
+
+    settings_key: Mapped[str] = mapped_column(String(200))
+    from_email: Mapped[str] = mapped_column(String(320))
+    to_emails: Mapped[list[str]] = mapped_column(JSONB)
+    subject: Mapped[str] = mapped_column(String(500))
+    body: Mapped[str] = mapped_column(Text())
+    # Text attachments: [{"filename": ..., "subtype": ..., "content": ...}]
+    attachments: Mapped[list[dict] | None] = mapped_column(JSONB)
+    attempts: Mapped[int] = mapped_column(Integer(), server_default="0")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=sql.func.now(),
+    )
+    last_error: Mapped[str | None] = mapped_column(Text())
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    failed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+    )
+
+
+__all__ = ["OutboxEmail"]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from shared.models.base import DBModel
 from shared.models.mixins import CreatedAtMixin, UpdatedAtMixin
-from sqlalchemy import String
+from sqlalchemy import BigInteger, String
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -15,4 +15,16 @@ class AppSetting(DBModel, CreatedAtMixin, UpdatedAtMixin):
     description: Mapped[str | None] = mapped_column(String(500))
 
 
-__all__ = ["AppSetting"]
+class AppSettingsVersion(DBModel):
+    """Single row bumped by the app_settings trigger on every change.
+
+    Updated in the writing transaction, so a reader never sees a new
+    version together with the old values.
+    """
+
+    __tablename__ = "app_settings_version"
+
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+__all__ = ["AppSetting", "AppSettingsVersion"]
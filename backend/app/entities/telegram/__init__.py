@@ -0,0 +1,5 @@
+from entities.telegram import models
+
+__all__ = [
+    "models",
+]
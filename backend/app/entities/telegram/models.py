@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from shared.models.base import DBModel
+from shared.models.mixins import CreatedAtMixin
+from sqlalchemy import BigInteger, DateTime, Index, SmallInteger, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class QueuedUpdate(DBModel, CreatedAtMixin):
+    # Updates fetched by the polling leader, waiting for the worker that
+    # holds their shard. id is the Telegram update_id. Handled rows are
+    # kept for a while, so a batch fetched again by a new leader is skipped.
+    __tablename__ = "telegram_update_queue"
+    __table_args__ = (
+        Index(
+            "ix_telegram_update_queue_pending_shard_id",
+            "shard",
+            "id",
+            postgresql_where=text("handled_at IS NULL"),
+        ),
+        Index(
+            "ix_telegram_update_queue_handled_at",
+            "handled_at",
+            postgresql_where=text("handled_at IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        BigInteger(),
+        primary_key=True,
+        autoincrement=False,
+    )
+    shard: Mapped[int] = mapped_column(SmallInteger())
+    payload: Mapped[dict] = mapped_column(JSONB)
+    handled_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+    )
+
+
+__all__ = ["QueuedUpdate"]
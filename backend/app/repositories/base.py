@@ -1,15 +1,25 @@
-from collections.abc import Sequence
+import inspect
+from collections.abc import AsyncIterator, Callable, Sequence
+from functools import wraps
+from types import FunctionType
 from typing import Any, TypeVar
 
+from core.tracing import current_span_name, span, tracing
 from shared.models.base import DBModel
-from sqlalchemy import ClauseElement, exists, select
+from sqlalchemy import ClauseElement, Select, exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.base import ExecutableOption
 
 T = TypeVar("T", bound=DBModel)
 
+DEFAULT_PAGE_LIMIT = 500
+
 
 class BaseRepository[T]:
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        _trace_methods(cls)
+
     def __init__(self, model: type[T], session: AsyncSession) -> None:
         self.session = session
         self.model = model
@@ -38,6 +48,69 @@ class BaseRepository[T]:
         scalar = await self.session.scalars(stmt)
         return scalar.all()
 
+    async def list_page(
+        self,
+        *clause: ClauseElement[bool],
+        after_id: int | None = None,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        descending: bool = False,
+        options: Sequence[ExecutableOption] | None = None,
+    ) -> Sequence[T]:
+        # Keyset page: pass the last id of the previous page as after_id.
+        stmt = self._keyset_stmt(
+            *clause,
+            after_id=after_id,
+            limit=limit,
+            descending=descending,
+            options=options,
+        )
+        scalar = await self.session.scalars(stmt)
+        return scalar.all()
+
+    async def iter_pages(
+        self,
+        *clause: ClauseElement[bool],
+        limit: int = DEFAULT_PAGE_LIMIT,
+        descending: bool = False,
+        options: Sequence[ExecutableOption] | None = None,
+    ) -> AsyncIterator[Sequence[T]]:
+        # Each page is a separate query, so committing between pages is safe.
+        after_id = None
+        while True:
+            page = await self.list_page(
+                *clause,
+                after_id=after_id,
+                limit=limit,
+                descending=descending,
+                options=options,
+            )
+            if not page:
+                return
+            yield page
+            if len(page) < limit:
+                return
+            after_id = page[-1].id
+
+    def _keyset_stmt(
+        self,
+        *clause: ClauseElement[bool],
+        after_id: int | None,
+        limit: int,
+        descending: bool,
+        options: Sequence[ExecutableOption] | None,
+    ) -> Select[tuple[T]]:
+        options = options or []
+        stmt = select(self.model).where(*clause).options(*options)
+        if descending:
+            if after_id is not None:
+                stmt = stmt.where(self.model.id < after_id)
+            stmt = stmt.order_by(self.model.id.desc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(self.model.id > after_id)
+            stmt = stmt.order_by(self.model.id)
+        return stmt.limit(limit)
+
     async def exists(self, target_id: int) -> bool:
         stmt = select(exists().where(self.model.id == target_id))
         scalar = await self.session.scalars(stmt)
@@ -51,12 +124,33 @@ class BaseRepository[T]:
         return obj
 
     async def update(self, obj: T, obj_in: dict[str, Any]) -> T:
+        # The object may come from another session, e.g. the user loaded
+        # by the Telegram middleware
+        obj = await self.session.merge(obj)
         for key, value in obj_in.items():
             setattr(obj, key, value)
         await self.session.commit()
         await self.session.refresh(obj)
         return obj
 
+    async def update_by_ids(
+        self,
+        target_ids: Sequence[int],
+        obj_in: dict[str, Any],
+        *clause: ClauseElement[bool],
+    ) -> int:
+        if not target_ids:
+            return 0
+        stmt = (
+            update(self.model)
+            .where(self.model.id.in_(target_ids), *clause)
+            .values(**obj_in)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount
+
     async def put(self, target_id: int, obj_in: dict[str, Any]) -> T:
         if not (obj := await self.get(target_id)):
             return await self.create(obj_in)
@@ -72,3 +166,32 @@ class BaseRepository[T]:
     async def refresh(self, obj: T) -> T:
         await self.session.refresh(obj)
         return obj
+
+
+def _trace_methods(cls: type) -> None:
+    # Public coroutine methods run in a span named after the repository
+    for name, member in list(vars(cls).items()):
+        if (
+            not name.startswith("_")
+            and isinstance(member, FunctionType)
+            and inspect.iscoroutinefunction(member)
+        ):
+            setattr(cls, name, _traced_method(member))
+
+
+def _traced_method(func: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(func)
+    async def wrapper(self: BaseRepository, *args: Any, **kwargs: Any) -> Any:
+        if not tracing():
+            return await func(self, *args, **kwargs)
+        name = f"{type(self).__name__}.{func.__name__}"
+        # An override calling super() stays in one span
+        if current_span_name() == name:
+            return await func(self, *args, **kwargs)
+        with span(name, "repository"):
+            return await func(self, *args, **kwargs)
+
+    return wrapper
+
+
+_trace_methods(BaseRepository)
@@ -1,22 +1,115 @@
 from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import UTC, date, datetime, time
+from typing import Any
 
-from entities.checklist.enums import ChecklistSessionStatus
+from core.config import core_settings
+from entities.checklist.enums import (
+    ChecklistAnswerValue,
+    ChecklistSessionStatus,
+)
 from entities.checklist.models import (
     Checklist,
     ChecklistAnswer,
     ChecklistGroup,
     ChecklistQuestion,
     ChecklistSession,
+    ChecklistSessionArchive,
     Employee,
     Position,
+    PositionChangeRequest,
 )
 from repositories.base import BaseRepository
-from sqlalchemy import select
+from shared.utils.cache import TTLCache
+from sqlalchemy import (
+    ColumnElement,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 
+@dataclass(frozen=True, slots=True)
+class ChecklistSessionKey:
+    id: int
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistSessionRow:
+    id: int
+    user_id: int
+    employee_id: int
+    checklist_id: int
+    status: ChecklistSessionStatus
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistQuestionRow:
+    id: int
+    text: str
+    order: int
+    requires_photo: bool
+
+
+# Questions of a checklist, read on every answer. Checklists are edited in
+# SQL, so edits show up after CHECKLIST_CACHE_TTL at most.
+question_rows_cache: TTLCache[int, list[ChecklistQuestionRow]] = TTLCache(
+    maxsize=core_settings.CHECKLIST_CACHE_SIZE,
+    ttl=core_settings.CHECKLIST_CACHE_TTL,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistAnswerRow:
+    question_id: int
+    answer: ChecklistAnswerValue
+    photo_file_id: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class ChecklistReportRow:
+    session_id: int
+    checklist_id: int
+    # None for an archived session whose checklist or employee is gone
+    checklist_title: str | None
+    group_name: str | None
+    tab_number: str | None
+    employee_is_active: bool | None
+    position_name: str | None
+    feedback_text: str | None
+    feedback_voice_file_id: str | None
+
+
+def session_partition_clause(
+    created_at: datetime | None,
+) -> tuple[ColumnElement[bool], ...]:
+    # created_at is the partition key: passing it prunes the lookup to a
+    # single monthly partition instead of probing every one.
+    if created_at is None:
+        return ()
+    return (ChecklistSession.created_at == created_at,)
+
+
+def answer_partition_clause(
+    session_created_at: datetime | None,
+) -> tuple[ColumnElement[bool], ...]:
+    if session_created_at is None:
+        return ()
+    return (ChecklistAnswer.session_created_at == session_created_at,)
+
+
 class PositionRepository(BaseRepository[Position]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(Position, session)
@@ -42,11 +135,6 @@ class EmployeeRepository(BaseRepository[Employee]):
         scalar = await self.session.scalars(stmt)
         return scalar.one_or_none()
 
-    async def list_all(self) -> Sequence[Employee]:
-        stmt = select(Employee)
-        scalar = await self.session.scalars(stmt)
-        return scalar.all()
-
 
 class ChecklistGroupRepository(BaseRepository[ChecklistGroup]):
     def __init__(self, session: AsyncSession) -> None:
@@ -91,22 +179,38 @@ class ChecklistRepository(BaseRepository[Checklist]):
         scalar = await self.session.scalars(stmt)
         return scalar.one_or_none()
 
+    async def list_active_ids(self) -> list[int]:
+        stmt = select(Checklist.id).where(
+            or_(Checklist.is_active.is_(True), Checklist.is_default.is_(True)),
+        )
+        scalar = await self.session.scalars(stmt)
+        return list(scalar.all())
+
 
 class ChecklistQuestionRepository(BaseRepository[ChecklistQuestion]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(ChecklistQuestion, session)
 
-    async def list_for_checklist(
+    async def list_rows_for_checklist(
         self,
         checklist_id: int,
-    ) -> Sequence[ChecklistQuestion]:
+    ) -> list[ChecklistQuestionRow]:
+        if (rows := question_rows_cache.get(checklist_id)) is not None:
+            return list(rows)
         stmt = (
-            select(ChecklistQuestion)
+            select(
+                ChecklistQuestion.id,
+                ChecklistQuestion.text,
+                ChecklistQuestion.order,
+                ChecklistQuestion.requires_photo,
+            )
             .where(ChecklistQuestion.checklist_id == checklist_id)
             .order_by(ChecklistQuestion.order)
         )
-        scalar = await self.session.scalars(stmt)
-        return scalar.all()
+        result = await self.session.execute(stmt)
+        rows = [ChecklistQuestionRow(*row) for row in result]
+        question_rows_cache.set(checklist_id, rows)
+        return list(rows)
 
 
 class ChecklistSessionRepository(BaseRepository[ChecklistSession]):
@@ -117,74 +221,138 @@ class ChecklistSessionRepository(BaseRepository[ChecklistSession]):
         self,
         user_id: int,
     ) -> ChecklistSession | None:
-        stmt = (
-            select(ChecklistSession)
-            .where(
-                ChecklistSession.user_id == user_id,
-                ChecklistSession.status == ChecklistSessionStatus.IN_PROGRESS,
-            )
-            .options(selectinload(ChecklistSession.answers))
+        stmt = select(ChecklistSession).where(
+            ChecklistSession.user_id == user_id,
+            ChecklistSession.status == ChecklistSessionStatus.IN_PROGRESS,
         )
         scalar = await self.session.scalars(stmt)
         return scalar.one_or_none()
 
-    async def get_with_answers(
+    async def create_in_progress(
         self,
-        session_id: int,
+        *,
+        user_id: int,
+        employee_id: int,
+        checklist_id: int,
     ) -> ChecklistSession | None:
-        stmt = (
-            select(ChecklistSession)
-            .where(ChecklistSession.id == session_id)
-            .options(
-                selectinload(ChecklistSession.answers).selectinload(
-                    ChecklistAnswer.question,
-                ),
-                selectinload(ChecklistSession.checklist).selectinload(
-                    Checklist.questions,
-                ),
-                selectinload(ChecklistSession.checklist).selectinload(
-                    Checklist.group,
-                ),
-                selectinload(ChecklistSession.employee).selectinload(
-                    Employee.position,
+        # A partitioned table cannot hold a per-user unique index, so
+        # creation is serialized per user with a transaction-level advisory
+        # lock. Returns None when the user already has a running session.
+        await self.session.execute(select(func.pg_advisory_xact_lock(user_id)))
+        running = await self.session.scalar(
+            select(
+                exists().where(
+                    ChecklistSession.user_id == user_id,
+                    ChecklistSession.status
+                    == ChecklistSessionStatus.IN_PROGRESS,
                 ),
+            ),
+        )
+        if running:
+            await self.session.commit()
+            return None
+        stmt = (
+            insert(ChecklistSession)
+            .values(
+                user_id=user_id,
+                employee_id=employee_id,
+                checklist_id=checklist_id,
+                status=ChecklistSessionStatus.IN_PROGRESS,
             )
+            .returning(ChecklistSession)
         )
         scalar = await self.session.scalars(stmt)
-        return scalar.one_or_none()
+        created = scalar.one()
+        await self.session.commit()
+        return created
+
+    async def get_row(
+        self,
+        session_id: int,
+        created_at: datetime | None = None,
+    ) -> ChecklistSessionRow | None:
+        stmt = select(
+            ChecklistSession.id,
+            ChecklistSession.user_id,
+            ChecklistSession.employee_id,
+            ChecklistSession.checklist_id,
+            ChecklistSession.status,
+            ChecklistSession.created_at,
+        ).where(
+            ChecklistSession.id == session_id,
+            *session_partition_clause(created_at),
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return ChecklistSessionRow(*row) if row else None
 
-    async def get_completed_for_employee_on_date(
+    async def update_by_key(
+        self,
+        session_id: int,
+        created_at: datetime | None,
+        obj_in: dict[str, Any],
+    ) -> int:
+        return await self.update_by_ids(
+            [session_id],
+            obj_in,
+            *session_partition_clause(created_at),
+        )
+
+    async def get_report_row(
+        self,
+        session_id: int,
+        created_at: datetime | None = None,
+    ) -> ChecklistReportRow | None:
+        stmt = (
+            select(
+                ChecklistSession.id,
+                ChecklistSession.checklist_id,
+                Checklist.title,
+                ChecklistGroup.name,
+                Employee.tab_number,
+                Employee.is_active,
+                Position.name,
+                ChecklistSession.feedback_text,
+                ChecklistSession.feedback_voice_file_id,
+            )
+            .join(Checklist, Checklist.id == ChecklistSession.checklist_id)
+            .join(Employee, Employee.id == ChecklistSession.employee_id)
+            .outerjoin(ChecklistGroup, ChecklistGroup.id == Checklist.group_id)
+            .outerjoin(Position, Position.id == Employee.position_id)
+            .where(
+                ChecklistSession.id == session_id,
+                *session_partition_clause(created_at),
+            )
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return ChecklistReportRow(*row) if row else None
+
+    async def get_completed_key_for_employee_on_date(
         self,
         employee_id: int,
         target_date: date,
-    ) -> ChecklistSession | None:
+    ) -> ChecklistSessionKey | None:
         start = datetime.combine(target_date, time.min, tzinfo=UTC)
         end = datetime.combine(target_date, time.max, tzinfo=UTC)
         stmt = (
-            select(ChecklistSession)
+            select(ChecklistSession.id, ChecklistSession.created_at)
             .where(
                 ChecklistSession.employee_id == employee_id,
                 ChecklistSession.status == ChecklistSessionStatus.COMPLETED,
                 ChecklistSession.completed_at.is_not(None),
                 ChecklistSession.completed_at >= start,
                 ChecklistSession.completed_at <= end,
+                # A session is created before it completes, which prunes
+                # every partition after the requested day.
+                ChecklistSession.created_at <= end,
             )
             .order_by(ChecklistSession.completed_at.desc())
-            .options(
-                selectinload(ChecklistSession.answers).selectinload(
-                    ChecklistAnswer.question,
-                ),
-                selectinload(ChecklistSession.checklist).selectinload(
-                    Checklist.questions,
-                ),
-                selectinload(ChecklistSession.employee).selectinload(
-                    Employee.position,
-                ),
-            )
             .limit(1)
         )
-        scalar = await self.session.scalars(stmt)
-        return scalar.one_or_none()
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return ChecklistSessionKey(*row) if row else None
 
 
 class ChecklistAnswerRepository(BaseRepository[ChecklistAnswer]):
@@ -195,17 +363,260 @@ class ChecklistAnswerRepository(BaseRepository[ChecklistAnswer]):
         self,
         session_id: int,
         question_id: int,
+        session_created_at: datetime | None = None,
     ) -> ChecklistAnswer | None:
         stmt = select(ChecklistAnswer).where(
             ChecklistAnswer.session_id == session_id,
+            *answer_partition_clause(session_created_at),
             ChecklistAnswer.question_id == question_id,
         )
         scalar = await self.session.scalars(stmt)
         return scalar.one_or_none()
 
-    async def list_question_ids_for_session(self, session_id: int) -> set[int]:
+    async def list_question_ids_for_session(
+        self,
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> set[int]:
         stmt = select(ChecklistAnswer.question_id).where(
             ChecklistAnswer.session_id == session_id,
+            *answer_partition_clause(session_created_at),
         )
         scalar = await self.session.scalars(stmt)
         return set(scalar.all())
+
+    async def list_rows_for_session(
+        self,
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> list[ChecklistAnswerRow]:
+        stmt = select(
+            ChecklistAnswer.question_id,
+            ChecklistAnswer.answer,
+            ChecklistAnswer.photo_file_id,
+        ).where(
+            ChecklistAnswer.session_id == session_id,
+            *answer_partition_clause(session_created_at),
+        )
+        result = await self.session.execute(stmt)
+        return [ChecklistAnswerRow(*row) for row in result]
+
+
+class ChecklistSessionArchiveRepository(
+    BaseRepository[ChecklistSessionArchive],
+):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(ChecklistSessionArchive, session)
+
+    async def archive_completed_before(
+        self,
+        cutoff: datetime,
+        limit: int,
+    ) -> int:
+        # Moves one batch in a single transaction; deleting the sessions
+        # cascades to their answers.
+        keys_stmt = (
+            select(ChecklistSession.id, ChecklistSession.created_at)
+            .where(
+                ChecklistSession.status == ChecklistSessionStatus.COMPLETED,
+                ChecklistSession.completed_at < cutoff,
+                # Sessions are created before they complete, so only
+                # partitions older than the cutoff are scanned.
+                ChecklistSession.created_at < cutoff,
+            )
+            .order_by(ChecklistSession.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        keys = (await self.session.execute(keys_stmt)).tuples().all()
+        if not keys:
+            await self.session.commit()
+            return 0
+        key_clause = tuple_(
+            ChecklistSession.id,
+            ChecklistSession.created_at,
+        ).in_(keys)
+
+        answers = (
+            select(
+                func.coalesce(
+                    func.jsonb_agg(
+                        aggregate_order_by(
+                            func.jsonb_build_object(
+                                literal("question_id"),
+                                ChecklistAnswer.question_id,
+                                literal("answer"),
+                                ChecklistAnswer.answer,
+                                literal("photo_file_id"),
+                                ChecklistAnswer.photo_file_id,
+                                literal("photo_unique_id"),
+                                ChecklistAnswer.photo_unique_id,
+                            ),
+                            ChecklistAnswer.question_id,
+                        ),
+                    ),
+                    literal([], ChecklistSessionArchive.answers.type),
+                ),
+            )
+            .where(
+                ChecklistAnswer.session_id == ChecklistSession.id,
+                ChecklistAnswer.session_created_at
+                == ChecklistSession.created_at,
+            )
+            .scalar_subquery()
+        )
+        source = select(
+            ChecklistSession.id,
+            ChecklistSession.user_id,
+            ChecklistSession.employee_id,
+            ChecklistSession.checklist_id,
+            ChecklistSession.created_at,
+            ChecklistSession.completed_at,
+            ChecklistSession.feedback_text,
+            ChecklistSession.feedback_voice_file_id,
+            ChecklistSession.feedback_voice_unique_id,
+            ChecklistSession.feedback_submitted_at,
+            answers,
+        ).where(key_clause)
+        await self.session.execute(
+            insert(ChecklistSessionArchive).from_select(
+                [
+                    ChecklistSessionArchive.id,
+                    ChecklistSessionArchive.user_id,
+                    ChecklistSessionArchive.employee_id,
+                    ChecklistSessionArchive.checklist_id,
+                    ChecklistSessionArchive.created_at,
+                    ChecklistSessionArchive.completed_at,
+                    ChecklistSessionArchive.feedback_text,
+                    ChecklistSessionArchive.feedback_voice_file_id,
+                    ChecklistSessionArchive.feedback_voice_unique_id,
+                    ChecklistSessionArchive.feedback_submitted_at,
+                    ChecklistSessionArchive.answers,
+                ],
+                source,
+            ),
+        )
+        await self.session.execute(
+            delete(ChecklistSession)
+            .where(key_clause)
+            .execution_options(synchronize_session=False),
+        )
+        await self.session.commit()
+        return len(keys)
+
+    async def get_report_for_employee_on_date(
+        self,
+        employee_id: int,
+        target_date: date,
+    ) -> tuple[ChecklistReportRow, list[ChecklistAnswerRow]] | None:
+        start = datetime.combine(target_date, time.min, tzinfo=UTC)
+        end = datetime.combine(target_date, time.max, tzinfo=UTC)
+        stmt = (
+            select(
+                ChecklistSessionArchive.id,
+                ChecklistSessionArchive.checklist_id,
+                Checklist.title,
+                ChecklistGroup.name,
+                Employee.tab_number,
+                Employee.is_active,
+                Position.name,
+                ChecklistSessionArchive.feedback_text,
+                ChecklistSessionArchive.feedback_voice_file_id,
+                ChecklistSessionArchive.answers,
+            )
+            # Archived rows outlive their checklist and employee
+            .outerjoin(
+                Checklist,
+                Checklist.id == ChecklistSessionArchive.checklist_id,
+            )
+            .outerjoin(
+                Employee,
+                Employee.id == ChecklistSessionArchive.employee_id,
+            )
+            .outerjoin(ChecklistGroup, ChecklistGroup.id == Checklist.group_id)
+            .outerjoin(Position, Position.id == Employee.position_id)
+            .where(
+                ChecklistSessionArchive.employee_id == employee_id,
+                ChecklistSessionArchive.completed_at >= start,
+                ChecklistSessionArchive.completed_at <= end,
+            )
+            .order_by(ChecklistSessionArchive.completed_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        *report, answers = row
+        return ChecklistReportRow(*report), [
+            ChecklistAnswerRow(
+                question_id=answer["question_id"],
+                answer=ChecklistAnswerValue(answer["answer"]),
+                photo_file_id=answer["photo_file_id"],
+            )
+            for answer in answers
+        ]
+
+
+class PositionChangeRequestRepository(BaseRepository[PositionChangeRequest]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(PositionChangeRequest, session)
+
+    async def record(
+        self,
+        employee: Employee,
+        user_id: int,
+        tg_username: str | None,
+    ) -> None:
+        # Repeated requests for a pending tab number update its row
+        stmt = pg_insert(PositionChangeRequest).values(
+            tab_number=employee.tab_number,
+            employee_id=employee.id,
+            position_name=employee.position.name
+            if employee.position
+            else None,
+            user_id=user_id,
+            tg_username=tg_username,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PositionChangeRequest.tab_number],
+            index_where=PositionChangeRequest.notified_at.is_(None),
+            set_={
+                "request_count": PositionChangeRequest.request_count + 1,
+                "last_requested_at": func.now(),
+                "position_name": stmt.excluded.position_name,
+                "user_id": stmt.excluded.user_id,
+                "tg_username": stmt.excluded.tg_username,
+            },
+        )
+        await self.session.execute(stmt)
+        await self.session.commit()
+
+    async def pending_since(self) -> datetime | None:
+        stmt = select(func.min(PositionChangeRequest.created_at)).where(
+            PositionChangeRequest.notified_at.is_(None),
+        )
+        return await self.session.scalar(stmt)
+
+    async def claim_pending(self) -> Sequence[PositionChangeRequest]:
+        """Mark every pending request as notified and return them.
+
+        Not committed: the caller commits together with the digest email,
+        so a failure leaves the requests pending. Rows locked by another
+        worker's digest are skipped.
+        """
+        claimed = (
+            select(PositionChangeRequest.id)
+            .where(PositionChangeRequest.notified_at.is_(None))
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(PositionChangeRequest)
+            .where(PositionChangeRequest.id.in_(claimed))
+            .values(notified_at=func.now())
+            .returning(PositionChangeRequest)
+            .execution_options(synchronize_session=False)
+        )
+        requests = (await self.session.scalars(stmt)).all()
+        return sorted(requests, key=lambda request: request.created_at)
@@ -0,0 +1,75 @@
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from entities.email.models import OutboxEmail
+from repositories.base import BaseRepository
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PENDING = (OutboxEmail.sent_at.is_(None), OutboxEmail.failed_at.is_(None))
+
+
+class OutboxEmailRepository(BaseRepository[OutboxEmail]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(OutboxEmail, session)
+
+    async def claim_due(
+        self,
+        limit: int,
+        lease: timedelta,
+    ) -> Sequence[OutboxEmail]:
+        """Take due emails and push their next attempt past the lease.
+
+        A sender that dies mid-batch leaves its emails to be picked up
+        again once the lease expires; the attempt is already counted.
+        """
+        claimed = (
+            select(OutboxEmail.id)
+            .where(*PENDING, OutboxEmail.next_attempt_at <= func.now())
+            .order_by(OutboxEmail.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(OutboxEmail)
+            .where(OutboxEmail.id.in_(claimed))
+            .values(
+                attempts=OutboxEmail.attempts + 1,
+                next_attempt_at=func.now() + lease,
+            )
+            .returning(OutboxEmail)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.scalars(stmt)
+        emails = result.all()
+        await self.session.commit()
+        return sorted(emails, key=lambda email: email.id)
+
+    async def mark_sent(self, target_ids: Sequence[int]) -> int:
+        return await self.update_by_ids(
+            target_ids,
+            {"sent_at": func.now(), "last_error": None},
+        )
+
+    async def mark_failed(
+        self,
+        email: OutboxEmail,
+        error: str,
+        retry_in: timedelta | None,
+    ) -> None:
+        # Without retry_in the email is given up on
+        values = {"last_error": error}
+        if retry_in is None:
+            values["failed_at"] = func.now()
+        else:
+            values["next_attempt_at"] = func.now() + retry_in
+        await self.update_by_ids([email.id], values)
+
+    async def pending_stats(self) -> tuple[int, datetime | None]:
+        stmt = select(func.count(), func.min(OutboxEmail.created_at)).where(
+            *PENDING,
+        )
+        result = await self.session.execute(stmt)
+        count, oldest = result.one()
+        return count, oldest
@@ -1,4 +1,6 @@
-from entities.settings.models import AppSetting
+from typing import Any
+
+from entities.settings.models import AppSetting, AppSettingsVersion
 from repositories.base import BaseRepository
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,3 +14,12 @@ class AppSettingRepository(BaseRepository[AppSetting]):
         stmt = select(AppSetting).where(AppSetting.key == key)
         scalar = await self.session.scalars(stmt)
         return scalar.one_or_none()
+
+    async def load_values(self) -> dict[str, Any]:
+        stmt = select(AppSetting.key, AppSetting.value)
+        result = await self.session.execute(stmt)
+        return dict(result.tuples().all())
+
+    async def get_version(self) -> int:
+        stmt = select(AppSettingsVersion.version)
+        return await self.session.scalar(stmt) or 0
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from typing import Any
+
+from entities.telegram.models import QueuedUpdate
+from repositories.base import BaseRepository
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TELEGRAM_UPDATES_CHANNEL = "telegram_updates"
+# Telegram keeps unconfirmed updates for 24 hours, so a new leader can
+# fetch again no batch older than that
+HANDLED_RETENTION = timedelta(days=1)
+
+
+class QueuedUpdateRepository(BaseRepository[QueuedUpdate]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(QueuedUpdate, session)
+
+    async def enqueue(self, rows: list[dict[str, Any]]) -> None:
+        # A new leader fetches again the last batch of the previous one,
+        # which is still here, handled or not, and is skipped.
+        stmt = (
+            insert(QueuedUpdate)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[QueuedUpdate.id])
+        )
+        await self.session.execute(stmt)
+        await self.session.execute(
+            delete(QueuedUpdate).where(
+                QueuedUpdate.handled_at < func.now() - HANDLED_RETENTION,
+            ),
+        )
+        await self.session.execute(
+            select(func.pg_notify(TELEGRAM_UPDATES_CHANNEL, "")),
+        )
+        await self.session.commit()
+
+    async def claim(
+        self,
+        shard: int,
+        shards: int,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Mark handled and return the oldest pending updates of a shard.
+
+        Shard 0 also takes rows of shards that no longer exist after
+        WORKERS was lowered.
+        """
+        clause = QueuedUpdate.shard == shard
+        if shard == 0:
+            clause = or_(clause, QueuedUpdate.shard >= shards)
+        claimed = (
+            select(QueuedUpdate.id)
+            .where(clause, QueuedUpdate.handled_at.is_(None))
+            .order_by(QueuedUpdate.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(QueuedUpdate)
+            .where(QueuedUpdate.id.in_(claimed))
+            .values(handled_at=func.now())
+            .returning(QueuedUpdate.id, QueuedUpdate.payload)
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return [payload for _, payload in sorted(result.tuples().all())]
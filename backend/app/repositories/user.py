@@ -1,8 +1,65 @@
+from collections.abc import Sequence
+from typing import Any
+
+from core.config import core_settings
 from entities.user.models import User
 from repositories.base import BaseRepository
+from shared.utils.cache import TTLCache
+from sqlalchemy import ClauseElement
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+# Column values of recently resolved users, shared by the requests of one
+# worker. Writes through this repository drop the entry; other workers
+# see a change after USER_CACHE_TTL at most.
+user_cache: TTLCache[int, dict[str, Any]] = TTLCache(
+    maxsize=core_settings.USER_CACHE_SIZE,
+    ttl=core_settings.USER_CACHE_TTL,
+)
+
+
+def _snapshot(user: User) -> dict[str, Any]:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in User.__mapper__.column_attrs
+    }
 
 
 class UserRepository(BaseRepository[User]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(User, session)
+
+    async def get_cached(self, user_id: int) -> User | None:
+        if (values := user_cache.get(user_id)) is not None:
+            user = User(**values)
+            make_transient_to_detached(user)
+            # Attaches the snapshot to this session without a SELECT.
+            return await self.session.merge(user, load=False)
+        if (user := await self.get(user_id)) is not None:
+            user_cache.set(user_id, _snapshot(user))
+        return user
+
+    async def create(self, obj_in: dict[str, Any]) -> User:
+        user = await super().create(obj_in)
+        user_cache.pop(user.id)
+        return user
+
+    async def update(self, obj: User, obj_in: dict[str, Any]) -> User:
+        user = await super().update(obj, obj_in)
+        user_cache.pop(user.id)
+        return user
+
+    async def update_by_ids(
+        self,
+        target_ids: Sequence[int],
+        obj_in: dict[str, Any],
+        *clause: ClauseElement[bool],
+    ) -> int:
+        count = await super().update_by_ids(target_ids, obj_in, *clause)
+        for target_id in target_ids:
+            user_cache.pop(target_id)
+        return count
+
+    async def delete(self, target_id: int) -> None:
+        await super().delete(target_id)
+        user_cache.pop(target_id)
@@ -1,19 +1,133 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
+from contextlib import suppress
 from typing import Any
 
+from core.config import core_settings
+from core.logs import logger
 from repositories.settings import AppSettingRepository
 from services.base import BaseService
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+APP_SETTINGS_CHANNEL = "app_settings_changed"
+
+
+class AppSettingsCache:
+    """All app_settings rows held in memory for the whole process.
+
+    A trigger on app_settings bumps the app_settings_version row and notifies
+    APP_SETTINGS_CHANNEL; the version is also polled in case a
+    notification is lost while the listening connection is down.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        engine: AsyncEngine,
+    ) -> None:
+        self.session_maker = session_maker
+        self.engine = engine
+        self._values: dict[str, Any] = {}
+        self._version: int | None = None
+        self._reload_lock = asyncio.Lock()
+        self._changed = asyncio.Event()
+        self._listen_connection: AsyncConnection | None = None
+        self._watch_task: asyncio.Task | None = None
+
+    async def get(self, key: str) -> Any | None:
+        if self._version is None:
+            await self.reload()
+        # Callers get their own copy so they cannot mutate the cache.
+        return copy.deepcopy(self._values.get(key))
+
+    async def reload(self) -> None:
+        async with self._reload_lock:
+            async with self.session_maker() as session:
+                repository = AppSettingRepository(session)
+                # Read the version first: the version row commits together
+                # with the values, so a change racing with the load can only
+                # leave values newer than the version, which reloads again.
+                version = await repository.get_version()
+                values = await repository.load_values()
+            self._values = values
+            self._version = version
+        logger.info("App settings loaded", version=version, keys=len(values))
+
+    async def start(self) -> None:
+        # The watcher keeps retrying even if the first load fails.
+        try:
+            await self.reload()
+        finally:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._watch_task
+            self._watch_task = None
+        await self._close_listener()
+
+    async def _listen(self) -> None:
+        connection = await self.engine.connect()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.add_listener(
+            APP_SETTINGS_CHANNEL,
+            self._on_notify,
+        )
+        self._listen_connection = connection
+
+    async def _close_listener(self) -> None:
+        if self._listen_connection is None:
+            return
+        connection, self._listen_connection = self._listen_connection, None
+        with suppress(Exception):
+            await connection.invalidate()
+
+    def _listening(self) -> bool:
+        connection = self._listen_connection
+        if connection is None or connection.invalidated:
+            return False
+        raw_connection = connection.sync_connection.connection
+        return not raw_connection.driver_connection.is_closed()
+
+    def _on_notify(self, *_: Any) -> None:
+        self._changed.set()
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                if not self._listening():
+                    await self._close_listener()
+                    await self._listen()
+                async with self.session_maker() as session:
+                    version = await AppSettingRepository(session).get_version()
+                if version != self._version:
+                    await self.reload()
+            except Exception as e:  # noqa: BLE001
+                logger.exception(f"Error refreshing settings: {e}", exc_info=e)
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._changed.wait(),
+                    timeout=core_settings.APP_SETTINGS_POLL_INTERVAL,
+                )
+            self._changed.clear()
 
 
 class AppSettingsService(BaseService):
-    def __init__(self, repository: AppSettingRepository) -> None:
-        self.repository = repository
+    def __init__(self, cache: AppSettingsCache) -> None:
+        self.cache = cache
 
     async def get_value(self, key: str) -> Any | None:
-        setting = await self.repository.get_by_key(key)
-        return setting.value if setting else None
+        return await self.cache.get(key)
 
     async def get_json(self, key: str, default: Any = None) -> Any:
         value = await self.get_value(key)
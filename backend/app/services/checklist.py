@@ -1,14 +1,21 @@
+from collections.abc import Sequence
 from datetime import UTC, date, datetime
 
 from core.logs import logger
+from core.metrics import (
+    checklist_sessions_completed,
+    checklist_sessions_started,
+)
 from entities.checklist.enums import (
     ChecklistAnswerValue,
     ChecklistSessionStatus,
 )
+from entities.checklist.exceptions.sessions import (
+    ChecklistSessionStartError,
+)
 from entities.checklist.models import (
     Checklist,
     ChecklistAnswer,
-    ChecklistQuestion,
     ChecklistSession,
     Employee,
 )
@@ -19,28 +26,38 @@ from entities.checklist.schemas.forms import (
 )
 from repositories.checklist import (
     ChecklistAnswerRepository,
+    ChecklistAnswerRow,
     ChecklistQuestionRepository,
+    ChecklistQuestionRow,
+    ChecklistReportRow,
     ChecklistRepository,
+    ChecklistSessionArchiveRepository,
+    ChecklistSessionKey,
     ChecklistSessionRepository,
+    ChecklistSessionRow,
     EmployeeRepository,
 )
 from services.base import BaseService
 
+START_SESSION_ATTEMPTS = 2
+
 
 class ChecklistFlowService(BaseService):
-    def __init__(
+    def __init__(  # noqa: PLR0913, PLR0917
         self,
         employee_repository: EmployeeRepository,
         checklist_repository: ChecklistRepository,
         question_repository: ChecklistQuestionRepository,
         session_repository: ChecklistSessionRepository,
         answer_repository: ChecklistAnswerRepository,
+        archive_repository: ChecklistSessionArchiveRepository,
     ) -> None:
         self.employee_repository = employee_repository
         self.checklist_repository = checklist_repository
         self.question_repository = question_repository
         self.session_repository = session_repository
         self.answer_repository = answer_repository
+        self.archive_repository = archive_repository
 
     async def get_employee_by_tab_number(
         self,
@@ -90,15 +107,6 @@ class ChecklistFlowService(BaseService):
         employee: Employee,
         checklist: Checklist,
     ) -> tuple[ChecklistSession, bool]:
-        if existing := await self.session_repository.get_in_progress_for_user(
-            user_id,
-        ):
-            logger.info(
-                "Checklist session resumed",
-                user_id=user_id,
-                session_id=existing.id,
-            )
-            return existing, False
         employee_id = employee.id
         checklist_id = checklist.id
         create_schema = ChecklistSessionCreateSchema(
@@ -106,71 +114,153 @@ class ChecklistFlowService(BaseService):
             employee_id=employee_id,
             checklist_id=checklist_id,
         )
-        session = await self.session_repository.create(
-            create_schema.model_dump(exclude_unset=True),
-        )
-        logger.info(
-            "Checklist session created",
-            user_id=user_id,
-            session_id=session.id,
-            employee_id=employee_id,
-            checklist_id=checklist_id,
+        # The running session may complete between the conflicting insert
+        # and the read, so try once more before giving up.
+        for _ in range(START_SESSION_ATTEMPTS):
+            if session := await self.session_repository.create_in_progress(
+                **create_schema.model_dump(),
+            ):
+                checklist_sessions_started.inc()
+                logger.info(
+                    "Checklist session created",
+                    user_id=user_id,
+                    session_id=session.id,
+                    employee_id=employee_id,
+                    checklist_id=checklist_id,
+                )
+                return session, True
+            if existing := (
+                await self.session_repository.get_in_progress_for_user(
+                    user_id,
+                )
+            ):
+                logger.info(
+                    "Checklist session resumed",
+                    user_id=user_id,
+                    session_id=existing.id,
+                )
+                return existing, False
+        raise ChecklistSessionStartError()
+
+    async def preload_questions(self) -> int:
+        checklist_ids = await self.checklist_repository.list_active_ids()
+        for checklist_id in checklist_ids:
+            await self.question_repository.list_rows_for_checklist(
+                checklist_id,
+            )
+        return len(checklist_ids)
+
+    async def get_session_row(
+        self,
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> ChecklistSessionRow | None:
+        return await self.session_repository.get_row(
+            session_id,
+            session_created_at,
         )
-        return session, True
 
-    async def load_session(self, session_id: int) -> ChecklistSession | None:
-        return await self.session_repository.get_with_answers(session_id)
+    async def get_session_report(
+        self,
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> ChecklistReportRow | None:
+        return await self.session_repository.get_report_row(
+            session_id,
+            session_created_at,
+        )
 
-    async def list_questions(
+    async def list_question_rows(
         self,
         checklist_id: int,
-    ) -> list[ChecklistQuestion]:
-        return list(
-            await self.question_repository.list_for_checklist(checklist_id),
+    ) -> list[ChecklistQuestionRow]:
+        return await self.question_repository.list_rows_for_checklist(
+            checklist_id,
+        )
+
+    async def list_answer_rows(
+        self,
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> list[ChecklistAnswerRow]:
+        return await self.answer_repository.list_rows_for_session(
+            session_id,
+            session_created_at,
         )
 
-    async def get_completed_session_for_employee_on_date(
+    async def find_completed_session(
         self,
         *,
         employee_id: int,
         target_date: date,
-    ) -> ChecklistSession | None:
-        return (
-            await self.session_repository.get_completed_for_employee_on_date(
-                employee_id,
-                target_date,
+    ) -> ChecklistSessionKey | None:
+        repository = self.session_repository
+        return await repository.get_completed_key_for_employee_on_date(
+            employee_id,
+            target_date,
+        )
+
+    async def load_completed_report(
+        self,
+        *,
+        employee_id: int,
+        target_date: date,
+    ) -> tuple[ChecklistReportRow, list[ChecklistAnswerRow]] | None:
+        session_key = await self.find_completed_session(
+            employee_id=employee_id,
+            target_date=target_date,
+        )
+        if session_key is None:
+            return (
+                await self.archive_repository.get_report_for_employee_on_date(
+                    employee_id,
+                    target_date,
+                )
             )
+        report = await self.get_session_report(
+            session_key.id,
+            session_key.created_at,
+        )
+        if report is None:
+            return None
+        answers = await self.list_answer_rows(
+            session_key.id,
+            session_key.created_at,
         )
+        return report, answers
 
-    async def save_answer(
+    async def save_answer(  # noqa: PLR0913
         self,
         *,
-        session: ChecklistSession,
-        question: ChecklistQuestion,
+        session_id: int,
+        session_created_at: datetime,
+        question_id: int,
         answer: ChecklistAnswerValue,
         photo_file_id: str | None = None,
         photo_unique_id: str | None = None,
     ) -> ChecklistAnswer:
         create_schema = ChecklistAnswerCreateSchema(
-            session_id=session.id,
-            question_id=question.id,
+            session_id=session_id,
+            session_created_at=session_created_at,
+            question_id=question_id,
             answer=answer,
             photo_file_id=photo_file_id,
             photo_unique_id=photo_unique_id,
         )
         if existing := await self.answer_repository.get_for_session_question(
-            session.id,
-            question.id,
+            session_id,
+            question_id,
+            session_created_at,
         ):
             payload = create_schema.model_dump(
-                exclude={"session_id", "question_id"},
+                exclude={"session_id", "session_created_at", "question_id"},
                 exclude_unset=True,
             )
             saved = await self.answer_repository.update(existing, payload)
             logger.info(
                 "Checklist answer updated",
-                session_id=session.id,
-                question_id=question.id,
+                session_id=session_id,
+                question_id=question_id,
                 answer=answer.value,
                 has_photo=bool(saved.photo_file_id),
             )
@@ -181,8 +271,8 @@ class ChecklistFlowService(BaseService):
         )
         logger.info(
             "Checklist answer saved",
-            session_id=session.id,
-            question_id=question.id,
+            session_id=session_id,
+            question_id=question_id,
             answer=answer.value,
             has_photo=bool(saved.photo_file_id),
         )
@@ -190,53 +280,64 @@ class ChecklistFlowService(BaseService):
 
     async def complete_session(
         self,
-        session: ChecklistSession,
-    ) -> ChecklistSession:
+        session_id: int,
+        session_created_at: datetime | None = None,
+    ) -> None:
         update_schema = ChecklistSessionUpdateSchema(
             status=ChecklistSessionStatus.COMPLETED,
             completed_at=datetime.now(UTC),
         )
-        updated = await self.session_repository.update(
-            session,
+        await self.session_repository.update_by_key(
+            session_id,
+            session_created_at,
             update_schema.model_dump(exclude_unset=True),
         )
+        checklist_sessions_completed.inc()
         logger.info(
             "Checklist session completed",
-            session_id=session.id,
+            session_id=session_id,
         )
-        return updated
 
     async def save_feedback(
         self,
         *,
-        session: ChecklistSession,
+        session_id: int,
+        session_created_at: datetime | None = None,
         feedback_text: str | None = None,
         feedback_voice_file_id: str | None = None,
         feedback_voice_unique_id: str | None = None,
-    ) -> ChecklistSession:
+    ) -> bool:
         payload = {
             "feedback_text": feedback_text,
             "feedback_voice_file_id": feedback_voice_file_id,
             "feedback_voice_unique_id": feedback_voice_unique_id,
             "feedback_submitted_at": datetime.now(UTC),
         }
-        session = await self.session_repository.update(session, payload)
+        updated = await self.session_repository.update_by_key(
+            session_id,
+            session_created_at,
+            payload,
+        )
+        if not updated:
+            return False
         logger.info(
             "Checklist feedback saved",
-            session_id=session.id,
+            session_id=session_id,
             has_text=bool(feedback_text),
             has_voice=bool(feedback_voice_file_id),
         )
-        return session
+        return True
 
     async def get_next_unanswered_question(
         self,
         session_id: int,
-        questions: list[ChecklistQuestion],
-    ) -> ChecklistQuestion | None:
+        questions: Sequence[ChecklistQuestionRow],
+        session_created_at: datetime | None = None,
+    ) -> ChecklistQuestionRow | None:
         answered_ids = (
             await self.answer_repository.list_question_ids_for_session(
                 session_id,
+                session_created_at,
             )
         )
         for question in questions:
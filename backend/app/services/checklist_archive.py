@@ -0,0 +1,50 @@
+from datetime import UTC, date, datetime
+
+from core.logs import logger
+from db.config import retention_settings
+from db.partitions import add_months, month_start
+from repositories.checklist import ChecklistSessionArchiveRepository
+from services.base import BaseService
+
+
+class ChecklistArchiveService(BaseService):
+    def __init__(
+        self,
+        archive_repository: ChecklistSessionArchiveRepository,
+    ) -> None:
+        self.archive_repository = archive_repository
+
+    async def archive_completed(
+        self,
+        *,
+        today: date | None = None,
+        older_than_months: int | None = None,
+        batch_size: int | None = None,
+    ) -> int:
+        if older_than_months is None:
+            older_than_months = (
+                retention_settings.RETENTION_ARCHIVE_AFTER_MONTHS
+            )
+        if older_than_months is None:
+            return 0
+        batch_size = batch_size or retention_settings.RETENTION_BATCH_SIZE
+        # Month-aligned so whole partitions are emptied at once.
+        cutoff_month = add_months(
+            month_start(today or datetime.now(UTC).date()),
+            -older_than_months,
+        )
+        cutoff = datetime(cutoff_month.year, cutoff_month.month, 1, tzinfo=UTC)
+
+        total = 0
+        while moved := await self.archive_repository.archive_completed_before(
+            cutoff,
+            batch_size,
+        ):
+            total += moved
+            logger.info(
+                "Checklist sessions archived",
+                batch=moved,
+                total=total,
+                cutoff=cutoff.isoformat(),
+            )
+        return total
@@ -1,69 +1,43 @@
 from __future__ import annotations
 
-import asyncio
-import smtplib
 from collections.abc import Sequence
-from email.message import EmailMessage
 
-from core.logs import logger
+from entities.email.models import OutboxEmail
+from repositories.email import OutboxEmailRepository
 from services.base import BaseService
+from services.email_outbox import EmailOutboxSender
 
 
 class EmailService(BaseService):
-    async def send_email(  # noqa: PLR0913
+    def __init__(
+        self,
+        outbox_repository: OutboxEmailRepository,
+        sender: EmailOutboxSender,
+    ) -> None:
+        self.outbox_repository = outbox_repository
+        self.sender = sender
+
+    async def enqueue(  # noqa: PLR0913
         self,
         *,
-        host: str,
-        port: int,
-        username: str | None,
-        password: str | None,
-        use_tls: bool,
+        settings_key: str,
         from_email: str,
         to_emails: Sequence[str],
         subject: str,
         body: str,
-    ) -> None:
-        message = EmailMessage()
-        message["Subject"] = subject
-        message["From"] = from_email
-        message["To"] = ", ".join(to_emails)
-        message.set_content(body)
-
-        await asyncio.to_thread(
-            self._send,
-            host,
-            port,
-            username,
-            password,
-            use_tls,
-            from_email,
-            to_emails,
-            message,
+        attachments: list[dict[str, str]] | None = None,
+    ) -> OutboxEmail:
+        # Sent by EmailOutboxSender using the SMTP connection settings
+        # stored in the app setting settings_key
+        email = await self.outbox_repository.create(
+            {
+                "settings_key": settings_key,
+                "from_email": from_email,
+                "to_emails": list(to_emails),
+                "subject": subject,
+                "body": body,
+                "attachments": attachments,
+            },
         )
-
-    def _send(  # noqa: PLR0913
-        self,
-        host: str,
-        port: int,
-        username: str | None,
-        password: str | None,
-        use_tls: bool,
-        from_email: str,
-        to_emails: Sequence[str],
-        message: EmailMessage,
-    ) -> None:
-        try:
-            if use_tls:
-                with smtplib.SMTP(host, port, timeout=30) as smtp:
-                    smtp.starttls()
-                    if username and password:
-                        smtp.login(username, password)
-                    smtp.send_message(message, from_email, list(to_emails))
-            else:
-                with smtplib.SMTP(host, port, timeout=30) as smtp:
-                    if username and password:
-                        smtp.login(username, password)
-                    smtp.send_message(message, from_email, list(to_emails))
-        except Exception as exc:
-            logger.exception("Failed to send email", exc_info=exc)
-            raise
+        self.sender.wake()
+        return email
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import smtplib
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import timedelta
+from email.message import EmailMessage
+from typing import Any
+
+from core.config import email_settings
+from core.logs import logger
+from core.metrics import emails_sent, smtp_connections_opened
+from entities.email.models import OutboxEmail
+from repositories.email import OutboxEmailRepository
+from services.app_settings import AppSettingsCache
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+SMTP_PERMANENT_ERROR = 500
+SMTP_SERVICE_CLOSING = 421
+
+
+@dataclass(frozen=True, slots=True)
+class SmtpConfig:
+    host: str
+    port: int
+    username: str | None
+    password: str | None
+    use_tls: bool
+
+    @classmethod
+    def from_mapping(cls, config: Mapping[str, Any]) -> SmtpConfig:
+        return cls(
+            host=config["smtp_host"],
+            port=int(config.get("smtp_port", 587)),
+            username=config.get("username"),
+            password=config.get("password"),
+            use_tls=bool(config.get("use_tls", True)),
+        )
+
+
+class SmtpPool:
+    """SMTP connections kept open between messages, one per server.
+
+    Blocking; the sender calls it through asyncio.to_thread, and the lock
+    keeps a batch abandoned by a cancelled task from racing close_all().
+    """
+
+    def __init__(self) -> None:
+        self._connections: dict[SmtpConfig, tuple[smtplib.SMTP, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def send_batch(
+        self,
+        config: SmtpConfig,
+        messages: Sequence[EmailMessage],
+    ) -> list[Exception | None]:
+        errors: list[Exception | None] = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._send(config, message)
+                except (smtplib.SMTPException, OSError) as e:
+                    errors.append(e)
+                else:
+                    errors.append(None)
+        return errors
+
+    def close_idle(self, max_idle: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            for config, (_, used_at) in list(self._connections.items()):
+                if now - used_at >= max_idle:
+                    self._discard(config)
+
+    def close_all(self) -> None:
+        with self._lock:
+            for config in list(self._connections):
+                self._discard(config)
+
+    def _send(self, config: SmtpConfig, message: EmailMessage) -> None:
+        reused = config in self._connections
+        try:
+            self._deliver(config, message)
+        except smtplib.SMTPServerDisconnected:
+            if not reused:
+                raise
+            # The server closed the connection while it sat idle
+            self._deliver(config, message)
+
+    def _deliver(self, config: SmtpConfig, message: EmailMessage) -> None:
+        smtp = self._connection(config)
+        try:
+            smtp.send_message(message)
+        except smtplib.SMTPException as e:
+            # A refused message leaves the connection usable
+            if isinstance(e, smtplib.SMTPServerDisconnected) or (
+                getattr(e, "smtp_code", None) == SMTP_SERVICE_CLOSING
+            ):
+                self._discard(config)
+            raise
+        except OSError:
+            self._discard(config)
+            raise
+        self._connections[config] = (smtp, time.monotonic())
+
+    def _connection(self, config: SmtpConfig) -> smtplib.SMTP:
+        if config in self._connections:
+            return self._connections[config][0]
+        smtp = smtplib.SMTP(
+            config.host,
+            config.port,
+            timeout=email_settings.EMAIL_SMTP_TIMEOUT,
+        )
+        try:
+            if config.use_tls:
+                smtp.starttls()
+            if config.username and config.password:
+                smtp.login(config.username, config.password)
+        except BaseException:
+            smtp.close()
+            raise
+        smtp_connections_opened.inc()
+        self._connections[config] = (smtp, time.monotonic())
+        return smtp
+
+    def _discard(self, config: SmtpConfig) -> None:
+        smtp, _ = self._connections.pop(config)
+        with suppress(smtplib.SMTPException, OSError):
+            smtp.quit()
+        smtp.close()
+
+
+class EmailOutboxSender:
+    """Sends the emails queued in email_outbox in the background.
+
+    Every worker runs one: due emails are claimed with SKIP LOCKED, sent
+    in batches over pooled SMTP connections, and failed sends are retried
+    with exponential backoff until EMAIL_MAX_ATTEMPTS. SMTP settings are
+    read from app settings when sending, so a fixed setting also fixes
+    the emails still waiting for a retry.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        settings_cache: AppSettingsCache,
+    ) -> None:
+        self.session_maker = session_maker
+        self.settings_cache = settings_cache
+        self.pool = SmtpPool()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # The running batch is finished, so its emails are not sent
+            # twice after the lease expires
+            self._stopping = True
+            self._wakeup.set()
+            with suppress(TimeoutError, asyncio.CancelledError):
+                await asyncio.wait_for(
+                    self._task,
+                    timeout=email_settings.EMAIL_SMTP_TIMEOUT,
+                )
+            self._task = None
+        await asyncio.to_thread(self.pool.close_all)
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def send_due(self) -> int:
+        limit = email_settings.EMAIL_BATCH_SIZE
+        lease = timedelta(seconds=email_settings.EMAIL_SEND_LEASE)
+        sent = 0
+        while not self._stopping:
+            async with self.session_maker() as session:
+                repository = OutboxEmailRepository(session)
+                emails = await repository.claim_due(limit, lease)
+                by_settings: dict[str, list[OutboxEmail]] = defaultdict(list)
+                for email in emails:
+                    by_settings[email.settings_key].append(email)
+                for settings_key, batch in by_settings.items():
+                    sent += await self._send_batch(
+                        repository,
+                        settings_key,
+                        batch,
+                    )
+            if len(emails) < limit:
+                break
+        return sent
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.send_due()
+                if self.pool:
+                    await asyncio.to_thread(
+                        self.pool.close_idle,
+                        email_settings.EMAIL_SMTP_IDLE_TIMEOUT,
+                    )
+            except Exception as e:  # noqa: BLE001
+                logger.exception(f"Error sending emails: {e}", exc_info=e)
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=email_settings.EMAIL_OUTBOX_POLL_INTERVAL,
+                )
+            self._wakeup.clear()
+
+    async def _send_batch(
+        self,
+        repository: OutboxEmailRepository,
+        settings_key: str,
+        emails: list[OutboxEmail],
+    ) -> int:
+        try:
+            config = SmtpConfig.from_mapping(
+                await self.settings_cache.get(settings_key) or {},
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            error = ValueError(f"Invalid SMTP settings {settings_key}: {e}")
+            errors: list[Exception | None] = [error] * len(emails)
+        else:
+            errors = await asyncio.to_thread(
+                self.pool.send_batch,
+                config,
+                [_build_message(email) for email in emails],
+            )
+        sent_ids = [
+            email.id
+            for email, error in zip(emails, errors, strict=True)
+            if error is None
+        ]
+        await repository.mark_sent(sent_ids)
+        emails_sent.labels(result="sent").inc(len(sent_ids))
+        for email, error in zip(emails, errors, strict=True):
+            if error is not None:
+                await self._retry_or_fail(repository, email, error)
+        return len(sent_ids)
+
+    @staticmethod
+    async def _retry_or_fail(
+        repository: OutboxEmailRepository,
+        email: OutboxEmail,
+        error: Exception,
+    ) -> None:
+        retry_in = None
+        if (
+            not _is_permanent(error)
+            and email.attempts < email_settings.EMAIL_MAX_ATTEMPTS
+        ):
+            retry_in = timedelta(
+                seconds=min(
+                    email_settings.EMAIL_RETRY_BASE_DELAY
+                    * 2 ** (email.attempts - 1),
+                    email_settings.EMAIL_RETRY_MAX_DELAY,
+                ),
+            )
+        await repository.mark_failed(
+            email,
+            f"{type(error).__name__}: {error}",
+            retry_in,
+        )
+        if retry_in is None:
+            emails_sent.labels(result="failed").inc()
+            logger.error(
+                "Email given up",
+                email_id=email.id,
+                attempts=email.attempts,
+                error=str(error),
+            )
+        else:
+            emails_sent.labels(result="retry").inc()
+            logger.warning(
+                "Email send failed, will retry",
+                email_id=email.id,
+                attempts=email.attempts,
+                retry_in=retry_in.total_seconds(),
+                error=str(error),
+            )
+
+
+def _is_permanent(error: Exception) -> bool:
+    # 5xx replies do not change on retry; bad credentials may be fixed
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(
+            code >= SMTP_PERMANENT_ERROR
+            for code, _ in error.recipients.values()
+        )
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= SMTP_PERMANENT_ERROR
+    return False
+
+
+def _build_message(email: OutboxEmail) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = email.subject
+    message["From"] = email.from_email
+    message["To"] = ", ".join(email.to_emails)
+    message.set_content(email.body)
+    for attachment in email.attachments or ():
+        message.add_attachment(
+            attachment["content"],
+            subtype=attachment["subtype"],
+            filename=attachment["filename"],
+        )
+    return message
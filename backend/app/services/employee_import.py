@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import io
 import json
+import time
 from collections.abc import Iterable
 from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
-from openpyxl import load_workbook
+from core.metrics import employee_import_duration, employee_import_rows
+from entities.checklist.models import Employee
 from repositories.checklist import EmployeeRepository, PositionRepository
 from services.app_settings import AppSettingsService
 from services.base import BaseService
@@ -78,11 +80,18 @@ class EmployeeImportService(BaseService):
         config_path: Path | None = None,
         sheet_name: str | None = None,
     ) -> ImportStats:
+        started = time.perf_counter()
         config = await self._load_config(config_path)
         if sheet_name is not None:
             config = replace(config, sheet_name=sheet_name)
         rows = list(self._read_rows(io.BytesIO(data), config))
-        return await self._process_rows(rows)
+        stats = await self._process_rows(rows)
+        employee_import_duration.observe(time.perf_counter() - started)
+        for result in ("created", "updated", "skipped", "deactivated"):
+            employee_import_rows.labels(result=result).inc(
+                getattr(stats, result),
+            )
+        return stats
 
     async def import_from_path(
         self,
@@ -139,13 +148,18 @@ class EmployeeImportService(BaseService):
         processed_tab_numbers: set[str],
     ) -> int:
         deactivated = 0
-        employees = await self.employee_repo.list_all()
-        for employee in employees:
-            if employee.tab_number in processed_tab_numbers:
-                continue
-            if employee.is_active:
-                await self.employee_repo.update(employee, {"is_active": False})
-                deactivated += 1
+        async for employees in self.employee_repo.iter_pages(
+            Employee.is_active.is_(True),
+        ):
+            stale_ids = [
+                employee.id
+                for employee in employees
+                if employee.tab_number not in processed_tab_numbers
+            ]
+            deactivated += await self.employee_repo.update_by_ids(
+                stale_ids,
+                {"is_active": False},
+            )
         return deactivated
 
     def _read_rows(
@@ -153,6 +167,10 @@ class EmployeeImportService(BaseService):
         buffer: io.BytesIO,
         config: ImportConfig,
     ) -> Iterable[EmployeeRow]:
+        # openpyxl takes a noticeable share of worker startup and is only
+        # needed for imports
+        from openpyxl import load_workbook  # noqa: PLC0415
+
         workbook = load_workbook(
             filename=buffer,
             data_only=True,
@@ -1,45 +1,141 @@
-from asyncio import wait_for
+import asyncio
+import time
+from contextlib import suppress
 
 from aiogram import Bot
+from core.config import health_settings
 from core.logs import logger
 from services.base import BaseService
+from services.health_probes import (
+    DatabasePoolProbe,
+    DatabaseProbe,
+    EmailOutboxProbe,
+    HealthProbe,
+    ProbeResult,
+    TelegramProbe,
+    UpdateBacklogProbe,
+)
 from services.telegram import TelegramService
+from services.telegram_coordinator import TelegramCoordinator
 from shared.enums.health import HealthStatus
 from shared.schemas.health import HealthStatusResponse, ServiceHealthStatus
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from telegram.config import telegram_settings
 
 
-class HealthCheckService(BaseService):
+class HealthMonitor:
+    """Runs health probes concurrently and caches the report.
+
+    A background task refreshes the report every HEALTH_CHECK_INTERVAL
+    seconds, so requests never reach the database or the Bot API. Extra
+    probes are added with register() and only degrade the overall status.
+    """
+
     def __init__(
         self,
-        db_session: AsyncSession,
-        telegram_service: TelegramService,
+        session_maker: async_sessionmaker[AsyncSession],
+        engine: AsyncEngine,
         bot: Bot,
+        coordinator: TelegramCoordinator,
     ) -> None:
-        self.db_session = db_session
-        self.telegram_service = telegram_service
-        self.bot = bot
-        self._timeout = 5.0
+        self.database_probe = DatabaseProbe(session_maker)
+        self.telegram_probe = TelegramProbe(bot)
+        self.probes: list[HealthProbe] = [
+            DatabasePoolProbe(engine),
+            UpdateBacklogProbe(coordinator),
+            EmailOutboxProbe(session_maker),
+        ]
+        self._report: HealthStatusResponse | None = None
+        self._checked_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
 
-    async def _check_db(self) -> tuple[HealthStatus, str | None]:
-        try:
-            await self.db_session.execute(text("SELECT 1"))
-        except Exception as e:  # noqa: BLE001
-            logger.exception(f"Error checking database: {e}", exc_info=e)
-            return HealthStatus.FAIL, None
-        return HealthStatus.OK, None
+    def register(self, probe: HealthProbe) -> None:
+        self.probes.append(probe)
+
+    async def get(self) -> HealthStatusResponse:
+        # Refresh inline only when the background task is not keeping up.
+        max_age = health_settings.HEALTH_CHECK_INTERVAL * 2
+        if (
+            self._report is None
+            or time.monotonic() - self._checked_at > max_age
+        ):
+            return await self.refresh()
+        return self._report
+
+    async def refresh(self) -> HealthStatusResponse:
+        async with self._refresh_lock:
+            database, telegram, *checks = await asyncio.gather(
+                self._run(self.database_probe),
+                self._run(self.telegram_probe),
+                *(self._run(probe) for probe in self.probes),
+            )
+            self._report = HealthStatusResponse(
+                database=database,
+                telegram=telegram,
+                checks=checks,
+            )
+            self._checked_at = time.monotonic()
+            return self._report
+
+    async def start(self) -> None:
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is None:
+            return
+        self._refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._refresh_task
+        self._refresh_task = None
 
-    async def _check_telegram(self) -> tuple[HealthStatus, str | None]:
-        if telegram_settings.TELEGRAM_BOT_TOKEN is None:
-            return HealthStatus.SHUTDOWN, "Telegram bot token is not set"
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:  # noqa: BLE001
+                logger.exception(f"Error refreshing health: {e}", exc_info=e)
+            await asyncio.sleep(health_settings.HEALTH_CHECK_INTERVAL)
+
+    @staticmethod
+    async def _run(probe: HealthProbe) -> ServiceHealthStatus:
+        status, message = await HealthMonitor._probe(probe)
+        return ServiceHealthStatus(
+            name=probe.name,
+            status=status,
+            message=message,
+        )
+
+    @staticmethod
+    async def _probe(probe: HealthProbe) -> ProbeResult:
         try:
-            await wait_for(self.bot.get_me(), timeout=self._timeout)
+            return await asyncio.wait_for(
+                probe.check(),
+                timeout=health_settings.HEALTH_CHECK_TIMEOUT,
+            )
+        except TimeoutError:
+            logger.warning("Health probe timed out", probe=probe.name)
+            return HealthStatus.FAIL, "Timeout"
         except Exception as e:  # noqa: BLE001
-            logger.exception(f"Error checking telegram: {e}", exc_info=e)
+            logger.exception(
+                f"Error checking {probe.name}: {e}",
+                exc_info=e,
+            )
             return HealthStatus.FAIL, None
-        return HealthStatus.OK, None
+
+
+class HealthCheckService(BaseService):
+    def __init__(
+        self,
+        monitor: HealthMonitor,
+        telegram_service: TelegramService,
+    ) -> None:
+        self.monitor = monitor
+        self.telegram_service = telegram_service
 
     @property
     def status_icon_map(self) -> dict[HealthStatus, str]:
@@ -81,17 +177,4 @@ class HealthCheckService(BaseService):
         )
 
     async def check(self) -> HealthStatusResponse:
-        db_status, db_message = await self._check_db()
-        telegram_status, telegram_message = await self._check_telegram()
-        return HealthStatusResponse(
-            database=ServiceHealthStatus(
-                status=db_status,
-                message=db_message,
-                name="Database",
-            ),
-            telegram=ServiceHealthStatus(
-                status=telegram_status,
-                message=telegram_message,
-                name="Telegram",
-            ),
-        )
+        return await self.monitor.get()
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime
+
+from aiogram import Bot
+from core.config import email_settings, health_settings
+from db.config import postgres_settings
+from repositories.email import OutboxEmailRepository
+from services.telegram_coordinator import TelegramCoordinator
+from shared.enums.health import HealthStatus
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+from sqlalchemy.pool import QueuePool
+from telegram.config import telegram_settings
+
+type ProbeResult = tuple[HealthStatus, str | None]
+
+
+class HealthProbe(ABC):
+    """One check of the health report; exceptions count as a failure."""
+
+    name: str
+
+    @abstractmethod
+    async def check(self) -> ProbeResult: ...
+
+
+class DatabaseProbe(HealthProbe):
+    name = "Database"
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        self.session_maker = session_maker
+
+    async def check(self) -> ProbeResult:
+        async with self.session_maker() as session:
+            await session.execute(text("SELECT 1"))
+        return HealthStatus.OK, None
+
+
+class TelegramProbe(HealthProbe):
+    name = "Telegram"
+
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+
+    async def check(self) -> ProbeResult:
+        if telegram_settings.TELEGRAM_BOT_TOKEN is None:
+            return HealthStatus.SHUTDOWN, "Telegram bot token is not set"
+        await self.bot.get_me()
+        return HealthStatus.OK, None
+
+
+class DatabasePoolProbe(HealthProbe):
+    name = "Database pool"
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def check(self) -> ProbeResult:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return HealthStatus.OK, None
+        capacity = pool.size() + max(postgres_settings.DB_MAX_OVERFLOW, 0)
+        in_use = pool.checkedout()
+        message = f"{in_use}/{capacity}"
+        if in_use >= capacity * health_settings.HEALTH_DB_POOL_SATURATION:
+            return HealthStatus.DEGRADED, message
+        return HealthStatus.OK, message
+
+
+class UpdateBacklogProbe(HealthProbe):
+    name = "Update backlog"
+
+    def __init__(self, coordinator: TelegramCoordinator) -> None:
+        self.coordinator = coordinator
+
+    async def check(self) -> ProbeResult:
+        # Every claimed update runs as a task of the coordinator
+        pending = self.coordinator.pending_updates
+        message = str(pending)
+        if pending > health_settings.HEALTH_UPDATE_BACKLOG_LIMIT:
+            return HealthStatus.DEGRADED, message
+        return HealthStatus.OK, message
+
+
+class EmailOutboxProbe(HealthProbe):
+    name = "Email outbox"
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+    ) -> None:
+        self.session_maker = session_maker
+
+    async def check(self) -> ProbeResult:
+        async with self.session_maker() as session:
+            pending, oldest = await OutboxEmailRepository(
+                session,
+            ).pending_stats()
+        message = str(pending)
+        if oldest is None:
+            return HealthStatus.OK, message
+        age = (datetime.now(UTC) - oldest).total_seconds()
+        if age > email_settings.EMAIL_OUTBOX_MAX_AGE:
+            return HealthStatus.DEGRADED, f"{message}, oldest {age:.0f}s"
+        return HealthStatus.OK, message
@@ -0,0 +1,96 @@
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+
+from core.logs import logger
+from db.config import partition_settings
+from db.partitions import (
+    MonthlyPartition,
+    add_months,
+    detach_partitions_before,
+    ensure_partitions,
+    month_start,
+)
+from services.base import BaseService
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# Two-key advisory lock space; the single bigint space is used for
+# per-user checklist session locks.
+PARTITION_MAINTENANCE_LOCK = (0x636C, 1)
+
+
+@dataclass(slots=True)
+class PartitionMaintenanceResult:
+    created: list[MonthlyPartition] = field(default_factory=list)
+    detached: list[MonthlyPartition] = field(default_factory=list)
+
+
+class PartitionMaintenanceService(BaseService):
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+
+    async def run(
+        self,
+        *,
+        today: date | None = None,
+        months_ahead: int | None = None,
+        detach_after_months: int | None = None,
+    ) -> PartitionMaintenanceResult | None:
+        today = today or datetime.now(UTC).date()
+        if months_ahead is None:
+            months_ahead = partition_settings.PARTITIONS_MONTHS_AHEAD
+        if detach_after_months is None:
+            detach_after_months = (
+                partition_settings.PARTITIONS_DETACH_AFTER_MONTHS
+            )
+
+        # Detaching concurrently cannot run in a transaction, so the lock
+        # is held by the connection instead of a transaction
+        async with self.engine.connect() as connection:
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            locked = await connection.scalar(
+                select(func.pg_try_advisory_lock(*PARTITION_MAINTENANCE_LOCK)),
+            )
+            if not locked:
+                logger.info("Partition maintenance is running elsewhere")
+                return None
+            try:
+                result = await self._maintain(
+                    connection,
+                    today=today,
+                    months_ahead=months_ahead,
+                    detach_after_months=detach_after_months,
+                )
+            finally:
+                await connection.scalar(
+                    select(
+                        func.pg_advisory_unlock(*PARTITION_MAINTENANCE_LOCK),
+                    ),
+                )
+        logger.info(
+            "Partition maintenance finished",
+            created=[partition.name for partition in result.created],
+            detached=[partition.name for partition in result.detached],
+        )
+        return result
+
+    @staticmethod
+    async def _maintain(
+        connection: AsyncConnection,
+        *,
+        today: date,
+        months_ahead: int,
+        detach_after_months: int | None,
+    ) -> PartitionMaintenanceResult:
+        result = PartitionMaintenanceResult()
+        result.created = await ensure_partitions(
+            connection,
+            today=today,
+            months_ahead=months_ahead,
+        )
+        if detach_after_months is not None:
+            result.detached = await detach_partitions_before(
+                connection,
+                before=add_months(month_start(today), -detach_after_months),
+            )
+        return result
@@ -1,12 +1,57 @@
 from __future__ import annotations
 
+import csv
+import io
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
 from core.logs import logger
-from entities.checklist.models import Employee
+from entities.checklist.models import Employee, PositionChangeRequest
 from entities.user.models import User
+from repositories.checklist import PositionChangeRequestRepository
 from services.app_settings import AppSettingsService
 from services.email import EmailService
+from services.email_outbox import SmtpConfig
 
 POSITION_CHANGE_SETTINGS_KEY = "position_change_notification"
+DEFAULT_SUBJECT = "Запрос на обновление должности"
+DIGEST_CSV_NOTE = "Список во вложении."
+DIGEST_COLUMNS = (
+    "Табельный номер",
+    "Текущая должность",
+    "Telegram",
+    "Запросов",
+    "Последний запрос (UTC)",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class NotificationConfig:
+    from_email: str
+    to_emails: list[str]
+    subject: str
+    # Requests are collected for this long and sent in one email; without
+    # a window every request is sent on its own
+    digest_window: timedelta | None
+    digest_csv: bool
+
+    @classmethod
+    def from_mapping(cls, config: Mapping[str, Any]) -> NotificationConfig:
+        SmtpConfig.from_mapping(config)
+        digest_minutes = float(config.get("digest_minutes") or 0)
+        return cls(
+            from_email=config["from_email"],
+            to_emails=list(config.get("to_emails") or []),
+            subject=config.get("subject", DEFAULT_SUBJECT),
+            digest_window=(
+                timedelta(minutes=digest_minutes)
+                if digest_minutes > 0
+                else None
+            ),
+            digest_csv=config.get("digest_format") == "csv",
+        )
 
 
 class PositionChangeRequestService:
@@ -14,56 +59,143 @@ class PositionChangeRequestService:
         self,
         settings_service: AppSettingsService,
         email_service: EmailService,
+        request_repository: PositionChangeRequestRepository,
     ) -> None:
         self.settings_service = settings_service
         self.email_service = email_service
+        self.request_repository = request_repository
 
     async def send_request(self, user: User, employee: Employee) -> bool:
+        config = await self._load_config()
+        if config is None:
+            return False
+
+        if config.digest_window is not None:
+            # Goes out with the next digest, see send_digest
+            await self.request_repository.record(
+                employee,
+                user.id,
+                user.tg_username,
+            )
+            return True
+
+        # Queued only: the outbox sender delivers and retries in the
+        # background, so the user is not kept waiting on SMTP
+        await self.email_service.enqueue(
+            settings_key=POSITION_CHANGE_SETTINGS_KEY,
+            from_email=config.from_email,
+            to_emails=config.to_emails,
+            subject=config.subject,
+            body=self._build_body(user, employee),
+        )
+        return True
+
+    async def send_digest(self) -> int:
+        """Email all pending requests once the oldest has waited a window.
+
+        Requests still pending after digest mode is turned off are sent
+        on the next run.
+        """
+        pending_since = await self.request_repository.pending_since()
+        if pending_since is None:
+            return 0
+        config = await self._load_config()
+        if config is None:
+            return 0
+        window = config.digest_window
+        if window is not None and datetime.now(UTC) - pending_since < window:
+            return 0
+
+        requests = await self.request_repository.claim_pending()
+        if not requests:
+            return 0
+        rows = self._digest_rows(requests)
+        header = f"Запрошено обновление должности: {len(rows)}"
+        attachments = None
+        if config.digest_csv:
+            body = f"{header}\n\n{DIGEST_CSV_NOTE}"
+            attachments = [
+                {
+                    "filename": (
+                        f"position_change_{datetime.now(UTC):%Y%m%d_%H%M}.csv"
+                    ),
+                    "subtype": "csv",
+                    "content": self._build_csv(rows),
+                },
+            ]
+        else:
+            body = f"{header}\n\n{self._build_table(rows)}"
+        # Commits the claimed requests together with the email
+        await self.email_service.enqueue(
+            settings_key=POSITION_CHANGE_SETTINGS_KEY,
+            from_email=config.from_email,
+            to_emails=config.to_emails,
+            subject=f"{config.subject}: {len(rows)}",
+            body=body,
+            attachments=attachments,
+        )
+        logger.info("Position change digest queued", requests=len(rows))
+        return len(rows)
+
+    async def _load_config(self) -> NotificationConfig | None:
         config = await self.settings_service.get_json(
             POSITION_CHANGE_SETTINGS_KEY,
         )
         if not config:
             logger.warning("Position change notification config missing")
-            return False
-
+            return None
         try:
-            smtp_host = config["smtp_host"]
-            smtp_port = int(config.get("smtp_port", 587))
-            use_tls = bool(config.get("use_tls", True))
-            from_email = config["from_email"]
-            to_emails = config.get("to_emails") or []
-            subject = config.get(
-                "subject",
-                "Запрос на обновление должности",
-            )
-        except KeyError as exc:
+            notification = NotificationConfig.from_mapping(config)
+        except (KeyError, TypeError, ValueError) as exc:
             logger.warning(
                 "Incomplete position change config",
-                missing=str(exc),
+                error=str(exc),
             )
-            return False
-
-        if not to_emails:
+            return None
+        if not notification.to_emails:
             logger.warning("Position change notification recipients missing")
-            return False
+            return None
+        return notification
 
-        body = self._build_body(user, employee)
-
-        try:
-            await self.email_service.send_email(
-                host=smtp_host,
-                port=smtp_port,
-                username=config.get("username"),
-                password=config.get("password"),
-                use_tls=use_tls,
-                from_email=from_email,
-                to_emails=to_emails,
-                subject=subject,
-                body=body,
+    @staticmethod
+    def _digest_rows(
+        requests: Sequence[PositionChangeRequest],
+    ) -> list[tuple[str, ...]]:
+        return [
+            (
+                request.tab_number,
+                request.position_name or "не указана",
+                f"@{request.tg_username}"
+                if request.tg_username
+                else str(request.user_id),
+                str(request.request_count),
+                f"{request.last_requested_at.astimezone(UTC):%Y-%m-%d %H:%M}",
             )
-        except Exception:
-            return False
-        return True
+            for request in requests
+        ]
+
+    @staticmethod
+    def _build_table(rows: list[tuple[str, ...]]) -> str:
+        widths = [
+            max(len(row[column]) for row in (DIGEST_COLUMNS, *rows))
+            for column in range(len(DIGEST_COLUMNS))
+        ]
+        return "\n".join(
+            "  ".join(
+                value.ljust(width)
+                for value, width in zip(row, widths, strict=True)
+            ).rstrip()
+            for row in (DIGEST_COLUMNS, *rows)
+        )
+
+    @staticmethod
+    def _build_csv(rows: list[tuple[str, ...]]) -> str:
+        # Semicolons and a BOM, so Excel with a Russian locale opens it
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+        writer.writerow(DIGEST_COLUMNS)
+        writer.writerows(rows)
+        return "\ufeff" + buffer.getvalue()
 
     @staticmethod
     def _build_body(user: User, employee: Employee) -> str:
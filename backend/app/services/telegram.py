@@ -1,5 +1,3 @@
-from functools import lru_cache
-
 from aiogram import Bot, Dispatcher
 from aiogram.enums import (
     ChatMemberStatus,
@@ -21,10 +19,9 @@ from aiogram.types import (
     Update,
 )
 from core.logs import logger
-from lxml import html
-from lxml_html_clean import Cleaner
 from services.base import BaseService
 from telegram.config import telegram_settings
+from telegram.utils.sanitizer import html_sanitizer
 
 type InputMedia = (
     InputMediaAudio
@@ -66,54 +63,8 @@ class TelegramService(BaseService):
         ]
 
     @staticmethod
-    @lru_cache
     def shrink_html(text: str, limit: int = 4096) -> str:
-        if not text:
-            return text
-
-        suffix = ""
-        if len(text) > limit:
-            suffix = "..."
-
-        broken_html = f"<root>{text[: limit - 3]}</root>"
-
-        parser = html.HTMLParser(remove_blank_text=True, recover=True)
-        tree = html.fromstring(broken_html, parser=parser)
-
-        allowed_tags = {
-            "b",
-            "strong",
-            "i",
-            "em",
-            "u",
-            "ins",
-            "s",
-            "strike",
-            "del",
-            "tg-spoiler",
-            "a",
-            "tg-emoji",
-            "code",
-            "pre",
-            "root",
-        }
-
-        cleaner = Cleaner(allow_tags=allowed_tags)
-        cleaned_tree = cleaner.clean_html(tree)
-
-        cleaned_html = html.tostring(
-            cleaned_tree,
-            with_tail=False,
-            method="xml",
-            encoding="unicode",
-        )
-
-        for tag in allowed_tags:
-            cleaned_html = cleaned_html.replace(f"<{tag}/>", "")
-
-        return (
-            cleaned_html.replace("<root>", "").replace("</root>", "") + suffix
-        )
+        return html_sanitizer.sanitize(text, limit)
 
     async def save_messages_to_service_chat(
         self,
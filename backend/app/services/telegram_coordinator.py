@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import GetUpdates
+from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
+from aiogram.utils.backoff import Backoff, BackoffConfig
+from core.config import core_settings
+from core.logs import logger
+from repositories.telegram import (
+    TELEGRAM_UPDATES_CHANNEL,
+    QueuedUpdateRepository,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+from telegram.config import telegram_settings
+
+# Advisory locks are taken as (LOCK_NAMESPACE, key): key 0 is the leader,
+# key 1 + n is shard n
+LOCK_NAMESPACE = 0x7467
+LEADER_LOCK = 0
+BACKOFF_CONFIG = BackoffConfig(
+    min_delay=1.0,
+    max_delay=5.0,
+    factor=1.3,
+    jitter=0.1,
+)
+
+
+class TelegramCoordinator:
+    """Lets one worker talk to Telegram and shares updates with the rest.
+
+    Each worker keeps a connection holding Postgres advisory locks: the
+    leader lock, and in polling mode the lock of one shard out of WORKERS.
+    The leader registers the webhook, or is the only worker calling
+    getUpdates; it queues the updates in telegram_update_queue by user, and
+    every worker handles the shard it holds, so the updates of one user
+    keep reaching the worker with their FSM state. Locks end with the
+    connection, so the roles of a dead worker are taken over within
+    TELEGRAM_COORDINATION_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        engine: AsyncEngine,
+        bot: Bot,
+        dispatcher: Dispatcher,
+    ) -> None:
+        self.session_maker = session_maker
+        self.engine = engine
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.shards = max(core_settings.WORKERS, 1)
+        self.polling = not telegram_settings.TELEGRAM_USE_WEBHOOK
+        self.is_leader = False
+        self.shard: int | None = None
+        self._connection: AsyncConnection | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._leader_task: asyncio.Task | None = None
+        self._update_tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending_updates(self) -> int:
+        return len(self._update_tasks)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._leader_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        self._task = self._leader_task = None
+        # Closing the connection releases the locks for the other workers
+        await self._close_connection()
+        self.is_leader = False
+        self.shard = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._coordinate()
+            except Exception as e:  # noqa: BLE001
+                logger.exception(
+                    f"Telegram coordination failed: {e}",
+                    exc_info=e,
+                )
+                await self._lose_roles()
+            if self.shard is not None:
+                try:
+                    await self._drain()
+                except Exception as e:  # noqa: BLE001
+                    logger.exception(
+                        f"Error reading queued updates: {e}",
+                        exc_info=e,
+                    )
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    timeout=telegram_settings.TELEGRAM_COORDINATION_INTERVAL,
+                )
+            self._wakeup.clear()
+
+    async def _coordinate(self) -> None:
+        if not self._connected():
+            await self._lose_roles()
+            await self._connect()
+        if self.polling and self.shard is None:
+            for shard in range(self.shards):
+                if await self._try_lock(1 + shard):
+                    self.shard = shard
+                    logger.info("Telegram update shard acquired", shard=shard)
+                    break
+        if not self.is_leader and await self._try_lock(LEADER_LOCK):
+            self.is_leader = True
+            logger.info("Telegram leadership acquired", shard=self.shard)
+            self._leader_task = asyncio.create_task(self._lead())
+        elif self.is_leader and self._leader_failed():
+            # Still holding the lock, so nobody else would take over
+            logger.warning("Restarting Telegram leader task")
+            self._leader_task = asyncio.create_task(self._lead())
+
+    def _leader_failed(self) -> bool:
+        # Setting the webhook ends the task, polling never does on its own
+        task = self._leader_task
+        if task is None or not task.done():
+            return False
+        if task.cancelled():
+            return True
+        exc = task.exception()
+        if exc is not None:
+            logger.exception(
+                f"Telegram leader task failed: {exc}",
+                exc_info=exc,
+            )
+        return exc is not None
+
+    async def _lead(self) -> None:
+        if self.polling:
+            await self._poll()
+        else:
+            await self._register_webhook()
+
+    async def _register_webhook(self) -> None:
+        # Pending updates are kept: Telegram delivers them to the new
+        # webhook, nothing is dropped on a deploy or a leader change
+        backoff = Backoff(config=BACKOFF_CONFIG)
+        while True:
+            try:
+                logger.info(
+                    f"Setting webhook to {telegram_settings.webhook_url}",
+                )
+                await self.bot.set_webhook(
+                    url=str(telegram_settings.webhook_url),
+                    secret_token=(
+                        telegram_settings.TELEGRAM_SECRET_TOKEN.get_secret_value()
+                    ),
+                    allowed_updates=self.dispatcher.resolve_used_update_types(),
+                )
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"Failed to set webhook: {e}")
+                await backoff.asleep()
+            else:
+                return
+
+    async def _poll(self) -> None:
+        backoff = Backoff(config=BACKOFF_CONFIG)
+        timeout = telegram_settings.TELEGRAM_POLLING_TIMEOUT
+        get_updates = GetUpdates(
+            timeout=timeout,
+            allowed_updates=self.dispatcher.resolve_used_update_types(),
+        )
+        offset = None
+        webhook_deleted = False
+        while True:
+            get_updates.offset = offset
+            try:
+                if not webhook_deleted:
+                    await self.bot.delete_webhook()
+                    webhook_deleted = True
+                    logger.info("Polling Telegram updates", shards=self.shards)
+                updates = await self.bot(
+                    get_updates,
+                    request_timeout=int(self.bot.session.timeout + timeout),
+                )
+                if updates:
+                    await self._enqueue(updates)
+            except Exception as e:  # noqa: BLE001
+                # Not acknowledged, the same updates are fetched again
+                logger.warning(f"Failed to fetch updates: {e}")
+                await backoff.asleep()
+                continue
+            backoff.reset()
+            if updates:
+                offset = updates[-1].update_id + 1
+
+    async def _enqueue(self, updates: list[Update]) -> None:
+        rows = [
+            {
+                "id": update.update_id,
+                "shard": self._shard_of(update),
+                "payload": update.model_dump(mode="json", exclude_none=True),
+            }
+            for update in updates
+        ]
+        async with self.session_maker() as session:
+            await QueuedUpdateRepository(session).enqueue(rows)
+
+    def _shard_of(self, update: Update) -> int:
+        # FSM state is per user, so a user's updates stay on one worker
+        try:
+            event = update.event
+        except UpdateTypeLookupError:
+            return update.update_id % self.shards
+        user = getattr(event, "from_user", None)
+        if user is not None:
+            return user.id % self.shards
+        chat = getattr(event, "chat", None)
+        if chat is not None:
+            return chat.id % self.shards
+        return update.update_id % self.shards
+
+    async def _drain(self) -> None:
+        limit = telegram_settings.TELEGRAM_QUEUE_BATCH_SIZE
+        while self.shard is not None:
+            async with self.session_maker() as session:
+                payloads = await QueuedUpdateRepository(session).claim(
+                    self.shard,
+                    self.shards,
+                    limit,
+                )
+            for payload in payloads:
+                self._handle(payload)
+            if len(payloads) < limit:
+                return
+
+    def _handle(self, payload: dict[str, Any]) -> None:
+        task = asyncio.create_task(self._feed(payload))
+        # Also keeps the task referenced until it is done
+        self._update_tasks.add(task)
+        task.add_done_callback(self._update_tasks.discard)
+
+    async def _feed(self, payload: dict[str, Any]) -> None:
+        try:
+            await self.dispatcher.feed_raw_update(self.bot, payload)
+        except Exception:  # noqa: BLE001
+            # Already logged with the update by the logging middleware
+            logger.debug(
+                "Queued update failed",
+                update_id=payload["update_id"],
+            )
+
+    async def _connect(self) -> None:
+        connection = await self.engine.connect()
+        raw_connection = await connection.get_raw_connection()
+        if self.polling:
+            await raw_connection.driver_connection.add_listener(
+                TELEGRAM_UPDATES_CHANNEL,
+                self._on_notify,
+            )
+        self._connection = connection
+
+    def _connected(self) -> bool:
+        connection = self._connection
+        if connection is None or connection.invalidated:
+            return False
+        raw_connection = connection.sync_connection.connection
+        return not raw_connection.driver_connection.is_closed()
+
+    async def _try_lock(self, key: int) -> bool:
+        # Straight on the driver connection: session-level locks must not
+        # leave a SQLAlchemy transaction open for the worker's lifetime
+        raw_connection = self._connection.sync_connection.connection
+        return await raw_connection.driver_connection.fetchval(
+            "SELECT pg_try_advisory_lock($1, $2)",
+            LOCK_NAMESPACE,
+            key,
+        )
+
+    async def _lose_roles(self) -> None:
+        if self._leader_task is not None:
+            self._leader_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._leader_task
+            self._leader_task = None
+        if self.is_leader or self.shard is not None:
+            logger.warning(
+                "Telegram roles lost",
+                leader=self.is_leader,
+                shard=self.shard,
+            )
+        self.is_leader = False
+        self.shard = None
+        await self._close_connection()
+
+    async def _close_connection(self) -> None:
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        with suppress(Exception):
+            await connection.invalidate()
+
+    def _on_notify(self, *_: Any) -> None:
+        self._wakeup.set()
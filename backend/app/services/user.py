@@ -11,6 +11,7 @@ from entities.user.schemas.forms import (
     UserRegistrationStatusPatchSchema,
     UserResetSchema,
 )
+from repositories.base import DEFAULT_PAGE_LIMIT
 from repositories.user import UserRepository
 from services.base import BaseService
 from services.telegram import TelegramService
@@ -25,8 +26,16 @@ class UserService(BaseService):
         self.user_repository = user_repository
         self.telegram_service = telegram_service
 
-    async def get_users(self) -> Sequence[User]:
-        return await self.user_repository.list()
+    async def get_users(
+        self,
+        *,
+        after_id: int | None = None,
+        limit: int = DEFAULT_PAGE_LIMIT,
+    ) -> Sequence[User]:
+        return await self.user_repository.list_page(
+            after_id=after_id,
+            limit=limit,
+        )
 
     async def put_user(
         self,
@@ -124,6 +133,12 @@ class UserService(BaseService):
     ) -> User | None:
         return await self.user_repository.get(user_id)
 
+    async def get_current_user_or_none(
+        self,
+        user_id: int,
+    ) -> User | None:
+        return await self.user_repository.get_cached(user_id)
+
     async def reset_user(self, user: User) -> User:
         await self.user_repository.delete(user.id)
         user, _ = await self.put_user(
@@ -1,3 +1,4 @@
+from pydantic import Field
 from shared.enums.health import HealthStatus
 from shared.schemas.base import ResponseModel
 
@@ -11,21 +12,23 @@ class ServiceHealthStatus(ResponseModel):
 class HealthStatusResponse(ResponseModel):
     database: ServiceHealthStatus
     telegram: ServiceHealthStatus
+    checks: list[ServiceHealthStatus] = Field(default_factory=list)
 
     @property
     def services(self) -> list[ServiceHealthStatus]:
         return [
             self.database,
             self.telegram,
+            *self.checks,
         ]
 
     @property
     def overall(self) -> HealthStatus:
         if self.database.status != HealthStatus.OK:
             return HealthStatus.CRITICAL
-        if self.telegram.status not in [
-            HealthStatus.OK,
-            HealthStatus.SHUTDOWN,
-        ]:
+        if any(
+            service.status not in [HealthStatus.OK, HealthStatus.SHUTDOWN]
+            for service in self.services
+        ):
             return HealthStatus.DEGRADED
         return HealthStatus.OK
@@ -0,0 +1,182 @@
+import asyncio
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Literal
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class ProfileReport:
+    seconds: float
+    interval: float
+    # CPU time when sampled by a timer signal, wall time from a thread
+    clock: Literal["cpu", "wall"]
+    # "thread;outer;...;inner" -> samples, the folded flamegraph format
+    stacks: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def samples(self) -> int:
+        return self.stacks.total()
+
+    def folded(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def summary(self, limit: int = 30) -> str:
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        lines = [
+            (
+                f"{self.samples} samples in {self.seconds:.1f}s, "
+                f"every {self.interval * 1000:g}ms of {self.clock} time"
+            ),
+        ]
+        for title, counter in (("Own", own), ("Total", total)):
+            lines += ["", f"{title} time:"]
+            lines += [
+                f"{count / max(self.samples, 1):7.1%}  {frame}"
+                for frame, count in counter.most_common(limit)
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads for a bounded window.
+
+    On the main thread a SIGPROF interval timer interrupts the event loop
+    between bytecodes; elsewhere a helper thread samples, which skews
+    towards points where the loop releases the GIL. The timer and the
+    thread only exist while a profile runs, so an idle profiler costs
+    nothing. One profile at a time per process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def profile(self, seconds: float, interval: float) -> ProfileReport:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError
+        try:
+            if (
+                hasattr(signal, "setitimer")
+                and threading.current_thread() is threading.main_thread()
+            ):
+                return await self._profile_signal(seconds, interval)
+            return await self._profile_thread(seconds, interval)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    async def _profile_signal(
+        seconds: float,
+        interval: float,
+    ) -> ProfileReport:
+        report = ProfileReport(seconds=seconds, interval=interval, clock="cpu")
+        samples: Counter[tuple[int, str]] = Counter()
+        main_id = threading.get_ident()
+
+        def _handler(_signum: int, frame: FrameType | None) -> None:
+            # No threading.enumerate() here: its lock is not reentrant and
+            # the signal may interrupt the main thread while it holds it
+            frames = sys._current_frames()
+            frames[main_id] = frame
+            _record(samples, frames)
+
+        previous = signal.signal(signal.SIGPROF, _handler)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        started = time.monotonic()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # Disarm first, the default SIGPROF action kills the process
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous or signal.SIG_DFL)
+        report.seconds = time.monotonic() - started
+        _fold(report, samples)
+        return report
+
+    @staticmethod
+    async def _profile_thread(
+        seconds: float,
+        interval: float,
+    ) -> ProfileReport:
+        report = ProfileReport(
+            seconds=seconds,
+            interval=interval,
+            clock="wall",
+        )
+        samples: Counter[tuple[int, str]] = Counter()
+        stop = threading.Event()
+
+        def _sample() -> None:
+            own_id = threading.get_ident()
+            while not stop.wait(interval):
+                frames = sys._current_frames()
+                frames.pop(own_id, None)
+                _record(samples, frames)
+
+        sampler = threading.Thread(
+            target=_sample,
+            name="profiler",
+            daemon=True,
+        )
+        started = time.monotonic()
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+        report.seconds = time.monotonic() - started
+        _fold(report, samples)
+        return report
+
+
+def _record(
+    samples: Counter[tuple[int, str]],
+    frames: dict[int, FrameType | None],
+) -> None:
+    for thread_id, frame in frames.items():
+        samples[thread_id, ";".join(reversed(_stack(frame)))] += 1
+
+
+def _fold(
+    report: ProfileReport,
+    samples: Counter[tuple[int, str]],
+) -> None:
+    # Threads that ended during the window keep their id as the name
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    for (thread_id, stack), count in samples.items():
+        name = names.get(thread_id, str(thread_id))
+        report.stacks[f"{name};{stack}" if stack else name] += count
+
+
+def _stack(frame: FrameType | None) -> list[str]:
+    stack = []
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        stack.append(f"{module}:{frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return stack
+
+
+profiler = SamplingProfiler()
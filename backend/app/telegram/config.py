@@ -12,6 +12,27 @@ class TelegramSettings(BaseSettings):
     TELEGRAM_ADMIN_CHAT_ID: int
     TELEGRAM_SERVICE_CHAT_ID: int
     TELEGRAM_USE_WEBHOOK: bool = False
+    # Bot API server, e.g. a local telegram-bot-api or a load test stub
+    TELEGRAM_API_URL: str | None = None
+    # In-process fake Bot API for benchmarks and tests; nothing is sent
+    TELEGRAM_FAKE_API: bool = False
+    # Average delay of a fake call, seconds
+    TELEGRAM_FAKE_LATENCY: float = 0.0
+    # Share of fake calls answered with 429 and retry_after seconds
+    TELEGRAM_FAKE_RETRY_AFTER_RATE: float = 0.0
+    TELEGRAM_FAKE_RETRY_AFTER: int = 1
+    # Share of updates written to the log; failures are always logged
+    TELEGRAM_LOG_SAMPLE_RATE: float = 1.0
+    # Also log the whole update at debug level
+    TELEGRAM_LOG_FULL_UPDATES: bool = False
+    # Sanitized message HTML kept in memory, in distinct texts
+    TELEGRAM_HTML_CACHE_SIZE: int = 1024
+    # Leader election and shard rounds, seconds; also the fallback poll of
+    # the update queue when a notification is missed
+    TELEGRAM_COORDINATION_INTERVAL: float = 5.0
+    TELEGRAM_POLLING_TIMEOUT: int = 30
+    # Queued updates a worker takes per round trip
+    TELEGRAM_QUEUE_BATCH_SIZE: int = 100
 
     @property
     def webhook_url(self) -> URL:
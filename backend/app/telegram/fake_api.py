@@ -0,0 +1,299 @@
+import asyncio
+import json
+import random
+import time
+from collections import Counter, OrderedDict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import (
+    AnswerCallbackQuery,
+    CopyMessage,
+    CopyMessages,
+    DeleteWebhook,
+    EditMessageCaption,
+    EditMessageMedia,
+    EditMessageReplyMarkup,
+    EditMessageText,
+    ForwardMessages,
+    GetChat,
+    GetChatMember,
+    GetFile,
+    GetMe,
+    SetWebhook,
+    TelegramMethod,
+)
+from aiogram.methods.base import TelegramType
+from telegram.config import telegram_settings
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Fake",
+    "username": "fake_bot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": False,
+    "supports_inline_queries": False,
+}
+
+
+@dataclass(slots=True)
+class FakeMessage:
+    chat_id: int
+    message_id: int
+    method: str
+    text: str | None
+    reply_markup: dict[str, Any] | None
+
+
+class FakeApiError(Exception):
+    def __init__(self, status: HTTPStatus, description: str, **parameters):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+        self.parameters = parameters
+
+
+class FakeTelegramSession(BaseSession):
+    """In-process stand-in for the Bot API used by benchmarks and tests.
+
+    Sent messages are kept per chat (the oldest are forgotten past
+    history_size). Calls can be slowed down by latency seconds on average
+    and fail with 429 at retry_after_rate; editing a message to the same
+    content fails the way Telegram does. Downloads return the bytes added
+    with add_file().
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        retry_after_rate: float = 0.0,
+        retry_after: int = 1,
+        history_size: int = 10_000,
+    ) -> None:
+        super().__init__()
+        self.latency = latency
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.history_size = history_size
+        self.calls: Counter[str] = Counter()
+        self.messages: OrderedDict[tuple[int, int], FakeMessage] = (
+            OrderedDict()
+        )
+        self.files: dict[str, bytes] = {}
+        self._message_ids: Counter[int] = Counter()
+
+    def sent_to(self, chat_id: int) -> list[FakeMessage]:
+        return [
+            message
+            for message in self.messages.values()
+            if message.chat_id == chat_id
+        ]
+
+    def add_file(self, file_id: str, content: bytes) -> None:
+        self.files[file_id] = content
+
+    def reset(self) -> None:
+        self.calls.clear()
+        self.messages.clear()
+        self._message_ids.clear()
+
+    async def close(self) -> None:
+        pass
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,  # noqa: ARG002, ASYNC109
+    ) -> TelegramType:
+        self.calls[method.__api_method__] += 1
+        if self.latency:
+            await asyncio.sleep(
+                random.uniform(0.5, 1.5) * self.latency,  # noqa: S311
+            )
+        try:
+            self._throttle()
+            content = {"ok": True, "result": self._result(method)}
+        except FakeApiError as e:
+            content = {
+                "ok": False,
+                "error_code": e.status.value,
+                "description": e.description,
+                "parameters": e.parameters,
+            }
+        response = self.check_response(
+            bot=bot,
+            method=method,
+            status_code=content.get("error_code", HTTPStatus.OK),
+            content=json.dumps(content),
+        )
+        return response.result  # type: ignore[return-value]
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,  # noqa: ARG002
+        timeout: int = 30,  # noqa: ARG002, ASYNC109
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,  # noqa: ARG002
+    ) -> AsyncGenerator[bytes, None]:
+        # File URLs end with the file_path returned by get_file.
+        file_id = url.rsplit("/", 1)[-1]
+        content = self.files.get(file_id, b"")
+        for start in range(0, len(content), chunk_size):
+            yield content[start : start + chunk_size]
+
+    def _throttle(self) -> None:
+        if random.random() < self.retry_after_rate:  # noqa: S311
+            raise FakeApiError(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                f"Too Many Requests: retry after {self.retry_after}",
+                retry_after=self.retry_after,
+            )
+
+    def _result(self, method: TelegramMethod[Any]) -> Any:  # noqa: PLR0911
+        match method:
+            case GetMe():
+                return BOT_USER
+            case GetChat():
+                return _chat(method.chat_id, full=True)
+            case GetChatMember():
+                return {
+                    "status": "member",
+                    "user": _user(method.user_id),
+                }
+            case GetFile():
+                return {
+                    "file_id": method.file_id,
+                    "file_unique_id": method.file_id,
+                    "file_size": len(self.files.get(method.file_id, b"")),
+                    "file_path": f"files/{method.file_id}",
+                }
+            case (
+                EditMessageText()
+                | EditMessageCaption()
+                | EditMessageMedia()
+                | EditMessageReplyMarkup()
+            ):
+                return self._edit(method)
+            case CopyMessages() | ForwardMessages():
+                return [
+                    {"message_id": self._store(method, method.chat_id)}
+                    for _ in method.message_ids
+                ]
+            case CopyMessage():
+                return {"message_id": self._store(method, method.chat_id)}
+            case AnswerCallbackQuery() | SetWebhook() | DeleteWebhook():
+                return True
+        chat_id = getattr(method, "chat_id", None)
+        if method.__api_method__.startswith("send") and chat_id is not None:
+            message_id = self._store(method, chat_id)
+            return self._message(self.messages[(int(chat_id), message_id)])
+        return True
+
+    def _store(self, method: TelegramMethod[Any], chat_id: int | str) -> int:
+        chat_id = int(chat_id)
+        self._message_ids[chat_id] += 1
+        message = FakeMessage(
+            chat_id=chat_id,
+            message_id=self._message_ids[chat_id],
+            method=method.__api_method__,
+            text=getattr(method, "text", None)
+            or getattr(method, "caption", None),
+            reply_markup=_dump_markup(method),
+        )
+        self.messages[(chat_id, message.message_id)] = message
+        while len(self.messages) > self.history_size:
+            self.messages.popitem(last=False)
+        return message.message_id
+
+    def _edit(self, method: TelegramMethod[Any]) -> dict[str, Any] | bool:
+        if method.inline_message_id is not None:
+            return True
+        key = (int(method.chat_id), method.message_id)
+        message = self.messages.get(key)
+        if message is None:
+            raise FakeApiError(
+                HTTPStatus.BAD_REQUEST,
+                "Bad Request: message to edit not found",
+            )
+        match method:
+            case EditMessageText():
+                text = method.text
+            case EditMessageCaption():
+                text = method.caption
+            case _:
+                text = message.text
+        reply_markup = _dump_markup(method)
+        if (
+            not isinstance(method, EditMessageMedia)
+            and text == message.text
+            and reply_markup == message.reply_markup
+        ):
+            raise FakeApiError(
+                HTTPStatus.BAD_REQUEST,
+                "Bad Request: message is not modified: specified new "
+                "message content and reply markup are exactly the same "
+                "as a current content and reply markup of the message",
+            )
+        message.text = text
+        message.reply_markup = reply_markup
+        return self._message(message)
+
+    @staticmethod
+    def _message(message: FakeMessage) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "message_id": message.message_id,
+            "date": int(time.time()),
+            "chat": _chat(message.chat_id),
+            "from": BOT_USER,
+        }
+        if message.text is not None:
+            result["text"] = message.text
+        if message.reply_markup and "inline_keyboard" in message.reply_markup:
+            result["reply_markup"] = message.reply_markup
+        return result
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+
+
+def _chat(chat_id: int | str, *, full: bool = False) -> dict[str, Any]:
+    chat_id = int(chat_id)
+    chat: dict[str, Any] = {
+        "id": chat_id,
+        "type": "private" if chat_id > 0 else "supergroup",
+    }
+    if full:
+        chat |= {
+            "accent_color_id": 0,
+            "max_reaction_count": 0,
+            "accepted_gift_types": {
+                "unlimited_gifts": False,
+                "limited_gifts": False,
+                "unique_gifts": False,
+                "premium_subscription": False,
+            },
+        }
+    return chat
+
+
+def _dump_markup(method: TelegramMethod[Any]) -> dict[str, Any] | None:
+    markup = getattr(method, "reply_markup", None)
+    if markup is None:
+        return None
+    return markup.model_dump(mode="json", exclude_none=True)
+
+
+def create_fake_session() -> FakeTelegramSession:
+    return FakeTelegramSession(
+        latency=telegram_settings.TELEGRAM_FAKE_LATENCY,
+        retry_after_rate=telegram_settings.TELEGRAM_FAKE_RETRY_AFTER_RATE,
+        retry_after=telegram_settings.TELEGRAM_FAKE_RETRY_AFTER,
+    )
@@ -1,18 +1,23 @@
+import asyncio
 import io
-from datetime import date, datetime
+import os
+from datetime import UTC, date, datetime
 
-from aiogram import F, Router
+from aiogram import Bot, F, Router
 from aiogram.enums import ChatType
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
+from aiogram.types import BufferedInputFile, CallbackQuery, Message
+from core.config import profile_settings
 from core.logs import logger
 from dishka import FromDishka
 from entities.checklist.enums import ChecklistAnswerValue
+from repositories.checklist import ChecklistAnswerRow, ChecklistReportRow
 from services.checklist import ChecklistFlowService
 from services.employee_import import EmployeeImportService
 from services.telegram import TelegramService
 from shared.enums.group import Group
+from shared.utils.profiler import ProfilerBusyError, profiler
 from telegram.callback_data.admin import AdminMenuCallback
 from telegram.keyboards.admin import admin_menu_keyboard
 from telegram.keyboards.checklist import remove_keyboard
@@ -27,6 +32,10 @@ ANSWER_LABELS: dict[ChecklistAnswerValue, str] = {
     ChecklistAnswerValue.NO: "Нет",
     ChecklistAnswerValue.NOT_APPLICABLE: "Не применимо",
 }
+DEFAULT_PROFILE_SECONDS = 10.0
+
+# Running profiles, kept so the tasks are not garbage collected
+_profile_tasks: set[asyncio.Task] = set()
 
 
 @router.message(
@@ -167,11 +176,11 @@ async def admin_report_date(
         )
         return
 
-    session = await checklist_flow_service.get_completed_session_for_employee_on_date(
+    loaded = await checklist_flow_service.load_completed_report(
         employee_id=employee_id,
         target_date=report_date,
     )
-    if session is None:
+    if loaded is None:
         await telegram_service.send_message(
             chat_id=message.chat.id,
             text="Заполненный чеклист за эту дату не найден.",
@@ -184,39 +193,36 @@ async def admin_report_date(
         telegram_service=telegram_service,
         checklist_flow_service=checklist_flow_service,
         chat_id=message.chat.id,
-        session_id=session.id,
+        loaded=loaded,
         report_date=report_date,
     )
     await state.clear()
 
 
 async def _send_report(
+    *,
     telegram_service: TelegramService,
     checklist_flow_service: ChecklistFlowService,
     chat_id: int,
-    session_id: int,
+    loaded: tuple[ChecklistReportRow, list[ChecklistAnswerRow]],
     report_date: date,
 ) -> None:
-    session = await checklist_flow_service.load_session(session_id)
-    if session is None:
-        await telegram_service.send_message(
-            chat_id=chat_id,
-            text="Не удалось загрузить детали отчёта.",
+    report, answers = loaded
+    if report.tab_number is None:
+        employee_line = "Сотрудник: удалён"
+    else:
+        employee_status = (
+            " (неактивен)" if not report.employee_is_active else ""
+        )
+        employee_line = (
+            f"Сотрудник: табельный № {report.tab_number}{employee_status}"
         )
-        return
-
-    employee = session.employee
-    checklist = session.checklist
-    employee_status = " (неактивен)" if not employee.is_active else ""
-    group_name = (
-        session.checklist.group.name if session.checklist.group else None
-    )
     header_lines = [
         "Отчёт по чеклисту",
-        f"Сотрудник: табельный № {employee.tab_number}{employee_status}",
-        f"Должность: {employee.position.name}" if employee.position else "",
-        f"Группа: {group_name}" if group_name else "",
-        f"Чеклист: {checklist.title}",
+        employee_line,
+        f"Должность: {report.position_name}" if report.position_name else "",
+        f"Группа: {report.group_name}" if report.group_name else "",
+        f"Чеклист: {report.checklist_title or 'удалён'}",
         f"Дата: {report_date.strftime('%d.%m.%Y')}",
     ]
     header = "\n".join(line for line in header_lines if line)
@@ -225,10 +231,10 @@ async def _send_report(
         text=header,
     )
 
-    questions = await checklist_flow_service.list_questions(checklist.id)
-    answers_by_question = {
-        answer.question_id: answer for answer in session.answers
-    }
+    questions = await checklist_flow_service.list_question_rows(
+        report.checklist_id,
+    )
+    answers_by_question = {answer.question_id: answer for answer in answers}
     for index, question in enumerate(questions, start=1):
         answer = answers_by_question.get(question.id)
         answer_label = (
@@ -248,15 +254,15 @@ async def _send_report(
                 caption="Фото подтверждение",
             )
 
-    if session.feedback_text:
+    if report.feedback_text:
         await telegram_service.send_message(
             chat_id=chat_id,
-            text=f"Отзыв: {session.feedback_text}",
+            text=f"Отзыв: {report.feedback_text}",
         )
-    if session.feedback_voice_file_id:
+    if report.feedback_voice_file_id:
         await telegram_service.bot.send_voice(
             chat_id=chat_id,
-            voice=session.feedback_voice_file_id,
+            voice=report.feedback_voice_file_id,
             caption="Голосовой отзыв",
         )
 
@@ -343,3 +349,79 @@ async def handle_import_non_document(
         chat_id=message.chat.id,
         text="Пришлите файл .xlsx для импорта сотрудников.",
     )
+
+
+@router.message(
+    Command("profile"),
+    GroupFilter(Group.ADMIN),
+    ChatTypeFilter(ChatType.PRIVATE),
+)
+async def profile_command(
+    message: Message,
+    command: CommandObject,
+    telegram_service: FromDishka[TelegramService],
+) -> None:
+    try:
+        seconds = float(command.args or DEFAULT_PROFILE_SECONDS)
+    except ValueError:
+        seconds = 0.0
+    if not 0 < seconds <= profile_settings.PROFILE_MAX_SECONDS:
+        await telegram_service.send_message(
+            chat_id=message.chat.id,
+            text=(
+                "Укажите длительность в секундах, например /profile 10 "
+                f"(не больше {profile_settings.PROFILE_MAX_SECONDS:g})."
+            ),
+        )
+        return
+    if profiler.running:
+        await telegram_service.send_message(
+            chat_id=message.chat.id,
+            text="Профилирование уже идёт, дождитесь отчёта.",
+        )
+        return
+
+    await telegram_service.send_message(
+        chat_id=message.chat.id,
+        text=f"Профилирую воркер {os.getpid()} {seconds:g} с...",  # noqa: RUF001
+    )
+    # The webhook must not wait for the whole window
+    task = asyncio.create_task(
+        _send_profile(telegram_service.bot, message.chat.id, seconds),
+    )
+    _profile_tasks.add(task)
+    task.add_done_callback(_profile_tasks.discard)
+
+
+async def _send_profile(bot: Bot, chat_id: int, seconds: float) -> None:
+    try:
+        report = await profiler.profile(
+            seconds,
+            profile_settings.PROFILE_INTERVAL,
+        )
+    except ProfilerBusyError:
+        await bot.send_message(
+            chat_id=chat_id,
+            text="Профилирование уже идёт, дождитесь отчёта.",
+        )
+        return
+    name = f"profile-{os.getpid()}-{datetime.now(UTC):%Y%m%d-%H%M%S}"
+    try:
+        await bot.send_document(
+            chat_id=chat_id,
+            document=BufferedInputFile(
+                report.summary().encode(),
+                filename=f"{name}.txt",
+            ),
+            caption=f"{report.samples} сэмплов за {report.seconds:.1f} с",  # noqa: RUF001
+        )
+        await bot.send_document(
+            chat_id=chat_id,
+            document=BufferedInputFile(
+                report.folded().encode(),
+                filename=f"{name}.folded",
+            ),
+            caption="Флеймграф: откройте файл в speedscope.app",
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Failed to send profile", exc_info=exc)
@@ -1,4 +1,6 @@
 from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
 
 from aiogram import F, Router
 from aiogram.enums import ChatType
@@ -6,8 +8,12 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message, PhotoSize
 from dishka import FromDishka
 from entities.checklist.enums import ChecklistAnswerValue
-from entities.checklist.models import ChecklistQuestion, Employee
+from entities.checklist.exceptions.sessions import (
+    ChecklistSessionStartError,
+)
+from entities.checklist.models import Employee
 from entities.user.models import User
+from repositories.checklist import ChecklistQuestionRow
 from services.checklist import ChecklistFlowService
 from services.position_change import PositionChangeRequestService
 from services.telegram import TelegramService
@@ -36,11 +42,18 @@ ANSWER_BY_TEXT: Mapping[str, ChecklistAnswerValue] = {
 }
 
 
+def _session_created_at(data: Mapping[str, Any]) -> datetime | None:
+    # Partition key of the running session; missing in states saved before
+    # sessions were partitioned.
+    raw = data.get("session_created_at")
+    return datetime.fromisoformat(raw) if raw else None
+
+
 async def _present_question(
     telegram_service: TelegramService,
     message: Message,
     state: FSMContext,
-    question: ChecklistQuestion,
+    question: ChecklistQuestionRow,
     question_ids: list[int],
 ) -> None:
     question_index = question_ids.index(question.id) + 1
@@ -78,7 +91,10 @@ async def _advance_flow(
         )
         return
 
-    session = await checklist_flow_service.load_session(session_id)
+    session = await checklist_flow_service.get_session_row(
+        session_id,
+        _session_created_at(data),
+    )
     if session is None:
         await state.clear()
         await telegram_service.send_message(
@@ -87,11 +103,14 @@ async def _advance_flow(
         )
         return
 
-    questions = await checklist_flow_service.list_questions(
+    questions = await checklist_flow_service.list_question_rows(
         session.checklist_id,
     )
     if not questions:
-        await checklist_flow_service.complete_session(session)
+        await checklist_flow_service.complete_session(
+            session.id,
+            session.created_at,
+        )
         await telegram_service.send_message(
             chat_id=message.chat.id,
             text="В опросе нет вопросов. Сообщите администратору.",
@@ -108,9 +127,13 @@ async def _advance_flow(
     next_question = await checklist_flow_service.get_next_unanswered_question(
         session.id,
         questions,
+        session.created_at,
     )
     if next_question is None:
-        await checklist_flow_service.complete_session(session)
+        await checklist_flow_service.complete_session(
+            session.id,
+            session.created_at,
+        )
         await state.set_state(ChecklistStates.waiting_feedback_choice)
         await telegram_service.send_message(
             chat_id=message.chat.id,
@@ -161,13 +184,13 @@ async def _start_checklist_flow(
         await state.set_state(ChecklistStates.waiting_tab_number)
         return
 
-    session, created = await checklist_flow_service.start_or_get_session(
-        user_id=user.id,
-        employee=employee,
-        checklist=checklist,
-    )
-    session = await checklist_flow_service.load_session(session.id)
-    if session is None:
+    try:
+        session, created = await checklist_flow_service.start_or_get_session(
+            user_id=user.id,
+            employee=employee,
+            checklist=checklist,
+        )
+    except ChecklistSessionStartError:
         await telegram_service.send_message(
             chat_id=chat_id,
             text="Не удалось подготовить опрос. Попробуйте позже.",
@@ -175,11 +198,14 @@ async def _start_checklist_flow(
         await state.set_state(ChecklistStates.waiting_tab_number)
         return
 
-    questions = await checklist_flow_service.list_questions(
+    questions = await checklist_flow_service.list_question_rows(
         session.checklist_id,
     )
     if not questions:
-        await checklist_flow_service.complete_session(session)
+        await checklist_flow_service.complete_session(
+            session.id,
+            session.created_at,
+        )
         await telegram_service.send_message(
             chat_id=chat_id,
             text="В опросе нет вопросов. Сообщите администратору.",
@@ -189,6 +215,7 @@ async def _start_checklist_flow(
 
     await state.update_data(
         session_id=session.id,
+        session_created_at=session.created_at.isoformat(),
         question_ids=[question.id for question in questions],
     )
 
@@ -245,8 +272,14 @@ async def _save_feedback_and_finish(
         await state.clear()
         await state.set_state(ChecklistStates.waiting_tab_number)
         return
-    session = await checklist_flow_service.load_session(session_id)
-    if session is None:
+    saved = await checklist_flow_service.save_feedback(
+        session_id=session_id,
+        session_created_at=_session_created_at(data),
+        feedback_text=feedback_text,
+        feedback_voice_file_id=feedback_voice_file_id,
+        feedback_voice_unique_id=feedback_voice_unique_id,
+    )
+    if not saved:
         await telegram_service.send_message(
             chat_id=message.chat.id,
             text="Не удалось загрузить данные. Попробуйте позже.",
@@ -254,12 +287,6 @@ async def _save_feedback_and_finish(
         await state.clear()
         await state.set_state(ChecklistStates.waiting_tab_number)
         return
-    await checklist_flow_service.save_feedback(
-        session=session,
-        feedback_text=feedback_text,
-        feedback_voice_file_id=feedback_voice_file_id,
-        feedback_voice_unique_id=feedback_voice_unique_id,
-    )
     await telegram_service.send_message(
         chat_id=message.chat.id,
         text="Спасибо за отзыв!",
@@ -552,7 +579,10 @@ async def handle_answer(
         )
         return
 
-    session = await checklist_flow_service.load_session(session_id)
+    session = await checklist_flow_service.get_session_row(
+        session_id,
+        _session_created_at(data),
+    )
     if session is None:
         await state.clear()
         await telegram_service.send_message(
@@ -561,7 +591,7 @@ async def handle_answer(
         )
         return
 
-    questions = await checklist_flow_service.list_questions(
+    questions = await checklist_flow_service.list_question_rows(
         session.checklist_id,
     )
     question = next(
@@ -590,8 +620,9 @@ async def handle_answer(
         return
 
     await checklist_flow_service.save_answer(
-        session=session,
-        question=question,
+        session_id=session.id,
+        session_created_at=session.created_at,
+        question_id=question.id,
         answer=answer_value,
     )
 
@@ -648,7 +679,10 @@ async def handle_photo(
         )
         return
 
-    session = await checklist_flow_service.load_session(session_id)
+    session = await checklist_flow_service.get_session_row(
+        session_id,
+        _session_created_at(data),
+    )
     if session is None:
         await state.clear()
         await telegram_service.send_message(
@@ -657,7 +691,7 @@ async def handle_photo(
         )
         return
 
-    questions = await checklist_flow_service.list_questions(
+    questions = await checklist_flow_service.list_question_rows(
         session.checklist_id,
     )
     question = next(
@@ -675,8 +709,9 @@ async def handle_photo(
 
     photo: PhotoSize = message.photo[-1]
     await checklist_flow_service.save_answer(
-        session=session,
-        question=question,
+        session_id=session.id,
+        session_created_at=session.created_at,
+        question_id=question.id,
         answer=ChecklistAnswerValue(pending_answer_value),
         photo_file_id=photo.file_id,
         photo_unique_id=photo.file_unique_id,
@@ -1,6 +1,7 @@
 from aiogram.enums import ChatType
 from aiogram.filters import BaseFilter
 from aiogram.types import Message, TelegramObject
+from core.tracing import span
 
 
 class ChatTypeFilter(BaseFilter):
@@ -8,7 +9,11 @@ class ChatTypeFilter(BaseFilter):
         self.chat_type = set(chat_type)
 
     async def __call__(self, event: TelegramObject) -> bool:
-        return isinstance(event, Message) and event.chat.type in self.chat_type
+        with span("ChatTypeFilter", "filter"):
+            return (
+                isinstance(event, Message)
+                and event.chat.type in self.chat_type
+            )
 
 
 class ChatIdFilter(BaseFilter):
@@ -16,4 +21,5 @@ class ChatIdFilter(BaseFilter):
         self.chat_id = set(chat_id)
 
     async def __call__(self, event: TelegramObject) -> bool:
-        return isinstance(event, Message) and event.chat.id in self.chat_id
+        with span("ChatIdFilter", "filter"):
+            return isinstance(event, Message) and event.chat.id in self.chat_id
@@ -1,6 +1,7 @@
 from typing import Any
 
 from aiogram.filters import Filter
+from core.tracing import span
 from entities.user.models import User
 from shared.enums.group import Group
 
@@ -10,10 +11,11 @@ class GroupFilter(Filter):
         self.group = group
 
     async def __call__(self, _: Any, user: User) -> bool:
-        match self.group:
-            case Group.ADMIN:
-                return user.is_admin
-            case Group.USER:
-                return not user.is_banned
-            case _:
-                raise NotImplementedError
+        with span("GroupFilter", "filter", group=self.group.value):
+            match self.group:
+                case Group.ADMIN:
+                    return user.is_admin
+                case Group.USER:
+                    return not user.is_banned
+                case _:
+                    raise NotImplementedError
@@ -0,0 +1,39 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.middlewares.base import BaseMiddleware
+from aiogram.types import TelegramObject
+from core.metrics import telegram_update_duration
+from core.tracing import span
+
+NO_STATE = "none"
+
+
+class TelegramMetricsMiddleware(BaseMiddleware):
+    """Measures handler latency per handler and FSM state."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object: HandlerObject | None = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        handler_name = (
+            f"{callback.__module__}.{callback.__qualname__}"
+            if callback is not None
+            else "unknown"
+        )
+        started = time.perf_counter()
+        try:
+            # Wraps the dishka-injected callback, its own time is DI
+            with span("dishka.inject", "dishka", handler=handler_name):
+                return await handler(event, data)
+        finally:
+            telegram_update_duration.labels(
+                handler=handler_name,
+                state=data.get("raw_state") or NO_STATE,
+            ).observe(time.perf_counter() - started)
@@ -1,16 +1,30 @@
 import json
+import logging
+import random
+import time
 import uuid
 from collections.abc import Awaitable, Callable
 from typing import Any
 
 import structlog
 from aiogram.dispatcher.middlewares.base import BaseMiddleware
-from aiogram.types import TelegramObject
+from aiogram.types import TelegramObject, Update
 from core.logs import logger
+from core.tracing import start_trace
+from telegram.config import telegram_settings
 
 
 class TelegramLoggingMiddleware(BaseMiddleware):
-    """Log polling updates in the same format as HTTP webhook requests."""
+    """Log updates in the same format as HTTP webhook requests.
+
+    Only a compact summary is logged by default; the full update is
+    serialized when TELEGRAM_LOG_FULL_UPDATES is on and debug logging is
+    enabled.
+    """
+
+    def __init__(self) -> None:
+        self.sample_rate = telegram_settings.TELEGRAM_LOG_SAMPLE_RATE
+        self.full_updates = telegram_settings.TELEGRAM_LOG_FULL_UPDATES
 
     async def __call__(
         self,
@@ -23,24 +37,64 @@ class TelegramLoggingMiddleware(BaseMiddleware):
         request_id = str(uuid.uuid4())
         structlog.contextvars.bind_contextvars(request_id=request_id)
 
-        log_params = {
-            "path": "/telegram/polling",
-            "query": "",
-            "method": "UPDATE",
-            "headers": {},
-            "peer_id": self._resolve_peer_id(event),
-            "request_body": self._dump_event(event),
-        }
-        logger.info("Request received", **log_params)
+        sampled = random.random() < self.sample_rate  # noqa: S311
+        log_params = self._summarize(event, data)
+        if sampled:
+            logger.info("Request received", **log_params)
+            if self.full_updates and logger.is_enabled_for(logging.DEBUG):
+                logger.debug("Update payload", update=self._dump_event(event))
+        started = time.perf_counter()
         try:
-            result = await handler(event, data)
+            with start_trace(
+                "telegram.update",
+                update_id=log_params["update_id"],
+                update_type=log_params["update_type"],
+            ) as trace:
+                if trace is not None:
+                    structlog.contextvars.bind_contextvars(
+                        trace_id=trace.trace_id,
+                    )
+                result = await handler(event, data)
         except Exception:
-            logger.exception("Unhandled exception during request processing")
+            logger.exception(
+                "Unhandled exception during request processing",
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                **log_params,
+            )
             raise
-        structlog.contextvars.bind_contextvars(status_code=200, headers={})
-        logger.info("Response processed", **log_params)
+        if sampled:
+            structlog.contextvars.bind_contextvars(status_code=200)
+            logger.info(
+                "Response processed",
+                duration_ms=round((time.perf_counter() - started) * 1000, 2),
+                **log_params,
+            )
         return result
 
+    @classmethod
+    def _summarize(
+        cls,
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> dict[str, Any]:
+        # The user and chat are already resolved by aiogram's own
+        # outer middlewares, so nothing here walks the update.
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        return {
+            "path": "/telegram/polling",
+            "method": "UPDATE",
+            "update_id": getattr(event, "update_id", None),
+            "update_type": (
+                event.event_type if isinstance(event, Update) else None
+            ),
+            "peer_id": (
+                user.id if user is not None else cls._resolve_peer_id(event)
+            ),
+            "chat_id": chat.id if chat is not None else None,
+            "state": data.get("raw_state"),
+        }
+
     @staticmethod
     def _resolve_peer_id(event: TelegramObject) -> int | None:
         user = getattr(event, "from_user", None)
@@ -7,8 +7,10 @@ from aiogram.dispatcher.middlewares.user_context import (
     EventContext,
 )
 from aiogram.types import TelegramObject
+from core.tracing import span
 from di import container
 from dishka import Scope
+from entities.user.models import User
 from services.telegram_auth import TelegramAuthService
 
 USER_CONTEXT_KEY = "user"
@@ -24,11 +26,17 @@ class UserMiddleware(BaseMiddleware):
         user_context: EventContext = data[EVENT_CONTEXT_KEY]
         user = None
         if user_context.user is not None:
-            async with container(scope=Scope.REQUEST) as request_container:
-                user_service = await request_container.get(TelegramAuthService)
-                user = await user_service.create_or_update_user_from_tg(
-                    user_context.user,
-                )
+            with span("UserMiddleware", "middleware"):
+                user = await self._load_user(user_context)
         if user is not None:
             data[USER_CONTEXT_KEY] = user
         return await handler(event, data)
+
+    @staticmethod
+    async def _load_user(user_context: EventContext) -> User:
+        async with container(scope=Scope.REQUEST) as request_container:
+            with span("dishka.get", "dishka", type="TelegramAuthService"):
+                user_service = await request_container.get(TelegramAuthService)
+            return await user_service.create_or_update_user_from_tg(
+                user_context.user,
+            )
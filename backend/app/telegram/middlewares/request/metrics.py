@@ -0,0 +1,36 @@
+import time
+from typing import TYPE_CHECKING
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from core.metrics import telegram_api_request_duration
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """Measures Bot API calls; failures are labelled by exception class."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        result = "ok"
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            result = type(e).__name__
+            raise
+        finally:
+            telegram_api_request_duration.labels(
+                method=type(method).__name__,
+                result=result,
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,27 @@
+from typing import TYPE_CHECKING
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from core.tracing import span, tracing
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class BotApiTracingMiddleware(BaseRequestMiddleware):
+    """Wraps every Bot API call in a span of the current trace."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not tracing():
+            return await make_request(bot, method)
+        with span(f"bot.{method.__api_method__}", "telegram"):
+            return await make_request(bot, method)
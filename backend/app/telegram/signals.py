@@ -1,29 +1,32 @@
-import asyncio
-from contextlib import suppress
+from inspect import signature
+from typing import get_type_hints
 
-from aiogram import Bot, Dispatcher
+from aiogram import Dispatcher, Router
 from core.config import core_settings
 from core.logs import logger
 from di import container
-from dishka import Scope
+from dishka import DependencyKey, Scope
 from dishka.integrations.aiogram import (
     inject_router as inject_router_aiogram,
 )
 from dishka.integrations.aiogram import (
     setup_dishka as setup_dishka_aiogram,
 )
+from dishka.integrations.base import (
+    default_parse_dependency,
+    is_dishka_injected,
+)
 from services.telegram import TelegramService
+from services.telegram_coordinator import TelegramCoordinator
 from telegram.config import telegram_settings
 from telegram.handlers import admin, checklist, commands, service_commands
+from telegram.middlewares.inner.metrics import TelegramMetricsMiddleware
 from telegram.middlewares.outer.logging import TelegramLoggingMiddleware
 from telegram.middlewares.outer.user import UserMiddleware
-
-polling_task: asyncio.Task | None = None
+from telegram.utils.tracing import trace_handlers
 
 
 async def aiogram_startup() -> None:
-    global polling_task
-    bot = await container.get(Bot)
     dispatcher = await container.get(Dispatcher)
     logger.info("Setting up middlewares")
     outer_middlewares = getattr(
@@ -43,25 +46,25 @@ async def aiogram_startup() -> None:
         for middleware in outer_middlewares
     ):
         dispatcher.update.outer_middleware.register(UserMiddleware())
+    for observer in (dispatcher.message, dispatcher.callback_query):
+        if not any(
+            isinstance(middleware, TelegramMetricsMiddleware)
+            for middleware in observer.middleware
+        ):
+            observer.middleware.register(TelegramMetricsMiddleware())
     logger.info("Setting up routers and di")
     dispatcher.include_router(service_commands.router)
     dispatcher.include_router(commands.router)
     dispatcher.include_router(checklist.router)
     dispatcher.include_router(admin.router)
+    trace_handlers(dispatcher)
+    dependencies = _handler_dependencies(dispatcher)
     setup_dishka_aiogram(container, dispatcher, auto_inject=True)
     inject_router_aiogram(dispatcher)
-    if telegram_settings.TELEGRAM_USE_WEBHOOK:
-        logger.info("Configuring webhook mode for Telegram bot")
-        await bot.delete_webhook(drop_pending_updates=True)
-        logger.info(f"Setting webhook to {telegram_settings.webhook_url}")
-        await bot.set_webhook(
-            url=str(telegram_settings.webhook_url),
-            secret_token=telegram_settings.TELEGRAM_SECRET_TOKEN.get_secret_value(),
-        )
-    else:
-        logger.info("Starting polling mode for Telegram bot")
-        await bot.delete_webhook(drop_pending_updates=True)
-        polling_task = asyncio.create_task(dispatcher.start_polling(bot))
+    await _warm_up_dependencies(dependencies)
+    # Only the elected leader registers the webhook or polls
+    coordinator = await container.get(TelegramCoordinator)
+    await coordinator.start()
     if core_settings.DEBUG:
         return
     async with container(scope=Scope.REQUEST) as request_container:
@@ -72,17 +75,36 @@ async def aiogram_startup() -> None:
         )
 
 
+def _handler_dependencies(router: Router) -> set[DependencyKey]:
+    # Read before injection replaces the callbacks
+    keys = set()
+    for sub_router in router.chain_tail:
+        for observer in sub_router.observers.values():
+            for handler in observer.handlers:
+                callback = handler.callback
+                if is_dishka_injected(callback):
+                    continue
+                hints = get_type_hints(callback, include_extras=True)
+                for name, parameter in signature(callback).parameters.items():
+                    key = default_parse_dependency(parameter, hints.get(name))
+                    if key is not None:
+                        keys.add(key)
+    return keys
+
+
+async def _warm_up_dependencies(keys: set[DependencyKey]) -> None:
+    # dishka builds factories on first use; resolve every handler
+    # dependency once so the first update does not pay for it
+    async with container(scope=Scope.REQUEST) as request_container:
+        for key in keys:
+            await request_container.get(key.type_hint, key.component)
+    logger.info("Handler dependencies resolved", count=len(keys))
+
+
 async def aiogram_shutdown() -> None:
-    global polling_task
     logger.info("Shutting down aiogram")
-    if telegram_settings.TELEGRAM_USE_WEBHOOK:
-        bot = await container.get(Bot)
-        await bot.delete_webhook(drop_pending_updates=True)
-    elif polling_task is not None:
-        polling_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await polling_task
-        polling_task = None
+    coordinator = await container.get(TelegramCoordinator)
+    await coordinator.stop()
     if core_settings.DEBUG:
         return
     async with container(scope=Scope.REQUEST) as request_container:
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING
+
+from telegram.config import telegram_settings
+
+if TYPE_CHECKING:
+    from lxml import html
+    from lxml_html_clean import Cleaner
+
+ALLOWED_TAGS = frozenset(
+    {
+        "b",
+        "strong",
+        "i",
+        "em",
+        "u",
+        "ins",
+        "s",
+        "strike",
+        "del",
+        "tg-spoiler",
+        "a",
+        "tg-emoji",
+        "code",
+        "pre",
+    },
+)
+ROOT_TAG = "root"
+ELLIPSIS = "..."
+
+
+@dataclass(frozen=True, slots=True)
+class SanitizerStats:
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class HtmlSanitizer:
+    """Reduces message HTML to the tags Telegram accepts.
+
+    Limits count visible characters, like Telegram does after parsing
+    entities, so truncation never cuts a tag or an entity in half. The
+    parser and cleaner are shared, which is fine on a single event loop
+    but not across threads. lxml is imported with the first markup, so
+    workers that only send plain text never load it.
+    """
+
+    def __init__(self, cache_size: int) -> None:
+        self._sanitize_markup = lru_cache(maxsize=cache_size)(
+            self._sanitize_markup_uncached,
+        )
+
+    @cached_property
+    def parser(self) -> html.HTMLParser:
+        from lxml import html  # noqa: PLC0415
+
+        return html.HTMLParser(remove_blank_text=True, recover=True)
+
+    @cached_property
+    def cleaner(self) -> Cleaner:
+        from lxml_html_clean import Cleaner  # noqa: PLC0415
+
+        return Cleaner(allow_tags=ALLOWED_TAGS | {ROOT_TAG})
+
+    def sanitize(self, text: str, limit: int) -> str:
+        if not text:
+            return text
+        if "<" not in text and "&" not in text:
+            return self._sanitize_plain(text, limit)
+        return self._sanitize_markup(text, limit)
+
+    def stats(self) -> SanitizerStats:
+        info = self._sanitize_markup.cache_info()
+        return SanitizerStats(
+            hits=info.hits,
+            misses=info.misses,
+            size=info.currsize,
+            maxsize=info.maxsize or 0,
+        )
+
+    @staticmethod
+    def _sanitize_plain(text: str, limit: int) -> str:
+        # Mirrors what the parser does to text without tags or entities.
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if text.isspace():
+            return ""
+        if len(text) > limit:
+            text = text[: limit - len(ELLIPSIS)] + ELLIPSIS
+        return text.replace(">", "&gt;")
+
+    def _sanitize_markup_uncached(self, text: str, limit: int) -> str:
+        from lxml import html  # noqa: PLC0415
+
+        root = html.fromstring(
+            f"<{ROOT_TAG}>{text}</{ROOT_TAG}>",
+            parser=self.parser,
+        )
+        self.cleaner(root)
+
+        suffix = ""
+        if len(root.text_content()) > limit:
+            _truncate(root, limit - len(ELLIPSIS))
+            suffix = ELLIPSIS
+        _drop_empty(root)
+
+        serialized = html.tostring(
+            root,
+            with_tail=False,
+            method="xml",
+            encoding="unicode",
+        )
+        if serialized == f"<{ROOT_TAG}/>":
+            return suffix
+        return (
+            serialized.removeprefix(f"<{ROOT_TAG}>").removesuffix(
+                f"</{ROOT_TAG}>",
+            )
+            + suffix
+        )
+
+
+def _truncate(element: html.HtmlElement, budget: int) -> int:
+    """Keep at most budget characters of text under element.
+
+    Returns the budget left for the text that follows the element.
+    """
+    if element.text is not None:
+        element.text = element.text[:budget]
+        budget -= len(element.text)
+    for child in list(element):
+        if budget <= 0:
+            # Removing a child drops its tail as well.
+            element.remove(child)
+            continue
+        budget = _truncate(child, budget)
+        if child.tail is not None:
+            child.tail = child.tail[:budget]
+            budget -= len(child.tail)
+    return budget
+
+
+def _drop_empty(root: html.HtmlElement) -> None:
+    for element in reversed(list(root.iterdescendants())):
+        if not element.text and len(element) == 0:
+            element.drop_tree()
+
+
+html_sanitizer = HtmlSanitizer(telegram_settings.TELEGRAM_HTML_CACHE_SIZE)
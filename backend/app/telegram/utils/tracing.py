@@ -0,0 +1,44 @@
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from aiogram import Router
+from core.tracing import span, tracing
+from dishka.integrations.aiogram import is_dishka_injected
+
+TRACED_MARKER = "__traced_handler__"
+
+
+def trace_handlers(router: Router) -> None:
+    """Run every handler body in a span.
+
+    Must run before dishka injection: the injected wrapper resolves the
+    dependencies outside of the body span, so the time of the enclosing
+    span minus the body is DI resolution.
+    """
+    for sub_router in router.chain_tail:
+        for observer in sub_router.observers.values():
+            if observer.event_name == "update":
+                continue
+            for handler in observer.handlers:
+                callback = handler.callback
+                if getattr(callback, TRACED_MARKER, False):
+                    continue
+                if is_dishka_injected(callback):
+                    continue
+                handler.callback = _traced_handler(callback)
+
+
+def _traced_handler(callback: Callable[..., Any]) -> Callable[..., Any]:
+    name = f"{callback.__module__}.{callback.__qualname__}"
+
+    # wraps keeps the signature and annotations dishka and aiogram inspect
+    @wraps(callback)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not tracing():
+            return await callback(*args, **kwargs)
+        with span(name, "handler"):
+            return await callback(*args, **kwargs)
+
+    setattr(wrapper, TRACED_MARKER, True)
+    return wrapper
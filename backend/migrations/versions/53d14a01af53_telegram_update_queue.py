@@ -0,0 +1,52 @@
+"""telegram update queue
+
+Revision ID: 53d14a01af53
+Revises: 5c0d3b7e21a4
+Create Date: 2025-08-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "53d14a01af53"
+down_revision: Union[str, None] = "5c0d3b7e21a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "telegram_update_queue",
+        sa.Column("id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("shard", sa.SmallInteger(), nullable=False),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_telegram_update_queue_shard_id",
+        "telegram_update_queue",
+        ["shard", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_telegram_update_queue_shard_id",
+        table_name="telegram_update_queue",
+    )
+    op.drop_table("telegram_update_queue")
@@ -0,0 +1,51 @@
+"""notify on app settings changes
+
+Revision ID: 5c0d3b7e21a4
+Revises: 8956f29f7d5e
+Create Date: 2025-08-28 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c0d3b7e21a4"
+down_revision: Union[str, None] = "8956f29f7d5e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The sequence doubles as a settings version for workers that missed
+    # the notification.
+    op.execute("CREATE SEQUENCE app_settings_version_seq")
+    op.execute(
+        """
+        CREATE FUNCTION notify_app_settings_changed() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'app_settings_changed',
+                nextval('app_settings_version_seq')::text
+            );
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER app_settings_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON app_settings
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_app_settings_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER app_settings_changed ON app_settings")
+    op.execute("DROP FUNCTION notify_app_settings_changed()")
+    op.execute("DROP SEQUENCE app_settings_version_seq")
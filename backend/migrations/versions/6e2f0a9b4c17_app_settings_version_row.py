@@ -0,0 +1,82 @@
+"""app settings version row
+
+Revision ID: 6e2f0a9b4c17
+Revises: dd5ac0020ed6
+Create Date: 2025-09-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2f0a9b4c17"
+down_revision: Union[str, None] = "dd5ac0020ed6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # nextval() is visible before the writing transaction commits, so a
+    # reader could pair the new version with the old values. A row update
+    # commits together with the change.
+    op.create_table(
+        "app_settings_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        """
+        INSERT INTO app_settings_version (id, version)
+        SELECT 1, CASE WHEN is_called THEN last_value ELSE 0 END
+        FROM app_settings_version_seq
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_app_settings_changed()
+        RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            new_version bigint;
+        BEGIN
+            UPDATE app_settings_version
+            SET version = version + 1
+            WHERE id = 1
+            RETURNING version INTO new_version;
+            PERFORM pg_notify('app_settings_changed', new_version::text);
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute("DROP SEQUENCE app_settings_version_seq")
+
+
+def downgrade() -> None:
+    op.execute("CREATE SEQUENCE app_settings_version_seq")
+    op.execute(
+        """
+        SELECT setval('app_settings_version_seq', GREATEST(version, 1), version > 0)
+        FROM app_settings_version
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_app_settings_changed()
+        RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM pg_notify(
+                'app_settings_changed',
+                nextval('app_settings_version_seq')::text
+            );
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.drop_table("app_settings_version")
@@ -0,0 +1,58 @@
+"""unique in-progress checklist session per user
+
+Revision ID: 7fa7fd89a896
+Revises: 27174694155c
+Create Date: 2025-08-25 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7fa7fd89a896"
+down_revision: Union[str, None] = "27174694155c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A new enum value can only be used once committed.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TYPE checklistsessionstatus "
+            "ADD VALUE IF NOT EXISTS 'ABANDONED'"
+        )
+    # Older duplicates produced by the check-then-insert race would block
+    # the index; keep the newest in-progress session per user. The others
+    # were never finished, so they must not show up as completed.
+    op.execute(
+        """
+        UPDATE checklist_sessions AS cs
+        SET status = 'ABANDONED'
+        WHERE cs.status = 'IN_PROGRESS'
+          AND EXISTS (
+              SELECT 1
+              FROM checklist_sessions AS newer
+              WHERE newer.user_id = cs.user_id
+                AND newer.status = 'IN_PROGRESS'
+                AND newer.id > cs.id
+          )
+        """
+    )
+    op.create_index(
+        "uq_checklist_sessions_user_in_progress",
+        "checklist_sessions",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "uq_checklist_sessions_user_in_progress",
+        table_name="checklist_sessions",
+    )
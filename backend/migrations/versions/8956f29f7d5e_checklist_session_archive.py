@@ -0,0 +1,60 @@
+"""checklist session archive
+
+Revision ID: 8956f29f7d5e
+Revises: abd1ee225edd
+Create Date: 2025-08-27 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8956f29f7d5e"
+down_revision: Union[str, None] = "abd1ee225edd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "checklist_session_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("checklist_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("feedback_text", sa.Text(), nullable=True),
+        sa.Column("feedback_voice_file_id", sa.String(length=512), nullable=True),
+        sa.Column("feedback_voice_unique_id", sa.String(length=255), nullable=True),
+        sa.Column("feedback_submitted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "answers",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+        ),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_checklist_session_archive_employee_completed",
+        "checklist_session_archive",
+        ["employee_id", sa.text("completed_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_checklist_session_archive_employee_completed",
+        table_name="checklist_session_archive",
+    )
+    op.drop_table("checklist_session_archive")
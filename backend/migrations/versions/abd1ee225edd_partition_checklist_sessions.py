@@ -0,0 +1,358 @@
+"""partition checklist sessions and answers by month
+
+Revision ID: abd1ee225edd
+Revises: fea162c79ec9
+Create Date: 2025-08-26 00:00:00.000000
+
+"""
+from datetime import UTC, date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "abd1ee225edd"
+down_revision: Union[str, None] = "fea162c79ec9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions are created this far ahead of the current month; the
+# application keeps the window rolling after that.
+MONTHS_AHEAD = 3
+
+checklistsessionstatus = postgresql.ENUM(
+    name="checklistsessionstatus",
+    create_type=False,
+)
+checklistanswervalue = postgresql.ENUM(
+    name="checklistanswervalue",
+    create_type=False,
+)
+
+SESSION_COLUMNS = (
+    "id",
+    "user_id",
+    "employee_id",
+    "checklist_id",
+    "status",
+    "completed_at",
+    "created_at",
+    "updated_at",
+    "feedback_text",
+    "feedback_voice_file_id",
+    "feedback_voice_unique_id",
+    "feedback_submitted_at",
+)
+ANSWER_COLUMNS = (
+    "id",
+    "session_id",
+    "question_id",
+    "answer",
+    "photo_file_id",
+    "photo_unique_id",
+    "created_at",
+    "updated_at",
+)
+
+
+def _column_list(columns: Sequence[str], alias: str | None = None) -> str:
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f"{prefix}{column}" for column in columns)
+
+
+def _session_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text(
+                "nextval('checklist_sessions_id_seq'::regclass)",
+            ),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("checklist_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            checklistsessionstatus,
+            server_default=sa.text("'IN_PROGRESS'"),
+            nullable=False,
+        ),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("feedback_text", sa.Text(), nullable=True),
+        sa.Column("feedback_voice_file_id", sa.String(length=512), nullable=True),
+        sa.Column("feedback_voice_unique_id", sa.String(length=255), nullable=True),
+        sa.Column("feedback_submitted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["employee_id"],
+            ["employees.id"],
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["checklist_id"],
+            ["checklists.id"],
+            ondelete="CASCADE",
+        ),
+    ]
+
+
+def _answer_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text(
+                "nextval('checklist_answers_id_seq'::regclass)",
+            ),
+            nullable=False,
+        ),
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("answer", checklistanswervalue, nullable=False),
+        sa.Column("photo_file_id", sa.String(length=512), nullable=True),
+        sa.Column("photo_unique_id", sa.String(length=255), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["question_id"],
+            ["checklist_questions.id"],
+            ondelete="CASCADE",
+        ),
+    ]
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(table: str, first: date, last: date) -> None:
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _detach_sequences() -> None:
+    # Ids keep counting from the old tables' sequences.
+    op.execute("ALTER SEQUENCE checklist_sessions_id_seq OWNED BY NONE")
+    op.execute("ALTER SEQUENCE checklist_answers_id_seq OWNED BY NONE")
+
+
+def _attach_sequences() -> None:
+    op.execute(
+        "ALTER SEQUENCE checklist_sessions_id_seq "
+        "OWNED BY checklist_sessions.id"
+    )
+    op.execute(
+        "ALTER SEQUENCE checklist_answers_id_seq "
+        "OWNED BY checklist_answers.id"
+    )
+
+
+def upgrade() -> None:
+    op.rename_table("checklist_answers", "checklist_answers_legacy")
+    op.rename_table("checklist_sessions", "checklist_sessions_legacy")
+    op.execute(
+        "ALTER INDEX checklist_sessions_pkey "
+        "RENAME TO checklist_sessions_legacy_pkey"
+    )
+    op.execute(
+        "ALTER INDEX checklist_answers_pkey "
+        "RENAME TO checklist_answers_legacy_pkey"
+    )
+    op.execute(
+        "ALTER TABLE checklist_answers_legacy "
+        "RENAME CONSTRAINT uq_checklist_answers_session_question "
+        "TO uq_checklist_answers_legacy_session_question"
+    )
+    op.drop_index(
+        "uq_checklist_sessions_user_in_progress",
+        table_name="checklist_sessions_legacy",
+    )
+    op.drop_index(
+        "ix_checklist_sessions_employee_status_completed",
+        table_name="checklist_sessions_legacy",
+    )
+    _detach_sequences()
+
+    # Unique keys on a partitioned table must contain the partition key, so
+    # both primary keys carry it and answers store their session's
+    # created_at to land in the same month as the session.
+    op.create_table(
+        "checklist_sessions",
+        *_session_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_table(
+        "checklist_answers",
+        *_answer_columns(),
+        sa.Column(
+            "session_created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["session_id", "session_created_at"],
+            ["checklist_sessions.id", "checklist_sessions.created_at"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", "session_created_at"),
+        sa.UniqueConstraint(
+            "session_id",
+            "question_id",
+            "session_created_at",
+            name="uq_checklist_answers_session_question",
+        ),
+        postgresql_partition_by="RANGE (session_created_at)",
+    )
+
+    oldest = op.get_bind().execute(
+        sa.text("SELECT min(created_at) FROM checklist_sessions_legacy"),
+    ).scalar()
+    current = datetime.now(UTC).date().replace(day=1)
+    first = min(oldest.astimezone(UTC).date(), current) if oldest else current
+    first = first.replace(day=1)
+    last = _add_months(current, MONTHS_AHEAD)
+    _create_partitions("checklist_sessions", first, last)
+    _create_partitions("checklist_answers", first, last)
+
+    op.execute(
+        f"INSERT INTO checklist_sessions ({_column_list(SESSION_COLUMNS)}) "
+        f"SELECT {_column_list(SESSION_COLUMNS)} FROM checklist_sessions_legacy"
+    )
+    op.execute(
+        f"""
+        INSERT INTO checklist_answers
+            ({_column_list(ANSWER_COLUMNS)}, session_created_at)
+        SELECT {_column_list(ANSWER_COLUMNS, "a")}, s.created_at
+        FROM checklist_answers_legacy AS a
+        JOIN checklist_sessions_legacy AS s ON s.id = a.session_id
+        """
+    )
+    op.drop_table("checklist_answers_legacy")
+    op.drop_table("checklist_sessions_legacy")
+    _attach_sequences()
+
+    # A per-user unique index is impossible here; the application serializes
+    # session creation with an advisory lock and this index keeps the
+    # lookup cheap in every partition.
+    op.create_index(
+        "ix_checklist_sessions_user_in_progress",
+        "checklist_sessions",
+        ["user_id"],
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+    op.create_index(
+        "ix_checklist_sessions_employee_status_completed",
+        "checklist_sessions",
+        ["employee_id", "status", sa.text("completed_at DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.rename_table("checklist_answers", "checklist_answers_partitioned")
+    op.rename_table("checklist_sessions", "checklist_sessions_partitioned")
+    op.execute(
+        "ALTER INDEX checklist_sessions_pkey "
+        "RENAME TO checklist_sessions_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX checklist_answers_pkey "
+        "RENAME TO checklist_answers_partitioned_pkey"
+    )
+    op.execute(
+        "ALTER TABLE checklist_answers_partitioned "
+        "RENAME CONSTRAINT uq_checklist_answers_session_question "
+        "TO uq_checklist_answers_partitioned_session_question"
+    )
+    op.drop_index(
+        "ix_checklist_sessions_user_in_progress",
+        table_name="checklist_sessions_partitioned",
+    )
+    op.drop_index(
+        "ix_checklist_sessions_employee_status_completed",
+        table_name="checklist_sessions_partitioned",
+    )
+    _detach_sequences()
+
+    op.create_table(
+        "checklist_sessions",
+        *_session_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "checklist_answers",
+        *_answer_columns(),
+        sa.ForeignKeyConstraint(
+            ["session_id"],
+            ["checklist_sessions.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "session_id",
+            "question_id",
+            name="uq_checklist_answers_session_question",
+        ),
+    )
+    op.execute(
+        f"INSERT INTO checklist_sessions ({_column_list(SESSION_COLUMNS)}) "
+        f"SELECT {_column_list(SESSION_COLUMNS)} "
+        "FROM checklist_sessions_partitioned"
+    )
+    op.execute(
+        f"INSERT INTO checklist_answers ({_column_list(ANSWER_COLUMNS)}) "
+        f"SELECT {_column_list(ANSWER_COLUMNS)} "
+        "FROM checklist_answers_partitioned"
+    )
+    op.drop_table("checklist_answers_partitioned")
+    op.drop_table("checklist_sessions_partitioned")
+    _attach_sequences()
+
+    op.create_index(
+        "uq_checklist_sessions_user_in_progress",
+        "checklist_sessions",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'IN_PROGRESS'"),
+    )
+    op.create_index(
+        "ix_checklist_sessions_employee_status_completed",
+        "checklist_sessions",
+        ["employee_id", "status", sa.text("completed_at DESC")],
+    )
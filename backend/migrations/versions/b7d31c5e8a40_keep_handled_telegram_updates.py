@@ -0,0 +1,59 @@
+"""keep handled telegram updates
+
+Revision ID: b7d31c5e8a40
+Revises: 6e2f0a9b4c17
+Create Date: 2025-09-01 00:00:01.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d31c5e8a40"
+down_revision: Union[str, None] = "6e2f0a9b4c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "telegram_update_queue",
+        sa.Column("handled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.drop_index(
+        "ix_telegram_update_queue_shard_id",
+        table_name="telegram_update_queue",
+    )
+    op.create_index(
+        "ix_telegram_update_queue_pending_shard_id",
+        "telegram_update_queue",
+        ["shard", "id"],
+        postgresql_where=sa.text("handled_at IS NULL"),
+    )
+    op.create_index(
+        "ix_telegram_update_queue_handled_at",
+        "telegram_update_queue",
+        ["handled_at"],
+        postgresql_where=sa.text("handled_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM telegram_update_queue WHERE handled_at IS NOT NULL")
+    op.drop_index(
+        "ix_telegram_update_queue_handled_at",
+        table_name="telegram_update_queue",
+    )
+    op.drop_index(
+        "ix_telegram_update_queue_pending_shard_id",
+        table_name="telegram_update_queue",
+    )
+    op.create_index(
+        "ix_telegram_update_queue_shard_id",
+        "telegram_update_queue",
+        ["shard", "id"],
+    )
+    op.drop_column("telegram_update_queue", "handled_at")
@@ -0,0 +1,76 @@
+"""drop default checklist partitions
+
+Revision ID: c4a8e2f19d53
+Revises: b7d31c5e8a40
+Create Date: 2025-09-02 00:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a8e2f19d53"
+down_revision: Union[str, None] = "b7d31c5e8a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Created in this order, detached in reverse, as in db/partitions.py
+TABLES = ("checklist_sessions", "checklist_answers")
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # A default partition rules out DETACH PARTITION CONCURRENTLY. Rows
+    # that landed in it move to monthly partitions created for them.
+    bind = op.get_bind()
+    for table in reversed(TABLES):
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {table}_default")
+        foreign_keys = bind.execute(
+            sa.text(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = CAST(:table AS regclass) AND contype = 'f' "
+                "AND confrelid = CAST('checklist_sessions' AS regclass)"
+            ),
+            {"table": f"{table}_default"},
+        ).scalars()
+        for name in foreign_keys:
+            op.execute(f'ALTER TABLE {table}_default DROP CONSTRAINT "{name}"')
+
+    months = bind.execute(
+        sa.text(
+            """
+            SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')
+            FROM checklist_sessions_default
+            UNION
+            SELECT DISTINCT
+                date_trunc('month', session_created_at AT TIME ZONE 'UTC')
+            FROM checklist_answers_default
+            """
+        ),
+    ).scalars()
+    for month in sorted(value.date() for value in months):
+        upper = _add_months(month, 1)
+        for table in TABLES:
+            op.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y_%m} "
+                f"PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{upper.isoformat()} 00:00:00+00')"
+            )
+    for table in TABLES:
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_default")
+    for table in reversed(TABLES):
+        op.drop_table(f"{table}_default")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
@@ -0,0 +1,84 @@
+"""position change digest
+
+Revision ID: dd5ac0020ed6
+Revises: a25282de7d01
+Create Date: 2025-08-31 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dd5ac0020ed6"
+down_revision: Union[str, None] = "a25282de7d01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "email_outbox",
+        sa.Column(
+            "attachments",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+    op.create_table(
+        "position_change_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tab_number", sa.String(length=50), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("position_name", sa.String(length=255), nullable=True),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("tg_username", sa.String(length=200), nullable=True),
+        sa.Column(
+            "request_count",
+            sa.Integer(),
+            server_default="1",
+            nullable=False,
+        ),
+        sa.Column(
+            "last_requested_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "notified_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["employee_id"],
+            ["employees.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_position_change_requests_pending_tab_number",
+        "position_change_requests",
+        ["tab_number"],
+        unique=True,
+        postgresql_where=sa.text("notified_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "uq_position_change_requests_pending_tab_number",
+        table_name="position_change_requests",
+    )
+    op.drop_table("position_change_requests")
+    op.drop_column("email_outbox", "attachments")
@@ -0,0 +1,67 @@
+"""indexes for hot checklist lookups
+
+Revision ID: fea162c79ec9
+Revises: 7fa7fd89a896
+Create Date: 2025-08-25 00:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "fea162c79ec9"
+down_revision: Union[str, None] = "7fa7fd89a896"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# checklist_answers(session_id) and checklist_questions(checklist_id, order)
+# are already served by uq_checklist_answers_session_question and
+# uq_checklist_questions_checklist_id_order, so they get no extra index.
+INDEXES = (
+    (
+        "ix_checklist_sessions_employee_status_completed",
+        "checklist_sessions",
+        ["employee_id", "status", sa.text("completed_at DESC")],
+        None,
+    ),
+    (
+        "ix_checklists_group_active_created",
+        "checklists",
+        ["group_id", "is_active", sa.text("created_at DESC")],
+        None,
+    ),
+    (
+        "ix_checklists_default_created",
+        "checklists",
+        [sa.text("created_at DESC")],
+        sa.text("is_default IS TRUE"),
+    ),
+)
+
+
+def upgrade() -> None:
+    # checklist_sessions is large; build without blocking writes.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=where,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""CLI helper to move old completed checklist sessions to the archive."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+from core.config import core_settings  # noqa: E402
+from di import container  # noqa: E402
+from dishka import Scope  # noqa: E402
+from services.checklist_archive import ChecklistArchiveService  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Archive completed checklist sessions and their answers",
+    )
+    parser.add_argument(
+        "--older-than-months",
+        type=int,
+        default=None,
+        help="Archive sessions completed before this many months ago",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Sessions moved per transaction",
+    )
+    parser.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        default=None,
+        help="Reference date in YYYY-MM-DD format",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> None:
+    args = parse_args()
+
+    # Defaults for settings the container expects when running from CLI
+    os.environ.setdefault("DOMAIN", "localhost")
+    os.environ.setdefault("JWT_KEY", "change-me")
+    _ = core_settings  # trigger settings load with defaults
+
+    async with container(scope=Scope.REQUEST) as request_container:
+        service = await request_container.get(ChecklistArchiveService)
+        archived = await service.archive_completed(
+            today=args.today,
+            older_than_months=args.older_than_months,
+            batch_size=args.batch_size,
+        )
+    await container.close()
+
+    print(f"Archived sessions: {archived}")
+
+
+def main() -> None:
+    asyncio.run(async_main())
+
+
+if __name__ == "__main__":
+    main()
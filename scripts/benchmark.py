@@ -0,0 +1,684 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for service and repository hot paths.
+
+Creates a throwaway database on the POSTGRES_* server, migrates it with
+alembic, seeds synthetic data and times each case. Medians are compared
+with the committed baseline and the run fails when a case got slower than
+the tolerance allows; --save-baseline records the current numbers instead.
+Baselines are only comparable on the same machine, so refresh the file
+together with the change that moves the numbers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = ROOT_DIR / "backend"
+APP_PATH = BACKEND_DIR / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+# Settings the app modules expect; service logs would drown the timings
+os.environ.setdefault("DOMAIN", "localhost")
+os.environ.setdefault("JWT_KEY", "benchmark")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import entities.user.models  # noqa: E402, F401
+from core.security.token import (  # noqa: E402
+    create_jwt_token,
+    get_token,
+    token_cache,
+)
+from db.config import postgres_settings  # noqa: E402
+from entities.checklist.enums import ChecklistAnswerValue  # noqa: E402
+from entities.checklist.models import ChecklistSession  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+from repositories.checklist import (  # noqa: E402
+    ChecklistAnswerRepository,
+    ChecklistQuestionRepository,
+    ChecklistRepository,
+    ChecklistSessionArchiveRepository,
+    ChecklistSessionRepository,
+    EmployeeRepository,
+    PositionRepository,
+)
+from services.checklist import ChecklistFlowService  # noqa: E402
+from services.employee_import import (  # noqa: E402
+    EmployeeImportService,
+    EmployeeRow,
+    ImportConfig,
+)
+from shared.enums.group import Group  # noqa: E402
+from shared.schemas.token import TokenSchema  # noqa: E402
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from telegram.utils.sanitizer import html_sanitizer  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+US_PER_MS = 1_000
+US_PER_SECOND = 1_000_000
+
+POSITIONS = 100
+GROUPS = 20
+QUESTIONS = 20
+RUNNING_SESSIONS = 20
+# Completed sessions the lookups rotate through
+COMPLETED_SAMPLE = 500
+MARKUP_TEXT = (
+    "<b>Вопрос 3 из 20</b>\n\n<i>Проверьте</i> исправность "
+    '<a href="https://example.com">оборудования</a> и '
+    "<script>alert(1)</script><u>наличие</u> аптечки. " * 8
+)
+PLAIN_TEXT = "Вопрос 3 из 20\n\nПроверьте исправность оборудования. " * 8  # noqa: RUF001
+
+SEED_SQL = (
+    """
+    INSERT INTO positions (name)
+    SELECT 'Position ' || g FROM generate_series(1, :positions) g
+    """,
+    """
+    INSERT INTO checklist_groups (name)
+    SELECT 'Group ' || g FROM generate_series(1, :groups) g
+    """,
+    """
+    INSERT INTO position_checklist_groups (position_id, group_id)
+    SELECT g, g % :groups + 1 FROM generate_series(1, :positions) g
+    """,
+    # One active checklist per group plus older inactive revisions and
+    # the default checklist
+    """
+    INSERT INTO checklists (title, is_active, is_default, group_id, created_at)
+    SELECT 'Checklist ' || g || '.' || r, r = 0, false, g,
+           now() - make_interval(days => r * 30)
+    FROM generate_series(1, :groups) g, generate_series(0, 2) r
+    """,
+    """
+    INSERT INTO checklists (title, is_active, is_default)
+    VALUES ('Default checklist', true, true)
+    """,
+    """
+    INSERT INTO checklist_questions
+        (checklist_id, text, "order", requires_photo)
+    SELECT c.id, 'Question ' || q, q, q % 5 = 0
+    FROM checklists c, generate_series(1, :questions) q
+    """,
+    """
+    INSERT INTO employees (tab_number, position_id, is_active)
+    SELECT g::text, g % :positions + 1, g % 10 <> 0
+    FROM generate_series(1, :employees) g
+    """,
+    """
+    INSERT INTO users (id, tg_first_name, is_banned, admin_flag,
+                       registration_status)
+    SELECT g, 'User ' || g, false, false, 'UNKNOWN'
+    FROM generate_series(1, :users) g
+    """,
+    # Completed sessions spread over half a year of partitions
+    """
+    INSERT INTO checklist_sessions
+        (user_id, employee_id, checklist_id, status, created_at,
+         completed_at)
+    SELECT g % :users + 1, g % :employees + 1,
+           (SELECT id FROM checklists
+            WHERE group_id = g % :groups + 1 AND is_active),
+           'COMPLETED', ts, ts + interval '10 minutes'
+    FROM generate_series(1, :sessions) g,
+         LATERAL (SELECT now() - make_interval(
+             days => g % 180, mins => g % 600) AS ts) t
+    """,
+    """
+    INSERT INTO checklist_answers
+        (session_id, session_created_at, question_id, answer)
+    SELECT s.id, s.created_at, q.id, 'YES'
+    FROM checklist_sessions s
+    JOIN checklist_questions q ON q.checklist_id = s.checklist_id
+    """,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    name: str
+    run: Callable[[int], Awaitable[object]]
+    number: int = 200
+    warmup: int = 10
+    # Calls per timed sample, for cases too fast to time one by one
+    inner: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    median_us: float
+    p95_us: float
+    samples: int
+
+
+class Fixture:
+    """Seeded database plus the ids the cases work on."""
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        args: argparse.Namespace,
+    ) -> None:
+        self.session_maker = session_maker
+        self.args = args
+        self.running: list[ChecklistSession] = []
+        self.completed: list[ChecklistSession] = []
+        self.question_ids: dict[int, list[int]] = {}
+
+    async def seed(self) -> None:
+        params = {
+            "positions": POSITIONS,
+            "groups": GROUPS,
+            "questions": QUESTIONS,
+            "employees": self.args.employees,
+            "users": self.args.users,
+            "sessions": self.args.sessions,
+        }
+        async with self.session_maker() as session:
+            for statement in SEED_SQL:
+                await session.execute(text(statement), params)
+            await session.execute(text("ANALYZE"))
+            await session.commit()
+
+    async def start_sessions(self, count: int) -> None:
+        async with self.session_maker() as session:
+            service = flow_service(session)
+            for index in range(count):
+                employee = await service.get_employee_by_tab_number(
+                    str(index * 10 + 1),
+                )
+                checklist = await service.get_active_checklist_for_employee(
+                    employee,
+                )
+                created, _ = await service.start_or_get_session(
+                    user_id=index + 1,
+                    employee=employee,
+                    checklist=checklist,
+                )
+                self.running.append(created)
+            rows = await session.scalars(
+                select(ChecklistSession)
+                .where(ChecklistSession.completed_at.is_not(None))
+                .limit(COMPLETED_SAMPLE),
+            )
+            self.completed = list(rows)
+            for running in self.running:
+                if running.checklist_id in self.question_ids:
+                    continue
+                questions = await service.list_question_rows(
+                    running.checklist_id,
+                )
+                self.question_ids[running.checklist_id] = [
+                    question.id for question in questions
+                ]
+
+
+def flow_service(session: AsyncSession) -> ChecklistFlowService:
+    return ChecklistFlowService(
+        employee_repository=EmployeeRepository(session),
+        checklist_repository=ChecklistRepository(session),
+        question_repository=ChecklistQuestionRepository(session),
+        session_repository=ChecklistSessionRepository(session),
+        answer_repository=ChecklistAnswerRepository(session),
+        archive_repository=ChecklistSessionArchiveRepository(session),
+    )
+
+
+def import_service(session: AsyncSession) -> EmployeeImportService:
+    # _read_rows and _process_rows never touch the settings service
+    return EmployeeImportService(
+        position_repo=PositionRepository(session),
+        employee_repo=EmployeeRepository(session),
+        app_settings_service=None,  # type: ignore[arg-type]
+    )
+
+
+def build_workbook(rows: int, config: ImportConfig) -> bytes:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([config.column_tab_number, config.column_position])
+    for index in range(1, rows + 1):
+        sheet.append([index, f"Position {index % POSITIONS + 1}"])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+async def build_cases(fixture: Fixture) -> list[Case]:  # noqa: PLR0915
+    maker = fixture.session_maker
+    running = fixture.running
+    completed = fixture.completed
+
+    def with_session(
+        call: Callable[[AsyncSession, int], Awaitable[object]],
+    ) -> Callable[[int], Awaitable[object]]:
+        # One session per call, like one webhook update or API request
+        async def run(index: int) -> object:
+            async with maker() as session:
+                return await call(session, index)
+
+        return run
+
+    def answer_target(index: int) -> tuple[ChecklistSession, int]:
+        checklist_session = running[index % len(running)]
+        question_ids = fixture.question_ids[checklist_session.checklist_id]
+        round_ = index // len(running)
+        return checklist_session, question_ids[round_ % len(question_ids)]
+
+    async def shrink_plain(_: int) -> object:
+        return html_sanitizer.sanitize(PLAIN_TEXT, 4096)
+
+    async def shrink_markup_cached(_: int) -> object:
+        return html_sanitizer.sanitize(MARKUP_TEXT, 4096)
+
+    async def shrink_markup(index: int) -> object:
+        return html_sanitizer.sanitize(f"{index} {MARKUP_TEXT}", 4096)
+
+    token = create_jwt_token(TokenSchema(user_id=1, groups=[Group.USER]))
+
+    async def token_cached(_: int) -> object:
+        return get_token(token)
+
+    async def token_uncached(_: int) -> object:
+        token_cache.clear()
+        return get_token(token)
+
+    async def employee_by_tab(session: AsyncSession, index: int) -> object:
+        return await flow_service(session).get_employee_by_tab_number(
+            str(index % fixture.args.employees + 1),
+        )
+
+    async def active_checklist(session: AsyncSession, index: int) -> object:
+        service = flow_service(session)
+        employee = await service.get_employee_by_tab_number(
+            str(index % fixture.args.employees + 1),
+        )
+        return await service.get_active_checklist_for_employee(employee)
+
+    async def next_question(session: AsyncSession, index: int) -> object:
+        service = flow_service(session)
+        checklist_session = running[index % len(running)]
+        questions = await service.list_question_rows(
+            checklist_session.checklist_id,
+        )
+        return await service.get_next_unanswered_question(
+            checklist_session.id,
+            questions,
+            checklist_session.created_at,
+        )
+
+    async def save_answer(session: AsyncSession, index: int) -> object:
+        checklist_session, question_id = answer_target(index)
+        return await flow_service(session).save_answer(
+            session_id=checklist_session.id,
+            session_created_at=checklist_session.created_at,
+            question_id=question_id,
+            answer=ChecklistAnswerValue.NO,
+        )
+
+    async def session_row(session: AsyncSession, index: int) -> object:
+        target = completed[index % len(completed)]
+        return await ChecklistSessionRepository(session).get_row(
+            target.id,
+            target.created_at,
+        )
+
+    async def report_row(session: AsyncSession, index: int) -> object:
+        target = completed[index % len(completed)]
+        return await ChecklistSessionRepository(session).get_report_row(
+            target.id,
+            target.created_at,
+        )
+
+    async def in_progress(session: AsyncSession, index: int) -> object:
+        repository = ChecklistSessionRepository(session)
+        return await repository.get_in_progress_for_user(
+            index % fixture.args.users + 1,
+        )
+
+    async def completed_on_date(session: AsyncSession, index: int) -> object:
+        target = completed[index % len(completed)]
+        repository = ChecklistSessionRepository(session)
+        return await repository.get_completed_key_for_employee_on_date(
+            target.employee_id,
+            target.completed_at.date(),
+        )
+
+    async def create_in_progress(session: AsyncSession, index: int) -> object:
+        # Users past the seeded ones have no running session yet
+        user_id = fixture.args.users - index
+        return await ChecklistSessionRepository(session).create_in_progress(
+            user_id=user_id,
+            employee_id=index + 1,
+            checklist_id=running[0].checklist_id,
+        )
+
+    async def answer_ids(session: AsyncSession, index: int) -> object:
+        target = completed[index % len(completed)]
+        repository = ChecklistAnswerRepository(session)
+        return await repository.list_question_ids_for_session(
+            target.id,
+            target.created_at,
+        )
+
+    async def answer_rows(session: AsyncSession, index: int) -> object:
+        target = completed[index % len(completed)]
+        return await ChecklistAnswerRepository(session).list_rows_for_session(
+            target.id,
+            target.created_at,
+        )
+
+    cases = [
+        Case("shrink_html.plain", shrink_plain, inner=1000),
+        Case("shrink_html.markup_cached", shrink_markup_cached, inner=1000),
+        Case("shrink_html.markup", shrink_markup, inner=20),
+        Case("get_token.cached", token_cached, inner=1000),
+        Case("get_token.uncached", token_uncached, inner=50),
+        Case(
+            "checklist.get_employee_by_tab_number",
+            with_session(employee_by_tab),
+        ),
+        Case(
+            "checklist.get_active_checklist_for_employee",
+            with_session(active_checklist),
+        ),
+        Case(
+            "checklist.get_next_unanswered_question",
+            with_session(next_question),
+        ),
+        # The first pass over (session, question) pairs inserts, the
+        # second one updates the same answers
+        Case(
+            "checklist.save_answer.insert",
+            with_session(save_answer),
+            number=len(running) * QUESTIONS // 2,
+            warmup=0,
+        ),
+        Case(
+            "checklist.save_answer.update",
+            with_session(save_answer),
+            number=len(running) * QUESTIONS // 2,
+            warmup=0,
+        ),
+        Case("sessions.get_row", with_session(session_row)),
+        Case("sessions.get_report_row", with_session(report_row)),
+        Case("sessions.get_in_progress_for_user", with_session(in_progress)),
+        Case(
+            "sessions.get_completed_key_for_employee_on_date",
+            with_session(completed_on_date),
+        ),
+        Case(
+            "sessions.create_in_progress",
+            with_session(create_in_progress),
+            warmup=0,
+        ),
+        Case(
+            "answers.list_question_ids_for_session",
+            with_session(answer_ids),
+        ),
+        Case("answers.list_rows_for_session", with_session(answer_rows)),
+    ]
+
+    config = ImportConfig(
+        sheet_name=None,
+        column_tab_number="Табельный номер",
+        column_position="Должность",
+    )
+    for rows in fixture.args.import_rows:
+        data = build_workbook(rows, config)
+
+        async def read_rows(
+            session: AsyncSession,
+            _: int,
+            data: bytes = data,
+        ) -> object:
+            service = import_service(session)
+            return list(service._read_rows(io.BytesIO(data), config))
+
+        async with maker() as session:
+            service = import_service(session)
+            parsed = list(service._read_rows(io.BytesIO(data), config))
+
+        async def process_rows(
+            session: AsyncSession,
+            _: int,
+            parsed: list[EmployeeRow] = parsed,
+        ) -> object:
+            return await import_service(session)._process_rows(parsed)
+
+        cases.append(
+            Case(
+                f"import.read_rows[{rows}]",
+                with_session(read_rows),
+                number=3,
+                warmup=1,
+            ),
+        )
+        # Import over the seeded employees: known tab numbers are updated,
+        # new ones created and the rest deactivated
+        cases.append(
+            Case(
+                f"import.process_rows[{rows}]",
+                with_session(process_rows),
+                number=1,
+                warmup=0,
+            ),
+        )
+    return cases
+
+
+async def measure(case: Case) -> Result:
+    for index in range(case.warmup):
+        await case.run(index)
+    samples = []
+    for number in range(case.number):
+        base = (case.warmup + number) * case.inner
+        started = time.perf_counter()
+        for index in range(base, base + case.inner):
+            await case.run(index)
+        samples.append(
+            (time.perf_counter() - started) / case.inner * US_PER_SECOND,
+        )
+    samples.sort()
+    return Result(
+        median_us=statistics.median(samples),
+        p95_us=samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        samples=len(samples),
+    )
+
+
+def format_us(value: float) -> str:
+    if value >= US_PER_SECOND:
+        return f"{value / US_PER_SECOND:.2f} s"
+    if value >= US_PER_MS:
+        return f"{value / US_PER_MS:.2f} ms"
+    return f"{value:.1f} us"
+
+
+def compare(
+    results: dict[str, Result],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> int:
+    regressions = 0
+    print(f"{'case':<50}{'median':>12}{'p95':>12}{'baseline':>12}{'ratio':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        ratio = ""
+        status = ""
+        if previous:
+            value = result.median_us / previous["median_us"]
+            ratio = f"{value:.2f}"
+            if value > 1 + tolerance:
+                regressions += 1
+                status = "  SLOWER"
+        print(
+            f"{name:<50}{format_us(result.median_us):>12}"
+            f"{format_us(result.p95_us):>12}"
+            f"{format_us(previous['median_us']) if previous else '-':>12}"
+            f"{ratio:>8}{status}",
+        )
+    return regressions
+
+
+async def recreate_database(name: str, *, create: bool = True) -> None:
+    # Runs against POSTGRES_DB, the throwaway database is never connected
+    engine = create_async_engine(
+        postgres_settings.async_url,
+        isolation_level="AUTOCOMMIT",
+    )
+    try:
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql(
+                f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)',
+            )
+            if create:
+                await connection.exec_driver_sql(f'CREATE DATABASE "{name}"')
+    finally:
+        await engine.dispose()
+
+
+def migrate(name: str) -> None:
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "POSTGRES_DB": name},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Time service and repository hot paths",
+    )
+    parser.add_argument(
+        "--database",
+        default="checklist_benchmark",
+        help="Name of the throwaway database (dropped and recreated)",
+    )
+    parser.add_argument(
+        "--keep-database",
+        action="store_true",
+        help="Leave the seeded database behind after the run",
+    )
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=20_000,
+        help=f"Completed sessions, {QUESTIONS} answers each",
+    )
+    parser.add_argument(
+        "--import-rows",
+        type=lambda value: [int(part) for part in value.split(",") if part],
+        default=[10_000, 100_000],
+        help="Comma separated XLSX sizes for the import cases",
+    )
+    parser.add_argument(
+        "--only",
+        default=None,
+        help="Run only cases whose name contains this text",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write the results to the baseline file",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="Allowed median slowdown against the baseline, 0.3 = 30%%",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+    await recreate_database(args.database)
+    migrate(args.database)
+    settings = postgres_settings.model_copy(
+        update={"POSTGRES_DB": args.database},
+    )
+    engine = create_async_engine(settings.async_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    results: dict[str, Result] = {}
+    try:
+        fixture = Fixture(session_maker, args)
+        started = time.perf_counter()
+        await fixture.seed()
+        await fixture.start_sessions(RUNNING_SESSIONS)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+        for case in await build_cases(fixture):
+            if args.only and args.only not in case.name:
+                continue
+            results[case.name] = await measure(case)
+    finally:
+        await engine.dispose()
+        if not args.keep_database:
+            await recreate_database(args.database, create=False)
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if args.save_baseline:
+        payload = {
+            "meta": {
+                "created": datetime.now(UTC).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+            },
+            "results": {
+                name: {
+                    "median_us": round(result.median_us, 2),
+                    "p95_us": round(result.p95_us, 2),
+                }
+                for name, result in sorted(results.items())
+            },
+        }
+        args.baseline.write_text(
+            json.dumps(payload, indent=2, ensure_ascii=False) + "\n",
+        )
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{regressions} case(s) slower than the baseline")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""Send queued emails through a local SMTP server and check the outbox.
+
+Creates a throwaway database on the POSTGRES_* server, points the
+position change notification setting at an aiosmtpd server started in
+process, queues emails through EmailService and runs the real outbox
+sender. The server answers 451 to the first DATA commands and 550 to one
+recipient, so the run checks that every other email arrives, that
+temporary failures are retried and permanent ones given up, and that the
+whole backlog goes over a single reused SMTP connection. It then switches
+the setting to digest mode, repeats position change requests and checks
+that one email with a deduplicated CSV arrives once the window has
+passed. Needs the dev dependencies (aiosmtpd).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import socket
+import sys
+import time
+from email import message_from_bytes, policy
+from pathlib import Path
+from typing import Any
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+os.environ.setdefault("DOMAIN", "localhost")
+os.environ.setdefault("JWT_KEY", "email-outbox")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:email-outbox")
+os.environ.setdefault("TELEGRAM_SECRET_TOKEN", "email-outbox")
+os.environ.setdefault("TELEGRAM_ADMIN_CHAT_ID", "-1001")
+os.environ.setdefault("TELEGRAM_SERVICE_CHAT_ID", "-1002")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Retries come back within the run instead of after half a minute
+os.environ.setdefault("EMAIL_RETRY_BASE_DELAY", "0.2")
+os.environ.setdefault("EMAIL_OUTBOX_POLL_INTERVAL", "0.2")
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from benchmark import migrate, recreate_database  # noqa: E402
+from db.config import postgres_settings  # noqa: E402
+from di import container  # noqa: E402
+from dishka import Scope  # noqa: E402
+from entities.user.models import User  # noqa: E402
+from repositories.checklist import EmployeeRepository  # noqa: E402
+from services.app_settings import AppSettingsCache  # noqa: E402
+from services.email import EmailService  # noqa: E402
+from services.email_outbox import EmailOutboxSender  # noqa: E402
+from services.position_change import (  # noqa: E402
+    POSITION_CHANGE_SETTINGS_KEY,
+    PositionChangeRequestService,
+)
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine  # noqa: E402
+
+FROM_EMAIL = "bot@example.com"
+TO_EMAIL = "hr@example.com"
+REJECTED_EMAIL = "nobody@example.com"
+DIGEST_EMPLOYEES = 20
+DIGEST_SQL = (
+    "INSERT INTO positions (name) VALUES ('Оператор')",
+    """
+    INSERT INTO employees (tab_number, position_id, is_active)
+    SELECT n::text, (SELECT id FROM positions), true
+    FROM generate_series(1, :employees) AS n
+    """,
+    """
+    UPDATE app_settings
+    SET value = CAST(
+        CAST(value AS JSONB)
+        || CAST('{"digest_minutes": 60, "digest_format": "csv"}' AS JSONB)
+        AS JSON
+    )
+    WHERE key = :key
+    """,
+)
+
+
+class RecordingHandler:
+    """aiosmtpd handler counting connections and delivered messages."""
+
+    def __init__(self, temporary_failures: int) -> None:
+        self.temporary_failures = temporary_failures
+        self.connections = 0
+        self.subjects: list[str] = []
+        self.contents: list[bytes] = []
+
+    async def handle_EHLO(  # noqa: N802
+        self,
+        _server: Any,
+        session: Any,
+        _envelope: Any,
+        hostname: str,
+        responses: list[str],
+    ) -> list[str]:
+        # smtplib greets once per connection
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(  # noqa: N802
+        self,
+        _server: Any,
+        _session: Any,
+        envelope: Any,
+        address: str,
+        _rcpt_options: list[str],
+    ) -> str:
+        if address == REJECTED_EMAIL:
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(  # noqa: N802
+        self,
+        _server: Any,
+        _session: Any,
+        envelope: Any,
+    ) -> str:
+        if self.temporary_failures > 0:
+            self.temporary_failures -= 1
+            return "451 4.3.0 Try again later"
+        self.contents.append(envelope.content)
+        content = envelope.content.decode("utf-8", errors="replace")
+        for line in content.splitlines():
+            if line.startswith("Subject: "):
+                self.subjects.append(line.removeprefix("Subject: "))
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    # The controller cannot bind port 0: it connects to its own port
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def seed_settings(engine: AsyncEngine, port: int) -> None:
+    config = {
+        "smtp_host": "127.0.0.1",
+        "smtp_port": port,
+        "use_tls": False,
+        "from_email": FROM_EMAIL,
+        "to_emails": [TO_EMAIL],
+    }
+    async with engine.begin() as connection:
+        await connection.execute(
+            text(
+                "INSERT INTO app_settings (key, value) "
+                "VALUES (:key, CAST(:value AS JSONB)) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value",
+            ),
+            {"key": POSITION_CHANGE_SETTINGS_KEY, "value": json.dumps(config)},
+        )
+
+
+async def enqueue(count: int) -> float:
+    started = time.perf_counter()
+    async with container(scope=Scope.REQUEST) as request_container:
+        email_service = await request_container.get(EmailService)
+        for number in range(count):
+            await email_service.enqueue(
+                settings_key=POSITION_CHANGE_SETTINGS_KEY,
+                from_email=FROM_EMAIL,
+                to_emails=[TO_EMAIL],
+                subject=f"Outbox check {number}",
+                body="Queued by scripts/check_email_outbox.py",
+            )
+        await email_service.enqueue(
+            settings_key=POSITION_CHANGE_SETTINGS_KEY,
+            from_email=FROM_EMAIL,
+            to_emails=[REJECTED_EMAIL],
+            subject="Outbox check rejected",
+            body="Refused with 550, must not be retried",
+        )
+    return (time.perf_counter() - started) / (count + 1)
+
+
+async def wait_for_outbox(engine: AsyncEngine, max_wait: float) -> bool:
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        async with engine.connect() as connection:
+            pending = await connection.scalar(
+                text(
+                    "SELECT count(*) FROM email_outbox "
+                    "WHERE sent_at IS NULL AND failed_at IS NULL",
+                ),
+            )
+        if not pending:
+            return True
+        await asyncio.sleep(0.1)
+    return False
+
+
+async def outbox_rows(engine: AsyncEngine) -> list[Any]:
+    async with engine.connect() as connection:
+        result = await connection.execute(
+            text(
+                "SELECT subject, attempts, sent_at IS NOT NULL, "
+                "failed_at IS NOT NULL, last_error FROM email_outbox "
+                "ORDER BY id",
+            ),
+        )
+        return list(result)
+
+
+def report(
+    rows: list[Any],
+    handler: RecordingHandler,
+    count: int,
+    temporary_failures: int,
+) -> list[str]:
+    problems = []
+    sent = [row for row in rows if row[2]]
+    failed = [row for row in rows if row[3]]
+    retried = [row for row in sent if row[1] > 1]
+    print(
+        f"sent {len(sent)}, failed {len(failed)}, retried {len(retried)}, "
+        f"delivered {len(handler.subjects)} over "
+        f"{handler.connections} SMTP connection(s)",
+    )
+    if len(sent) != count or len(handler.subjects) != count:
+        problems.append(f"expected {count} delivered emails")
+    if len(retried) != temporary_failures:
+        problems.append(
+            f"expected {temporary_failures} emails sent on a retry",
+        )
+    if [row[0] for row in failed] != ["Outbox check rejected"]:
+        problems.append("expected only the rejected email to fail")
+    elif failed[0][1] != 1:
+        problems.append("a permanent failure must not be retried")
+    # The 550 reply leaves the connection usable, 451 too
+    if handler.connections != 1:
+        problems.append("expected the SMTP connection to be reused")
+    return problems
+
+
+async def check_digest(
+    engine: AsyncEngine,
+    settings_cache: AppSettingsCache,
+    handler: RecordingHandler,
+    max_wait: float,
+) -> list[str]:
+    async with engine.begin() as connection:
+        for statement in DIGEST_SQL:
+            await connection.execute(
+                text(statement),
+                {
+                    "employees": DIGEST_EMPLOYEES,
+                    "key": POSITION_CHANGE_SETTINGS_KEY,
+                },
+            )
+    await settings_cache.reload()
+    delivered = len(handler.contents)
+
+    async with container(scope=Scope.REQUEST) as request_container:
+        service = await request_container.get(PositionChangeRequestService)
+        employees = await request_container.get(EmployeeRepository)
+        # Every tab number is requested twice, by two different users
+        for user_id in (1, 2):
+            user = User(id=user_id, tg_username=f"user{user_id}")
+            for tab_number in range(1, DIGEST_EMPLOYEES + 1):
+                employee = await employees.get_by_tab_number(str(tab_number))
+                await service.send_request(user, employee)
+        early = await service.send_digest()
+
+    async with engine.begin() as connection:
+        await connection.execute(
+            text(
+                "UPDATE position_change_requests "
+                "SET created_at = created_at - interval '1 hour'",
+            ),
+        )
+    async with container(scope=Scope.REQUEST) as request_container:
+        service = await request_container.get(PositionChangeRequestService)
+        digested = await service.send_digest()
+    await wait_for_outbox(engine, max_wait)
+
+    problems = []
+    digests = handler.contents[delivered:]
+    print(
+        f"digest: {early} requests sent before the window, {digested} "
+        f"after it, {len(digests)} email(s)",
+    )
+    if early:
+        problems.append("the digest went out before its window")
+    if digested != DIGEST_EMPLOYEES or len(digests) != 1:
+        problems.append(
+            f"expected one digest of {DIGEST_EMPLOYEES} tab numbers",
+        )
+        return problems
+    message = message_from_bytes(digests[0], policy=policy.default)
+    attachment = next(message.iter_attachments(), None)
+    if attachment is None:
+        problems.append("the digest has no CSV attachment")
+        return problems
+    content = attachment.get_content().removeprefix("\ufeff")
+    rows = list(csv.reader(io.StringIO(content), delimiter=";"))[1:]
+    if sorted(row[0] for row in rows) != sorted(
+        str(tab_number) for tab_number in range(1, DIGEST_EMPLOYEES + 1)
+    ):
+        problems.append("the CSV does not list every tab number once")
+    if any(row[2] != "@user2" or row[3] != "2" for row in rows):
+        problems.append("repeated requests were not merged")
+    return problems
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Deliver queued emails to a local SMTP server",
+    )
+    parser.add_argument(
+        "--database",
+        default="checklist_email_outbox",
+        help="Name of the throwaway database (dropped and recreated)",
+    )
+    parser.add_argument(
+        "--keep-database",
+        action="store_true",
+        help="Leave the database behind after the run",
+    )
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--temporary-failures", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+    await recreate_database(args.database)
+    migrate(args.database)
+    # The container creates the engine lazily from these settings
+    server_database = postgres_settings.POSTGRES_DB
+    postgres_settings.POSTGRES_DB = args.database
+    handler = RecordingHandler(args.temporary_failures)
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+    )
+    controller.start()
+    try:
+        engine = await container.get(AsyncEngine)
+        await seed_settings(engine, controller.port)
+        settings_cache = await container.get(AppSettingsCache)
+        await settings_cache.start()
+        sender = await container.get(EmailOutboxSender)
+
+        # Queued before the sender starts, so the backlog goes in batches
+        enqueue_ms = await enqueue(args.emails) * 1000
+        print(f"enqueue: {enqueue_ms:.2f} ms per email")
+        started = time.perf_counter()
+        await sender.start()
+        drained = await wait_for_outbox(engine, args.timeout)
+        print(f"outbox drained in {time.perf_counter() - started:.2f} s")
+        rows = await outbox_rows(engine)
+        problems = report(
+            rows,
+            handler,
+            args.emails,
+            args.temporary_failures,
+        )
+        if not drained:
+            problems.append(
+                f"outbox not drained within {args.timeout:.0f} s",
+            )
+        problems += await check_digest(
+            engine,
+            settings_cache,
+            handler,
+            args.timeout,
+        )
+        await sender.stop()
+        await settings_cache.stop()
+    finally:
+        controller.stop()
+        await container.close()
+        postgres_settings.POSTGRES_DB = server_database
+        if not args.keep_database:
+            await recreate_database(args.database, create=False)
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Measure how long a worker spends importing the application.
+
+Runs `python -X importtime -c "import asgi.app"` in fresh interpreters,
+which is what every Granian worker does before serving, and reports the
+median total with the slowest modules and top-level packages. The run
+fails when a module that must stay lazy (openpyxl, lxml) is imported at
+startup, or when the median exceeds --budget-ms. Timings are only
+comparable on the same machine; the first run only warms the bytecode
+cache and is not counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+
+# Settings validated on import; the values are never used
+REQUIRED_ENV = {
+    "DOMAIN": "localhost",
+    "JWT_KEY": "import-time",
+    "POSTGRES_PASSWORD": "import-time",
+    "TELEGRAM_BOT_TOKEN": "1:import-time",
+    "TELEGRAM_SECRET_TOKEN": "import-time",
+    "TELEGRAM_ADMIN_CHAT_ID": "-1001",
+    "TELEGRAM_SERVICE_CHAT_ID": "-1002",
+}
+# Only needed by employee imports and outgoing HTML
+LAZY_MODULES = ("openpyxl", "lxml", "lxml_html_clean")
+US_PER_MS = 1_000
+
+LINE_RE = re.compile(
+    r"^import time:\s+(?P<own>\d+) \|\s+(?P<total>\d+) \|(?P<pad> *)"
+    r"(?P<name>\S+)$",
+)
+
+
+@dataclass(slots=True)
+class ImportedModule:
+    name: str
+    depth: int
+    own_us: int
+    total_us: int
+
+
+def run_importtime(target: str) -> list[ImportedModule]:
+    env = {**REQUIRED_ENV, **os.environ, "LOG_LEVEL": "WARNING"}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=APP_PATH,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match is None:
+            continue
+        modules.append(
+            ImportedModule(
+                name=match["name"],
+                depth=(len(match["pad"]) - 1) // 2,
+                own_us=int(match["own"]),
+                total_us=int(match["total"]),
+            ),
+        )
+    return modules
+
+
+def report(runs: list[list[ImportedModule]], target: str, top: int) -> float:
+    totals = [
+        next(module.total_us for module in run if module.name == target)
+        for run in runs
+    ]
+    median_ms = statistics.median(totals) / US_PER_MS
+    print(
+        f"{target}: median {median_ms:.0f} ms over {len(runs)} runs "
+        f"(min {min(totals) / US_PER_MS:.0f}, "
+        f"max {max(totals) / US_PER_MS:.0f})",
+    )
+
+    # Per-module numbers come from the run closest to the median
+    run = min(
+        runs,
+        key=lambda each: abs(
+            next(m.total_us for m in each if m.name == target)
+            - statistics.median(totals),
+        ),
+    )
+    packages: Counter[str] = Counter()
+    for module in run:
+        packages[module.name.partition(".")[0]] += module.own_us
+
+    print(f"\nTop-level packages by own time ({len(packages)} imported):")
+    for name, own_us in packages.most_common(top):
+        print(f"{own_us / US_PER_MS:9.1f} ms  {name}")
+
+    print("\nModules by cumulative time:")
+    for module in sorted(run, key=lambda m: m.total_us, reverse=True)[:top]:
+        print(
+            f"{module.total_us / US_PER_MS:9.1f} ms  "
+            f"{'  ' * module.depth}{module.name}",
+        )
+    return median_ms
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the ASGI application",
+    )
+    parser.add_argument("--target", default="asgi.app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="fail when the median import time is above this",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    run_importtime(args.target)
+    runs = [run_importtime(args.target) for _ in range(args.runs)]
+    median_ms = report(runs, args.target, args.top)
+
+    failed = False
+    eager = sorted(
+        {module.name.partition(".")[0] for module in runs[0]}
+        & set(LAZY_MODULES),
+    )
+    if eager:
+        print(f"\nImported at startup, must stay lazy: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and median_ms > args.budget_ms:
+        print(f"\nOver budget: {median_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
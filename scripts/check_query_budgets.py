@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""Check the number of SQL statements every Telegram handler issues.
+
+Creates a throwaway database on the POSTGRES_* server, migrates and seeds
+it, then feeds a fixed scenario of updates through the real dispatcher:
+middlewares, filters, FSM (in memory) and DI, with the in-process fake Bot
+API instead of Telegram. Statements are counted per update and compared
+with the committed budgets; the run fails when a step issues more than its
+budget, which is how a new N+1 or a duplicate load shows up. After an
+intended change refresh the file with --update and commit it together
+with the change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from itertools import count
+from pathlib import Path
+from typing import Any
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+# Nothing may reach Telegram; webhook mode keeps polling from starting
+os.environ["TELEGRAM_FAKE_API"] = "true"
+os.environ["TELEGRAM_USE_WEBHOOK"] = "true"
+os.environ["TELEGRAM_FAKE_LATENCY"] = "0"
+os.environ["TELEGRAM_FAKE_RETRY_AFTER_RATE"] = "0"
+os.environ.setdefault("DOMAIN", "localhost")
+os.environ.setdefault("JWT_KEY", "query-budgets")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:query-budgets")
+os.environ.setdefault("TELEGRAM_SECRET_TOKEN", "query-budgets")
+os.environ.setdefault("TELEGRAM_ADMIN_CHAT_ID", "-1001")
+os.environ.setdefault("TELEGRAM_SERVICE_CHAT_ID", "-1002")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.client.session.base import BaseSession  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+from benchmark import migrate, recreate_database  # noqa: E402
+from db.config import postgres_settings  # noqa: E402
+from di import container  # noqa: E402
+from openpyxl import Workbook  # noqa: E402
+from services.employee_import import IMPORT_CONFIG_KEY  # noqa: E402
+from services.position_change import (  # noqa: E402
+    POSITION_CHANGE_SETTINGS_KEY,
+)
+from sqlalchemy import event, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine  # noqa: E402
+from telegram.config import telegram_settings  # noqa: E402
+from telegram.fake_api import BOT_USER, FakeTelegramSession  # noqa: E402
+from telegram.signals import aiogram_shutdown, aiogram_startup  # noqa: E402
+
+BUDGETS_PATH = Path(__file__).with_name("query_budgets.json")
+
+USER_ID = 1001
+SECOND_USER_ID = 1002
+ADMIN_ID = 2001
+IMPORT_FILE_ID = "employees-xlsx"
+
+SEED_SQL = (
+    "INSERT INTO positions (name) VALUES ('Оператор'), ('Мастер')",
+    "INSERT INTO checklist_groups (name) VALUES ('Цех')",
+    """
+    INSERT INTO position_checklist_groups (position_id, group_id)
+    SELECT p.id, g.id FROM positions p, checklist_groups g
+    """,
+    """
+    INSERT INTO checklists (title, is_active, is_default, group_id)
+    SELECT 'Смена', true, false, id FROM checklist_groups
+    """,
+    # The second question needs a photo
+    """
+    INSERT INTO checklist_questions
+        (checklist_id, text, "order", requires_photo)
+    SELECT c.id, 'Вопрос ' || q, q, q = 2
+    FROM checklists c, generate_series(1, 3) q
+    """,
+    """
+    INSERT INTO employees (tab_number, position_id, is_active)
+    SELECT g::text, g % 2 + 1, g <> 3 FROM generate_series(1, 3) g
+    """,
+    """
+    INSERT INTO app_settings (key, value)
+    VALUES (:import_key, CAST(:import_config AS JSONB))
+    ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+    """,
+    # Without the config a position change request sends no email
+    "DELETE FROM app_settings WHERE key = :position_change_key",
+)
+IMPORT_CONFIG = {
+    "columns": {"tab_number": "Табельный номер", "position": "Должность"},
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    # Steps without a name only move the scenario along and are not checked
+    name: str | None
+    update: Callable[[Scenario], dict[str, Any]]
+
+
+@dataclass(slots=True)
+class Scenario:
+    session: FakeTelegramSession
+    ids: count = field(default_factory=lambda: count(1))
+
+    def message(
+        self,
+        user_id: int,
+        chat_id: int | None = None,
+        **content: Any,
+    ) -> dict[str, Any]:
+        chat_id = user_id if chat_id is None else chat_id
+        chat = {"id": chat_id, "type": "private"}
+        if chat_id != user_id:
+            chat = {"id": chat_id, "type": "supergroup", "title": "Chat"}
+        text_value = content.get("text", "")
+        if text_value.startswith("/"):
+            content["entities"] = [
+                {
+                    "type": "bot_command",
+                    "offset": 0,
+                    "length": len(text_value.split()[0]),
+                },
+            ]
+        return {
+            "message": {
+                "message_id": next(self.ids),
+                "date": int(time.time()),
+                "chat": chat,
+                "from": _user(user_id),
+                **content,
+            },
+        }
+
+    def callback(self, user_id: int, data: str) -> dict[str, Any]:
+        # Pressed under the last message the bot sent to the user
+        sent = self.session.sent_to(user_id)[-1]
+        return {
+            "callback_query": {
+                "id": str(next(self.ids)),
+                "from": _user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": sent.message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "from": BOT_USER,
+                    "text": sent.text or "",
+                },
+            },
+        }
+
+
+def _user(user_id: int) -> dict[str, Any]:
+    return {
+        "id": user_id,
+        "is_bot": False,
+        "first_name": f"User {user_id}",
+        "username": f"user{user_id}",
+    }
+
+
+def text_step(name: str | None, user_id: int, value: str) -> Step:
+    return Step(name, lambda scenario: scenario.message(user_id, text=value))
+
+
+def callback_step(name: str | None, user_id: int, data: str) -> Step:
+    return Step(name, lambda scenario: scenario.callback(user_id, data))
+
+
+def photo_step(name: str | None, user_id: int) -> Step:
+    photo = [
+        {
+            "file_id": f"photo-{user_id}",
+            "file_unique_id": f"p{user_id}",
+            "width": 1280,
+            "height": 960,
+        },
+    ]
+    return Step(name, lambda scenario: scenario.message(user_id, photo=photo))
+
+
+def voice_step(name: str | None, user_id: int) -> Step:
+    voice = {
+        "file_id": f"voice-{user_id}",
+        "file_unique_id": f"v{user_id}",
+        "duration": 3,
+    }
+    return Step(name, lambda scenario: scenario.message(user_id, voice=voice))
+
+
+def document_step(name: str, user_id: int, file_name: str) -> Step:
+    document = {
+        "file_id": IMPORT_FILE_ID,
+        "file_unique_id": IMPORT_FILE_ID,
+        "file_name": file_name,
+    }
+    return Step(
+        name,
+        lambda scenario: scenario.message(user_id, document=document),
+    )
+
+
+def build_steps() -> list[Step]:
+    user, second, admin = USER_ID, SECOND_USER_ID, ADMIN_ID
+    admin_chat = telegram_settings.TELEGRAM_ADMIN_CHAT_ID
+    return [
+        text_step("commands.start", user, "/start"),
+        text_step("checklist.tab_number[empty]", user, " "),
+        text_step("checklist.tab_number[unknown]", user, "404"),
+        text_step("checklist.tab_number[inactive]", user, "3"),
+        text_step("checklist.tab_number", user, "1"),
+        callback_step("checklist.position[deny]", user, "pos:deny"),
+        text_step(None, user, "1"),
+        callback_step(
+            "checklist.position[request_change]",
+            user,
+            "pos:request_change",
+        ),
+        text_step(None, user, "1"),
+        callback_step("checklist.position[confirm]", user, "pos:confirm"),
+        text_step("checklist.answer[invalid]", user, "Может быть"),
+        photo_step("checklist.answer[not_text]", user),
+        text_step("checklist.answer", user, "Да"),
+        text_step("checklist.answer[photo_required]", user, "Нет"),
+        text_step("checklist.photo[not_photo]", user, "Вот"),
+        photo_step("checklist.photo", user),
+        text_step("checklist.answer[last]", user, "Не применимо"),  # noqa: RUF001
+        callback_step(
+            "checklist.feedback_choice[provide]",
+            user,
+            "fb:provide",
+        ),
+        photo_step("checklist.feedback[invalid]", user),
+        text_step("checklist.feedback[text]", user, "Всё понятно"),
+        # A second user resumes nothing and answers with a voice message
+        text_step(None, second, "/start"),
+        text_step(None, second, "2"),
+        callback_step(None, second, "pos:confirm"),
+        text_step(None, second, "Да"),
+        text_step(None, second, "Да"),
+        photo_step(None, second),
+        text_step(None, second, "Да"),
+        callback_step(None, second, "fb:provide"),
+        voice_step("checklist.feedback[voice]", second),
+        text_step(None, second, "2"),
+        callback_step(None, second, "pos:confirm"),
+        text_step("checklist.answer[second_run]", second, "Да"),
+        text_step(None, second, "Да"),
+        photo_step(None, second),
+        text_step(None, second, "Да"),
+        callback_step("checklist.feedback_choice[skip]", second, "fb:skip"),
+        Step(
+            "service_commands.im_admin",
+            lambda scenario: scenario.message(
+                admin,
+                admin_chat,
+                text="/im_admin",
+            ),
+        ),
+        text_step("admin.menu", admin, "/admin"),
+        callback_step("admin.menu_callback[report]", admin, "adm:report"),
+        text_step("admin.report_tab_number[unknown]", admin, "404"),
+        text_step("admin.report_tab_number", admin, "1"),
+        text_step("admin.report_date[invalid]", admin, "вчера"),
+        Step(
+            "admin.report_date",
+            lambda scenario: scenario.message(
+                admin,
+                text=time.strftime("%d.%m.%Y"),
+            ),
+        ),
+        callback_step("admin.menu_callback[import]", admin, "adm:import"),
+        text_step("admin.import[not_document]", admin, "файл"),
+        document_step("admin.import[wrong_type]", admin, "employees.csv"),
+        document_step("admin.import", admin, "employees.xlsx"),
+        text_step("admin.profile[invalid]", admin, "/profile abc"),
+        text_step("admin.profile", admin, "/profile 0.05"),
+        text_step("service_commands.reset", admin, "/reset"),
+    ]
+
+
+def build_workbook() -> bytes:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    columns = IMPORT_CONFIG["columns"]
+    sheet.append([columns["tab_number"], columns["position"]])
+    for tab_number, position in (
+        (1, "Оператор"),
+        (2, "Мастер"),
+        (4, "Оператор"),
+        (5, "Наладчик"),
+    ):
+        sheet.append([tab_number, position])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+async def seed(engine: AsyncEngine) -> None:
+    params = {
+        "import_key": IMPORT_CONFIG_KEY,
+        "import_config": json.dumps(IMPORT_CONFIG, ensure_ascii=False),
+        "position_change_key": POSITION_CHANGE_SETTINGS_KEY,
+    }
+    async with engine.begin() as connection:
+        for statement in SEED_SQL:
+            await connection.execute(text(statement), params)
+
+
+async def run_scenario(
+    bot: Bot,
+    dispatcher: Dispatcher,
+    scenario: Scenario,
+    statements: list[str],
+    failed: dict[str, str],
+) -> dict[str, list[str]]:
+    issued: dict[str, list[str]] = {}
+    for step in build_steps():
+        payload = step.update(scenario)
+        payload["update_id"] = next(scenario.ids)
+        update = Update.model_validate(payload, context={"bot": bot})
+        statements.clear()
+        try:
+            await dispatcher.feed_update(bot, update)
+        except Exception as e:  # noqa: BLE001
+            failed[step.name or "setup step"] = f"{type(e).__name__}: {e}"
+        if step.name is not None:
+            issued[step.name] = list(statements)
+    return issued
+
+
+def compare(
+    issued: dict[str, list[str]],
+    budgets: dict[str, int],
+    *,
+    verbose: bool,
+) -> int:
+    over = 0
+    width = max(len(name) for name in issued)
+    for name, step_statements in issued.items():
+        used = len(step_statements)
+        budget = budgets.get(name)
+        if budget is None:
+            status = "  no budget"
+            over += 1
+        elif used > budget:
+            status = f"  OVER by {used - budget}"
+            over += 1
+        elif used < budget:
+            status = "  under, lower it with --update"
+        else:
+            status = ""
+        budget_label = "-" if budget is None else str(budget)
+        print(f"{name:<{width}}  {used:>3} / {budget_label:>3}{status}")
+        if status.startswith("  OVER") or verbose:
+            repeated = Counter(step_statements)
+            for statement in step_statements:
+                marker = "*" if repeated[statement] > 1 else " "
+                print(f"  {marker} {' '.join(statement.split())[:160]}")
+    for name in sorted(budgets.keys() - issued.keys()):
+        print(f"{name:<{width}}  not run, drop it with --update")
+    return over
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare SQL statements per Telegram handler with budgets",
+    )
+    parser.add_argument(
+        "--database",
+        default="checklist_query_budgets",
+        help="Name of the throwaway database (dropped and recreated)",
+    )
+    parser.add_argument(
+        "--keep-database",
+        action="store_true",
+        help="Leave the database behind after the run",
+    )
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH)
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Write the current counts to the budgets file",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print the statements of every step, repeats marked with *",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+    await recreate_database(args.database)
+    migrate(args.database)
+    # The container creates the engine lazily from these settings
+    server_database = postgres_settings.POSTGRES_DB
+    postgres_settings.POSTGRES_DB = args.database
+    statements: list[str] = []
+    failed: dict[str, str] = {}
+    try:
+        engine = await container.get(AsyncEngine)
+        await seed(engine)
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def _record(
+            _connection: Any,
+            _cursor: Any,
+            statement: str,
+            *_: Any,
+        ) -> None:
+            statements.append(statement)
+
+        session = await container.get(BaseSession)
+        if not isinstance(session, FakeTelegramSession):
+            print("TELEGRAM_FAKE_API is not in effect, refusing to run")
+            return 1
+        session.add_file(IMPORT_FILE_ID, build_workbook())
+        await aiogram_startup()
+        bot = await container.get(Bot)
+        dispatcher = await container.get(Dispatcher)
+        issued = await run_scenario(
+            bot,
+            dispatcher,
+            Scenario(session),
+            statements,
+            failed,
+        )
+        await aiogram_shutdown()
+    finally:
+        await container.close()
+        postgres_settings.POSTGRES_DB = server_database
+        if not args.keep_database:
+            await recreate_database(args.database, create=False)
+
+    budgets = {}
+    if args.budgets.exists():
+        budgets = json.loads(args.budgets.read_text())
+    over = compare(issued, budgets, verbose=args.verbose)
+    for name, error in failed.items():
+        print(f"{name} failed: {error}")
+    if failed:
+        print("Counts of a scenario with failed steps are not trustworthy")
+        return 1
+    if args.update:
+        args.budgets.write_text(
+            json.dumps(
+                {name: len(value) for name, value in issued.items()},
+                indent=2,
+                ensure_ascii=False,
+            )
+            + "\n",
+        )
+        print(f"Budgets written to {args.budgets}")
+        return 0
+    if over:
+        print(f"{over} step(s) over budget")
+    return 1 if over else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()
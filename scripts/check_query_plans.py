@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Check that hot repository queries are served by their indexes.
+
+Runs EXPLAIN for the statements the repositories actually build and fails
+when the expected index does not show up in the plan. Sequential scans are
+disabled for the session so the check is meaningful on small databases.
+Lookups by a partition key must also be pruned to a single partition.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Awaitable, Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+import entities.user.models  # noqa: E402, F401
+from db.config import postgres_settings  # noqa: E402
+from repositories.checklist import (  # noqa: E402
+    ChecklistAnswerRepository,
+    ChecklistQuestionRepository,
+    ChecklistRepository,
+    ChecklistSessionRepository,
+)
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncConnection,
+    create_async_engine,
+)
+
+
+class _EmptyResult:
+    def one_or_none(self) -> None:
+        return None
+
+    def all(self) -> list[Any]:
+        return []
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(())
+
+
+class ExplainSession:
+    """AsyncSession stand-in that explains statements instead of running."""
+
+    def __init__(self, connection: AsyncConnection) -> None:
+        self.connection = connection
+        self.plans: list[dict[str, Any]] = []
+
+    async def scalars(self, stmt) -> _EmptyResult:
+        await self._explain(stmt)
+        return _EmptyResult()
+
+    async def execute(self, stmt) -> _EmptyResult:
+        await self._explain(stmt)
+        return _EmptyResult()
+
+    async def _explain(self, stmt) -> None:
+        sql = stmt.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+        result = await self.connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {sql}",
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        self.plans.append(plan[0]["Plan"])
+
+
+type Probe = Callable[[ExplainSession], Awaitable[Any]]
+
+NOW = datetime.now(UTC)
+
+# (name, probe, expected parent index, must scan a single partition)
+CHECKS: tuple[tuple[str, Probe, str, bool], ...] = (
+    (
+        "ChecklistSessionRepository.get_completed_key_for_employee_on_date",
+        lambda s: ChecklistSessionRepository(
+            s,
+        ).get_completed_key_for_employee_on_date(1, NOW.date()),
+        "ix_checklist_sessions_employee_status_completed",
+        False,
+    ),
+    (
+        "ChecklistSessionRepository.get_in_progress_for_user",
+        lambda s: ChecklistSessionRepository(s).get_in_progress_for_user(1),
+        "ix_checklist_sessions_user_in_progress",
+        False,
+    ),
+    (
+        "ChecklistSessionRepository.get_row",
+        lambda s: ChecklistSessionRepository(s).get_row(1, NOW),
+        "checklist_sessions_pkey",
+        True,
+    ),
+    (
+        "ChecklistAnswerRepository.list_rows_for_session",
+        lambda s: ChecklistAnswerRepository(s).list_rows_for_session(1, NOW),
+        "uq_checklist_answers_session_question",
+        True,
+    ),
+    (
+        "ChecklistQuestionRepository.list_rows_for_checklist",
+        lambda s: ChecklistQuestionRepository(s).list_rows_for_checklist(1),
+        "uq_checklist_questions_checklist_id_order",
+        False,
+    ),
+    (
+        "ChecklistRepository.get_active_for_group",
+        lambda s: ChecklistRepository(s).get_active_for_group(1),
+        "ix_checklists_group_active_created",
+        False,
+    ),
+    (
+        "ChecklistRepository.get_default",
+        lambda s: ChecklistRepository(s).get_default(),
+        "ix_checklists_default_created",
+        False,
+    ),
+)
+
+
+def iter_plan_values(plan: dict[str, Any], key: str) -> Iterator[str]:
+    if value := plan.get(key):
+        yield value
+    for child in plan.get("Plans", []):
+        yield from iter_plan_values(child, key)
+
+
+async def load_parent_indexes(connection: AsyncConnection) -> dict[str, str]:
+    # Plans name the per-partition index; map it back to the parent index.
+    result = await connection.execute(
+        text(
+            "SELECT child.relname, parent.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE child.relkind = 'i'",
+        ),
+    )
+    return dict(result.tuples().all())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Verify that hot repository queries use their indexes",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="SQLAlchemy async URL (defaults to POSTGRES_* settings)",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+    engine = create_async_engine(
+        args.database_url or postgres_settings.async_url,
+    )
+    failures = 0
+    try:
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SET enable_seqscan = off")
+            parents = await load_parent_indexes(connection)
+            for name, probe, expected_index, pruned in CHECKS:
+                session = ExplainSession(connection)
+                await probe(session)
+                used = {
+                    parents.get(index_name, index_name)
+                    for plan in session.plans
+                    for index_name in iter_plan_values(plan, "Index Name")
+                }
+                relations = {
+                    relation
+                    for plan in session.plans
+                    for relation in iter_plan_values(plan, "Relation Name")
+                }
+                if expected_index not in used:
+                    failures += 1
+                    print(
+                        f"[FAIL] {name}: expected {expected_index}, "
+                        f"plan used {sorted(used) or 'no index'}",
+                    )
+                    continue
+                if pruned and len(relations) != 1:
+                    failures += 1
+                    print(
+                        f"[FAIL] {name}: expected a single partition, "
+                        f"plan scanned {sorted(relations)}",
+                    )
+                    continue
+                print(f"[OK]   {name}: {expected_index}")
+    finally:
+        await engine.dispose()
+    return 1 if failures else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""Drive the checklist conversation through the webhook endpoint.
+
+Every virtual user walks the whole flow: /start, tab number, position
+confirmation, answers (with photos where a question asks for one) and
+feedback. The script also serves a Bot API stub that records what the bot
+sends, so each user reacts to the bot's last message the way a person would.
+Start the backend against the stub in webhook mode with a single worker
+(FSM state lives in worker memory), e.g.:
+
+    TELEGRAM_USE_WEBHOOK=true TELEGRAM_API_URL=http://127.0.0.1:8081 \\
+        WORKERS=1 python backend/app
+
+Users and sessions are written to the backend database, so use a
+disposable one. Tab numbers default to the active employees found there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout, web
+from yarl import URL
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+import entities.user.models  # noqa: E402, F401
+from core.security.globals import TELEGRAM_WEBHOOK_SECRET_HEADER  # noqa: E402
+from db.config import postgres_settings  # noqa: E402
+from entities.checklist.models import Employee  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Stub",
+    "username": "stub_bot",
+}
+ANSWERS = ("Да", "Нет", "Не применимо")  # noqa: RUF001
+FINISHED_TEXT = "Если нужно пройти еще один чеклист"
+PHOTO_TEXT = "пришлите фото"
+FEEDBACK_TEXT = "Расскажите, что можно улучшить"
+
+
+@dataclass(frozen=True, slots=True)
+class SentMessage:
+    message: dict[str, Any]
+    markup: dict[str, Any]
+
+
+class BotApiStub:
+    """Answers every Bot API call and remembers the last message per chat."""
+
+    def __init__(self) -> None:
+        self.last_message: dict[int, SentMessage] = {}
+        self.calls: Counter[str] = Counter()
+        self._message_ids = itertools.count(1)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(await request.post())
+        result: Any = True
+        if method == "getMe":
+            result = BOT_USER
+        elif method == "getChat":
+            result = _chat_full_info(int(params["chat_id"]))
+        elif method.startswith(("send", "edit", "copy")):
+            result = self._message(params)
+        return web.json_response({"ok": True, "result": result})
+
+    def _message(self, params: dict[str, Any]) -> dict[str, Any]:
+        chat_id = int(params.get("chat_id") or 0)
+        markup = params.get("reply_markup")
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        self.last_message[chat_id] = SentMessage(
+            message=message,
+            markup=json.loads(markup) if markup else {},
+        )
+        return message
+
+
+@dataclass
+class Report:
+    latencies: dict[str, list[float]] = field(
+        default_factory=lambda: defaultdict(list),
+    )
+    errors: Counter[str] = field(default_factory=Counter)
+    outcomes: Counter[str] = field(default_factory=Counter)
+
+
+@dataclass(frozen=True, slots=True)
+class LoadRun:
+    args: argparse.Namespace
+    http: ClientSession
+    stub: BotApiStub
+    report: Report
+    # Shared by update ids, message ids and callback ids
+    ids: itertools.count
+
+
+class VirtualUser:
+    def __init__(self, run: LoadRun, index: int, tab_number: str) -> None:
+        self.args = run.args
+        self.http = run.http
+        self.stub = run.stub
+        self.report = run.report
+        self.ids = run.ids
+        self.user_id = run.args.user_id_base + index
+        self.tab_number = tab_number
+        self.random = random.Random(run.args.seed + index)  # noqa: S311
+        self.user = {
+            "id": self.user_id,
+            "is_bot": False,
+            "first_name": f"Load {index}",
+            "username": f"load_user_{index}",
+            "language_code": "ru",
+        }
+
+    async def run(self) -> None:
+        self.stub.last_message.pop(self.user_id, None)
+        await self.send_text("/start", kind="command")
+        await self.send_text(self.tab_number)
+        for _ in range(self.args.max_steps):
+            sent = self.stub.last_message.get(self.user_id)
+            if sent is None:
+                self.report.outcomes["no reply"] += 1
+                return
+            text: str = sent.message["text"]
+            if text.startswith(FINISHED_TEXT):
+                self.report.outcomes["completed"] += 1
+                return
+            callbacks = _callback_data(sent.markup)
+            if "pos:confirm" in callbacks:
+                await self.send_callback(sent.message, "pos:confirm")
+            elif "fb:provide" in callbacks:
+                choice = (
+                    "fb:provide"
+                    if self.random.random() < self.args.feedback_share
+                    else "fb:skip"
+                )
+                await self.send_callback(sent.message, choice)
+            elif "keyboard" in sent.markup:
+                await self.send_text(
+                    self.random.choice(ANSWERS),
+                    kind="answer",
+                )
+            elif PHOTO_TEXT in text.lower():
+                await self.send_photo()
+            elif text.startswith(FEEDBACK_TEXT):
+                await self.send_text("Всё понятно, спасибо", kind="feedback")
+            else:
+                self.report.outcomes[text[:60]] += 1
+                return
+            if self.args.think_time:
+                await asyncio.sleep(
+                    self.random.uniform(0, self.args.think_time),
+                )
+        self.report.outcomes["step limit"] += 1
+
+    async def send_text(self, text: str, kind: str = "text") -> None:
+        message = self._message()
+        message["text"] = text
+        if text.startswith("/"):
+            message["entities"] = [
+                {"type": "bot_command", "offset": 0, "length": len(text)},
+            ]
+        await self.post(kind, {"message": message})
+
+    async def send_photo(self) -> None:
+        message = self._message()
+        unique = f"{self.user_id}-{message['message_id']}"
+        message["photo"] = [
+            {
+                "file_id": f"small-{unique}",
+                "file_unique_id": f"s{unique}",
+                "width": 90,
+                "height": 90,
+                "file_size": 1_500,
+            },
+            {
+                "file_id": f"large-{unique}",
+                "file_unique_id": f"l{unique}",
+                "width": 1280,
+                "height": 960,
+                "file_size": 180_000,
+            },
+        ]
+        await self.post("photo", {"message": message})
+
+    async def send_callback(
+        self,
+        bot_message: dict[str, Any],
+        data: str,
+    ) -> None:
+        callback = {
+            "id": str(next(self.ids)),
+            "from": self.user,
+            "chat_instance": str(self.user_id),
+            "message": bot_message,
+            "data": data,
+        }
+        await self.post("callback", {"callback_query": callback})
+
+    def _message(self) -> dict[str, Any]:
+        return {
+            "message_id": next(self.ids),
+            "date": int(time.time()),
+            "chat": {
+                "id": self.user_id,
+                "type": "private",
+                "first_name": self.user["first_name"],
+                "username": self.user["username"],
+            },
+            "from": self.user,
+        }
+
+    async def post(self, kind: str, payload: dict[str, Any]) -> None:
+        payload["update_id"] = next(self.ids)
+        started = time.perf_counter()
+        try:
+            async with self.http.post(
+                self.args.url,
+                json=payload,
+                headers={TELEGRAM_WEBHOOK_SECRET_HEADER: self.args.secret},
+            ) as response:
+                await response.read()
+                status = response.status
+        except (TimeoutError, OSError) as e:
+            self.report.errors[type(e).__name__] += 1
+            return
+        self.report.latencies[kind].append(time.perf_counter() - started)
+        if status != 200:  # noqa: PLR2004
+            self.report.errors[f"HTTP {status}"] += 1
+
+
+def _chat_full_info(chat_id: int) -> dict[str, Any]:
+    return {
+        "id": chat_id,
+        "type": "private",
+        "accent_color_id": 0,
+        "max_reaction_count": 0,
+        "accepted_gift_types": {
+            "unlimited_gifts": False,
+            "limited_gifts": False,
+            "unique_gifts": False,
+            "premium_subscription": False,
+        },
+    }
+
+
+def _callback_data(markup: dict[str, Any]) -> set[str]:
+    return {
+        button.get("callback_data", "")
+        for row in markup.get("inline_keyboard", [])
+        for button in row
+    }
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def load_tab_numbers() -> list[str]:
+    engine = create_async_engine(postgres_settings.async_url)
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(
+                select(Employee.tab_number).where(Employee.is_active),
+            )
+            return list(result.scalars())
+    finally:
+        await engine.dispose()
+
+
+async def wait_for_backend(url: str, seconds: float) -> bool:
+    # The backend talks to the stub during startup, so it may be launched
+    # only after the stub is up; wait until its port accepts connections.
+    target = URL(url)
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(target.host, target.port)
+        except OSError:
+            await asyncio.sleep(0.5)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return True
+    return False
+
+
+def print_report(report: Report, elapsed: float, stub: BotApiStub) -> None:
+    all_latencies = [
+        value for values in report.latencies.values() for value in values
+    ]
+    total = len(all_latencies)
+    print(
+        f"Updates: {total} in {elapsed:.1f}s, {total / elapsed:.1f} updates/s",
+    )
+    rows = [("all", all_latencies), *sorted(report.latencies.items())]
+    print(
+        f"{'kind':<10}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    )
+    for kind, values in rows:
+        if not values:
+            continue
+        print(
+            f"{kind:<10}{len(values):>8}"
+            f"{percentile(values, 0.5) * 1000:>10.1f}"
+            f"{percentile(values, 0.99) * 1000:>10.1f}"
+            f"{max(values) * 1000:>10.1f}",
+        )
+    print(f"Errors: {sum(report.errors.values())}")
+    for error, count in report.errors.most_common():
+        print(f"  {error}: {count}")
+    print("Conversations:")
+    for outcome, count in report.outcomes.most_common():
+        print(f"  {outcome}: {count}")
+    print(f"Bot API calls: {sum(stub.calls.values())}")
+    for method, count in stub.calls.most_common():
+        print(f"  {method}: {count}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load test the Telegram webhook with synthetic updates",
+    )
+    parser.add_argument(
+        "--url",
+        default="http://127.0.0.1:5000/backend/api/v1/telegram/webhook",
+        help="Webhook endpoint of the running backend",
+    )
+    parser.add_argument(
+        "--secret",
+        default=os.environ.get("TELEGRAM_SECRET_TOKEN", ""),
+        help="Webhook secret (defaults to TELEGRAM_SECRET_TOKEN)",
+    )
+    parser.add_argument(
+        "--users",
+        type=int,
+        default=1000,
+        help="Virtual users, each completing one checklist",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=50,
+        help="Users talking to the bot at the same time",
+    )
+    parser.add_argument(
+        "--tab-number",
+        action="append",
+        dest="tab_numbers",
+        help="Tab number to use (repeatable; defaults to active employees)",
+    )
+    parser.add_argument(
+        "--feedback-share",
+        type=float,
+        default=0.5,
+        help="Share of users who leave feedback instead of skipping",
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.0,
+        help="Upper bound of a random pause between updates, in seconds",
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        default=200,
+        help="Updates per user before the conversation is abandoned",
+    )
+    parser.add_argument(
+        "--user-id-base",
+        type=int,
+        default=8_000_000_000,
+        help="Telegram id of the first virtual user",
+    )
+    parser.add_argument("--stub-host", default="127.0.0.1")
+    parser.add_argument("--stub-port", type=int, default=8081)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument(
+        "--startup-timeout",
+        type=float,
+        default=120.0,
+        help="Seconds to wait for the backend to start listening",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+    tab_numbers = args.tab_numbers or await load_tab_numbers()
+    if not tab_numbers:
+        print("No active employees found; pass --tab-number")
+        return 1
+
+    stub = BotApiStub()
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.stub_host, args.stub_port).start()
+    print(
+        f"Bot API stub listening on http://{args.stub_host}:{args.stub_port}",
+    )
+    if not await wait_for_backend(args.url, args.startup_timeout):
+        await runner.cleanup()
+        print(f"Backend is not reachable at {args.url}")
+        return 1
+
+    report = Report()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_user(user: VirtualUser) -> None:
+        async with semaphore:
+            await user.run()
+
+    started = time.perf_counter()
+    try:
+        async with ClientSession(
+            timeout=ClientTimeout(total=args.timeout),
+        ) as http:
+            run = LoadRun(
+                args=args,
+                http=http,
+                stub=stub,
+                report=report,
+                ids=itertools.count(int(time.time())),
+            )
+            users = [
+                VirtualUser(run, index, tab_numbers[index % len(tab_numbers)])
+                for index in range(args.users)
+            ]
+            await asyncio.gather(*(run_user(user) for user in users))
+    finally:
+        await runner.cleanup()
+    print_report(report, time.perf_counter() - started, stub)
+    return 1 if report.errors else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()
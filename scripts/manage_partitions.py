@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""CLI helper to maintain monthly checklist partitions."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+# Make backend app importable when launched from repo root
+ROOT_DIR = Path(__file__).resolve().parents[1]
+APP_PATH = ROOT_DIR / "backend" / "app"
+if str(APP_PATH) not in sys.path:
+    sys.path.insert(0, str(APP_PATH))
+
+from core.config import core_settings  # noqa: E402
+from di import container  # noqa: E402
+from dishka import Scope  # noqa: E402
+from services.partitions import PartitionMaintenanceService  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create future checklist partitions and detach old ones",
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=None,
+        help="Months to create ahead of the current one",
+    )
+    parser.add_argument(
+        "--detach-after-months",
+        type=int,
+        default=None,
+        help="Detach partitions older than this many months",
+    )
+    parser.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        default=None,
+        help="Reference date in YYYY-MM-DD format",
+    )
+    return parser.parse_args()
+
+
+async def async_main() -> int:
+    args = parse_args()
+
+    # Defaults for settings the container expects when running from CLI
+    os.environ.setdefault("DOMAIN", "localhost")
+    os.environ.setdefault("JWT_KEY", "change-me")
+    _ = core_settings  # trigger settings load with defaults
+
+    async with container(scope=Scope.REQUEST) as request_container:
+        service = await request_container.get(PartitionMaintenanceService)
+        result = await service.run(
+            today=args.today,
+            months_ahead=args.months_ahead,
+            detach_after_months=args.detach_after_months,
+        )
+    await container.close()
+
+    if result is None:
+        print("Maintenance is already running in another process")
+        return 1
+    print("Created:", ", ".join(p.name for p in result.created) or "-")
+    print("Detached:", ", ".join(p.name for p in result.detached) or "-")
+    return 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(async_main()))
+
+
+if __name__ == "__main__":
+    main()